@@ -1,6 +1,6 @@
 # apps/applications/admin.py
 from django.contrib import admin
-from .models import Application
+from .models import Application, ApplicationStatusChange, ArchivedApplication
 
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
@@ -21,4 +21,25 @@ class ApplicationAdmin(admin.ModelAdmin):
             'fields': ('applied_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(ApplicationStatusChange)
+class ApplicationStatusChangeAdmin(admin.ModelAdmin):
+    list_display = ['application', 'from_status', 'to_status', 'changed_by', 'changed_at']
+    list_filter = ['to_status', 'changed_at']
+    raw_id_fields = ['application', 'changed_by']
+    readonly_fields = ['changed_at']
+
+@admin.register(ArchivedApplication)
+class ArchivedApplicationAdmin(admin.ModelAdmin):
+    list_display = ['applicant', 'job', 'status', 'applied_at', 'archived_at']
+    list_filter = ['status', 'archived_at']
+    search_fields = ['applicant__email', 'job__title']
+    raw_id_fields = ['job', 'applicant']
+    ordering = ['-archived_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
\ No newline at end of file
@@ -7,4 +7,5 @@ class ApplicationsConfig(AppConfig):
 
     def ready(self):
         # Import models to ensure they're registered
-        from . import models
\ No newline at end of file
+        from . import models
+        from . import signals
\ No newline at end of file
@@ -0,0 +1,160 @@
+# apps/applications/funnel.py
+"""
+Recruitment funnel statistics.
+
+``JobFunnel`` holds, per job, the number of applications in each status and
+the total time applications waited for their first review. Every write
+that changes those numbers adjusts the job's row in the same transaction:
+a new application upserts it, status changes and withdrawals add deltas to
+it (bulk changes across many jobs in one UPDATE). The stats endpoint reads
+and sums these rows only. ``rebuild_funnels`` recomputes them from the
+applications table after bulk inserts or raw SQL.
+"""
+from collections import Counter, defaultdict
+
+from django.db import connections, transaction
+from django.db.models import Case, Count, DurationField, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .models import Application, JobFunnel
+
+STATUSES = [status for status, _ in Application.STATUS_CHOICES]
+
+# Counted columns of a funnel row
+COLUMNS = [*STATUSES, 'reviews', 'review_seconds']
+
+
+def seconds_between(start, end):
+    return max(int((end - start).total_seconds()), 0)
+
+
+def application_deltas(values, sign=1):
+    """
+    Column deltas adding (``sign=1``) or removing (``-1``) one application,
+    given its ``status``, ``applied_at`` and ``reviewed_at`` values.
+    """
+    deltas = Counter({values['status']: sign})
+    if values['reviewed_at']:
+        deltas['reviews'] += sign
+        deltas['review_seconds'] += sign * seconds_between(values['applied_at'], values['reviewed_at'])
+    return deltas
+
+
+def lock_funnel_values(application, using=None):
+    """
+    Lock ``application``'s row and return its stored ``status``,
+    ``applied_at`` and ``reviewed_at`` (None once the row is gone).
+    Concurrent writers of the same application wait for each other, so each
+    diffs against what the previous one stored and a transition is counted
+    once. Call inside a transaction.
+    """
+    rows = Application.objects.using(using).select_for_update().filter(pk=application.pk)
+    return rows.values('status', 'applied_at', 'reviewed_at').first()
+
+
+def count_new_application(application, using='default'):
+    """Add ``application`` to its job's funnel, creating the row if needed."""
+    deltas = application_deltas(application.__dict__)
+    connection = connections[using]
+    table = connection.ops.quote_name(JobFunnel._meta.db_table)
+    columns = ['job_id', 'category_id', *COLUMNS, 'updated_at']
+    increments = ', '.join(f'{column} = {table}.{column} + EXCLUDED.{column}' for column in COLUMNS)
+    # One statement, safe against concurrent first applications to a job
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join(["%s"] * len(columns))}) '
+            f'ON CONFLICT (job_id) DO UPDATE SET {increments}, updated_at = EXCLUDED.updated_at',
+            [application.job_id, application.job.category_id, *(deltas[column] for column in COLUMNS), timezone.now()],
+        )
+
+
+def adjust_funnels(deltas, using='default'):
+    """
+    Add ``{job_id: {column: delta}}`` to existing funnel rows in one UPDATE.
+    Rows that do not exist (their job is being deleted) are left alone.
+    """
+    deltas = {job_id: changes for job_id, changes in deltas.items() if any(changes.values())}
+    if not deltas:
+        return
+    columns = {column for changes in deltas.values() for column, delta in changes.items() if delta}
+    JobFunnel.objects.using(using).filter(job_id__in=list(deltas)).update(updated_at=Now(), **{
+        column: F(column) + Case(
+            *[When(job_id=job_id, then=Value(changes[column])) for job_id, changes in deltas.items() if changes.get(column)],
+            default=Value(0), output_field=IntegerField(),
+        )
+        for column in columns
+    })
+
+
+def status_change_deltas(rows, to_status, changed_at):
+    """Funnel deltas for moving ``(job_id, status, applied_at, reviewed_at)`` rows to ``to_status``."""
+    deltas = defaultdict(Counter)
+    for job_id, from_status, applied_at, reviewed_at in rows:
+        deltas[job_id][from_status] -= 1
+        deltas[job_id][to_status] += 1
+        if reviewed_at is None and to_status != 'pending':
+            deltas[job_id]['reviews'] += 1
+            deltas[job_id]['review_seconds'] += seconds_between(applied_at, changed_at)
+    return deltas
+
+
+def rebuild_funnels(job_ids=None):
+    """
+    Recompute funnel rows from the applications table, for every job or only
+    ``job_ids``. Returns the number of rows written. Writes made while it
+    runs may be lost, so run it when applications are quiet.
+    """
+    applications = Application.objects.order_by()
+    funnels = JobFunnel.objects.all()
+    if job_ids is not None:
+        applications = applications.filter(job_id__in=job_ids)
+        funnels = funnels.filter(job_id__in=job_ids)
+    rows = applications.values('job_id', 'job__category_id').annotate(
+        **{status: Count('pk', filter=Q(status=status)) for status in STATUSES},
+        reviews=Count('pk', filter=Q(reviewed_at__isnull=False)),
+        review_time=Sum(F('reviewed_at') - F('applied_at'), output_field=DurationField()),
+    )
+    with transaction.atomic():
+        funnels.delete()
+        created = JobFunnel.objects.bulk_create([
+            JobFunnel(
+                job_id=row['job_id'], category_id=row['job__category_id'],
+                **{status: row[status] for status in STATUSES}, reviews=row['reviews'],
+                review_seconds=int(row['review_time'].total_seconds()) if row['review_time'] else 0,
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ], batch_size=2000)
+    return len(created)
+
+
+def funnel_summary(row, job=None, category=None):
+    total = sum(row[status] or 0 for status in STATUSES)
+    reviews = row['reviews'] or 0
+    return {
+        'job': job,
+        'category': category,
+        **{status: row[status] or 0 for status in STATUSES},
+        'total': total,
+        'reviews': reviews,
+        'avg_time_to_review': round(row['review_seconds'] / reviews, 1) if reviews else None,
+    }
+
+
+def funnel_stats(funnels, group_by='category', limit=100):
+    """
+    Funnel summaries from ``funnels`` (a ``JobFunnel`` queryset): one per job,
+    one per category, or a single overall total.
+    """
+    if group_by == 'job':
+        rows = funnels.order_by('-job_id').values('job_id', 'category_id', *COLUMNS)[:limit]
+        return [funnel_summary(row, job=row['job_id'], category=row['category_id']) for row in rows]
+    sums = {f'{column}_sum': Sum(column) for column in COLUMNS}
+    if group_by == 'category':
+        rows = funnels.order_by('category_id').values('category_id').annotate(**sums)
+    else:
+        rows = [funnels.aggregate(**sums)]
+    return [
+        funnel_summary({column: row[f'{column}_sum'] for column in COLUMNS}, category=row.get('category_id'))
+        for row in rows
+    ]
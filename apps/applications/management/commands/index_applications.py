@@ -0,0 +1,27 @@
+# apps/applications/management/commands/index_applications.py
+from django.core.management.base import BaseCommand
+
+from apps.applications.models import Application
+from apps.applications.tasks import extract_application_text
+
+
+class Command(BaseCommand):
+    help = (
+        'Queue resume and cover letter text extraction for applications without a search document, '
+        'such as those created before screening existed or by bulk inserts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--now', action='store_true', help='Extract in this process instead of queueing')
+
+    def handle(self, *args, **options):
+        applications = Application.objects.filter(document__isnull=True).order_by('pk')
+        queued = 0
+        for application_id in applications.values_list('pk', flat=True).iterator(chunk_size=2000):
+            if options['now']:
+                extract_application_text(application_id)
+            else:
+                extract_application_text.enqueue(application_id)
+            queued += 1
+        verb = 'indexed' if options['now'] else 'queued'
+        self.stdout.write(f'{queued} applications {verb}')
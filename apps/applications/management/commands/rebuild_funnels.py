@@ -0,0 +1,19 @@
+# apps/applications/management/commands/rebuild_funnels.py
+from django.core.management.base import BaseCommand
+
+from apps.applications.funnel import rebuild_funnels
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the per-job recruitment funnel counts from the applications table, after bulk '
+        'inserts or raw SQL that bypassed the incremental updates'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, action='append', dest='jobs',
+                            help='Only rebuild this job (repeatable)')
+
+    def handle(self, *args, **options):
+        rows = rebuild_funnels(options['jobs'])
+        self.stdout.write(f'{rows} job funnels rebuilt')
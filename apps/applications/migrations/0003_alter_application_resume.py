@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:14
+
+import apps.core.storage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_application_status_changes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='resume',
+            field=apps.core.storage.BlobFileField(storage=apps.core.storage.blob_storage, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:21
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+SEARCH_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION application_documents_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.resume_text, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.cover_letter, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER application_documents_search_vector
+    BEFORE INSERT OR UPDATE OF resume_text, cover_letter, search_vector
+    ON application_documents FOR EACH ROW EXECUTE FUNCTION application_documents_search_vector_update();
+
+CREATE INDEX application_documents_search_vector_gin ON application_documents USING gin (search_vector);
+"""
+
+DROP_SEARCH_TRIGGER_SQL = """
+DROP INDEX IF EXISTS application_documents_search_vector_gin;
+DROP TRIGGER IF EXISTS application_documents_search_vector ON application_documents;
+DROP FUNCTION IF EXISTS application_documents_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    # Other backends rank documents in Python (apps/applications/screening.py)
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(SEARCH_TRIGGER_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_alter_application_resume'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationDocument',
+            fields=[
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='applications.application')),
+                ('resume_name', models.CharField(blank=True, help_text='Stored resume the text came from', max_length=255)),
+                ('resume_text', models.TextField(blank=True)),
+                ('cover_letter', models.TextField(blank=True)),
+                ('extraction_error', models.CharField(blank=True, max_length=255)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('extracted_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'application_documents',
+                'indexes': [models.Index(fields=['resume_name'], name='application_resume__fb9223_idx')],
+            },
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
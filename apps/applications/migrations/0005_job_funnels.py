@@ -0,0 +1,70 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DurationField, F, Min, OuterRef, Q, Subquery, Sum
+
+STATUSES = ['pending', 'reviewed', 'shortlisted', 'rejected', 'accepted']
+
+
+def backfill_funnels(apps, schema_editor):
+    Application = apps.get_model('applications', 'Application')
+    ApplicationStatusChange = apps.get_model('applications', 'ApplicationStatusChange')
+    JobFunnel = apps.get_model('applications', 'JobFunnel')
+
+    # The audit trail knows when reviewed applications first left pending
+    first_review = (
+        ApplicationStatusChange.objects.filter(application=OuterRef('pk'), from_status='pending')
+        .order_by().values('application').annotate(first=Min('changed_at')).values('first')
+    )
+    Application.objects.exclude(status='pending').update(reviewed_at=Subquery(first_review))
+
+    rows = Application.objects.order_by().values('job_id', 'job__category_id').annotate(
+        **{status: Count('pk', filter=Q(status=status)) for status in STATUSES},
+        reviews=Count('pk', filter=Q(reviewed_at__isnull=False)),
+        review_time=Sum(F('reviewed_at') - F('applied_at'), output_field=DurationField()),
+    )
+    JobFunnel.objects.bulk_create([
+        JobFunnel(
+            job_id=row['job_id'], category_id=row['job__category_id'],
+            **{status: row[status] for status in STATUSES}, reviews=row['reviews'],
+            review_seconds=int(row['review_time'].total_seconds()) if row['review_time'] else 0,
+        )
+        for row in rows.iterator(chunk_size=2000)
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_application_documents'),
+        ('jobs', '0003_job_category_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='reviewed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When it first left pending', null=True),
+        ),
+        migrations.CreateModel(
+            name='JobFunnel',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='funnel', serialize=False, to='jobs.job')),
+                ('pending', models.IntegerField(default=0)),
+                ('reviewed', models.IntegerField(default=0)),
+                ('shortlisted', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('accepted', models.IntegerField(default=0)),
+                ('reviews', models.IntegerField(default=0, help_text='Applications that have left pending')),
+                ('review_seconds', models.BigIntegerField(default=0, help_text='Total time from applying to first review')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.category')),
+            ],
+            options={
+                'db_table': 'job_funnels',
+                'indexes': [models.Index(fields=['category'], name='job_funnels_categor_fa1a00_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_funnels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:58
+
+import apps.core.operations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('applications', '0005_job_funnels'),
+    ]
+
+    operations = [
+        apps.core.operations.AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(fields=['job', '-applied_at'], name='application_job_id_710e05_idx'),
+        ),
+        apps.core.operations.AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(fields=['applicant', '-applied_at'], name='application_applica_737f06_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.1 on 2026-10-18 04:03
+
+import apps.core.storage
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_advised_indexes'),
+        ('jobs', '0006_job_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedApplication',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('cover_letter', models.TextField()),
+                ('resume', apps.core.storage.BlobFileField(storage=apps.core.storage.blob_storage, upload_to='')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('reviewed', 'Reviewed'), ('shortlisted', 'Shortlisted'), ('rejected', 'Rejected'), ('accepted', 'Accepted')], max_length=20)),
+                ('notes', models.TextField(blank=True)),
+                ('applied_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('status_history', models.JSONField(blank=True, default=list, help_text='from, to, changed_by and changed_at of each change')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_applications', to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.archivedjob')),
+            ],
+            options={
+                'db_table': 'applications_archive',
+                'ordering': ['-applied_at'],
+            },
+        ),
+    ]
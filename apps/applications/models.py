@@ -1,7 +1,10 @@
 # apps/applications/models.py
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, router, transaction
 from django.conf import settings
-from apps.jobs.models import Job
+from django.utils import timezone
+from apps.core.storage import BlobFileField
+from apps.jobs.models import ArchivedJob, Category, Job
 
 class Application(models.Model):
     STATUS_CHOICES = [ 
@@ -15,11 +18,12 @@ class Application(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
     applicant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='applications')
     cover_letter = models.TextField()
-    resume = models.FileField(upload_to='application_resumes/')
+    resume = BlobFileField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True, help_text="Admin notes")
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    reviewed_at = models.DateTimeField(null=True, blank=True, editable=False, help_text="When it first left pending")
     
     class Meta:
         db_table = 'applications'
@@ -30,7 +34,141 @@ class Application(models.Model):
             models.Index(fields=['applicant']),
             models.Index(fields=['job']),
             models.Index(fields=['-applied_at']),
+            models.Index(fields=['job', '-applied_at'], name='application_job_id_710e05_idx'),
+            models.Index(fields=['applicant', '-applied_at'], name='application_applica_737f06_idx'),
         ]
     
     def __str__(self):
         return f"{self.applicant.email} - {self.job.title}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of the stored row, used by signal handlers to diff changes
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        if self.status != 'pending' and self.reviewed_at is None:
+            self.reviewed_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'reviewed_at'}
+        update_fields = kwargs.get('update_fields')
+        counted = update_fields is None or bool({'status', 'reviewed_at'} & set(update_fields))
+        self.__dict__.pop('_funnel_values', None)
+        if self._state.adding or not counted:
+            super().save(*args, **kwargs)
+        else:
+            from .funnel import lock_funnel_values
+            using = kwargs.get('using') or router.db_for_write(Application, instance=self)
+            with transaction.atomic(using=using):
+                # Read by the funnel signal handler and update_status instead of the possibly stale _loaded_values
+                self._funnel_values = lock_funnel_values(self, using)
+                if self._funnel_values and self._funnel_values['reviewed_at']:
+                    # Keep the first review time, even if set since this instance was read
+                    self.reviewed_at = self._funnel_values['reviewed_at']
+                super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+class ApplicationStatusChange(models.Model):
+    """Audit trail of status changes made by recruiters."""
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='status_changes')
+    from_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='application_status_changes'
+    )
+    changed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'application_status_changes'
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['application', '-changed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.application_id}: {self.from_status} -> {self.to_status}"
+
+class JobFunnel(models.Model):
+    """
+    Applications per status for one job, plus time to first review, kept
+    current on every application write (see ``funnel.py``) so dashboards
+    never group the applications table.
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='funnel')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    pending = models.IntegerField(default=0)
+    reviewed = models.IntegerField(default=0)
+    shortlisted = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    accepted = models.IntegerField(default=0)
+    reviews = models.IntegerField(default=0, help_text="Applications that have left pending")
+    review_seconds = models.BigIntegerField(default=0, help_text="Total time from applying to first review")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'job_funnels'
+        indexes = [
+            models.Index(fields=['category']),
+        ]
+    
+    def __str__(self):
+        return f"Funnel for job {self.job_id}"
+
+class ApplicationDocument(models.Model):
+    """
+    Plain text of an application's resume and cover letter, extracted once in
+    the background (see ``screening.py``) so applicants can be searched
+    without opening their files.
+    """
+    application = models.OneToOneField(
+        Application, on_delete=models.CASCADE, primary_key=True, related_name='document'
+    )
+    resume_name = models.CharField(max_length=255, blank=True, help_text="Stored resume the text came from")
+    resume_text = models.TextField(blank=True)
+    cover_letter = models.TextField(blank=True)
+    extraction_error = models.CharField(max_length=255, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    extracted_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'application_documents'
+        indexes = [
+            models.Index(fields=['resume_name']),
+        ]
+    
+    def __str__(self):
+        return f"Document for application {self.application_id}"
+
+class ArchivedApplication(models.Model):
+    """
+    An application moved to the archive with its job (see
+    ``apps.jobs.expiry``). The resume blob stays referenced from here, and
+    the status changes are kept in ``status_history``.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    job = models.ForeignKey(ArchivedJob, on_delete=models.CASCADE, related_name='applications')
+    applicant = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_applications'
+    )
+    cover_letter = models.TextField()
+    resume = BlobFileField()
+    status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    notes = models.TextField(blank=True)
+    applied_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    status_history = models.JSONField(default=list, blank=True, help_text="from, to, changed_by and changed_at of each change")
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'applications_archive'
+        ordering = ['-applied_at']
+    
+    def __str__(self):
+        return f"Application {self.pk} to archived job {self.job_id}"
@@ -0,0 +1,13 @@
+# apps/applications/permissions.py
+from rest_framework import permissions
+
+class IsAdminUser(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated and request.user.is_admin()
+
+class IsApplicantOrAdmin(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated
+    
+    def has_object_permission(self, request, view, obj):
+        return obj.applicant == request.user or request.user.is_admin()
@@ -0,0 +1,144 @@
+# apps/applications/screening.py
+"""
+Keyword screening of applicants.
+
+When an application arrives, or its resume or cover letter changes, a
+background task extracts the plain text of the resume (PDF, DOCX or text)
+into ``ApplicationDocument`` next to a copy of the cover letter. Resumes are
+content-addressed, so a file already extracted for another application is
+not read again. Searches rank those documents and never open a file: on
+PostgreSQL through ``ApplicationDocument.search_vector``, kept current by a
+trigger and served from a GIN index; elsewhere by scoring the job's
+documents in Python.
+"""
+import os
+import zipfile
+from collections import Counter
+from xml.etree import ElementTree
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from pypdf import PdfReader
+
+from apps.jobs.search import SEARCH_CONFIG, WEIGHT_VALUES, tokenize, uses_search_vector
+from .models import ApplicationDocument
+
+# Longer documents are truncated; PostgreSQL caps a tsvector at 1 MB
+MAX_TEXT_LENGTH = 200_000
+
+# (field, weight) pairs making up the search document, as in the trigger
+SEARCH_DOCUMENT = [
+    ('resume_text', 'A'),
+    ('cover_letter', 'B'),
+]
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def extract_pdf(file):
+    return '\n'.join(page.extract_text() or '' for page in PdfReader(file).pages)
+
+
+def extract_docx(file):
+    with zipfile.ZipFile(file) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    return '\n'.join(
+        ''.join(node.text or '' for node in paragraph.iter(f'{WORD_NAMESPACE}t'))
+        for paragraph in root.iter(f'{WORD_NAMESPACE}p')
+    )
+
+
+def extract_plain(file):
+    return file.read(MAX_TEXT_LENGTH * 4).decode('utf-8', errors='replace')
+
+
+EXTRACTORS = {
+    '.pdf': extract_pdf,
+    '.docx': extract_docx,
+    '.txt': extract_plain,
+    '.md': extract_plain,
+}
+
+
+def extract_text(file, name):
+    """Plain text of an open binary ``file``; empty for formats we cannot read."""
+    extractor = EXTRACTORS.get(os.path.splitext(name)[1].lower())
+    if extractor is None:
+        return ''
+    return ' '.join(extractor(file).replace('\x00', '').split())[:MAX_TEXT_LENGTH]
+
+
+def extract_resume(resume):
+    """``(text, error)`` for a resume ``FieldFile``, reusing earlier extractions of the same blob."""
+    previous = (
+        ApplicationDocument.objects.filter(resume_name=resume.name, extraction_error='')
+        .values_list('resume_text', flat=True).first()
+    )
+    if previous is not None:
+        return previous, ''
+    try:
+        with resume.open('rb') as file:
+            return extract_text(file, resume.name), ''
+    except FileNotFoundError:
+        return '', 'Resume file is missing'
+    except OSError:
+        # Storage trouble is worth retrying; the task queue does so
+        raise
+    except Exception as exc:
+        # A corrupt or unreadable file will not improve on retry
+        return '', f'{type(exc).__name__}: {exc}'[:255]
+
+
+def update_document(application):
+    """Create or refresh the search document of ``application``."""
+    resume_name = application.resume.name or ''
+    document = ApplicationDocument.objects.filter(pk=application.pk).first()
+    values = {'cover_letter': application.cover_letter}
+    if document is None or document.resume_name != resume_name:
+        text, error = extract_resume(application.resume) if resume_name else ('', '')
+        values.update(resume_name=resume_name, resume_text=text, extraction_error=error)
+    ApplicationDocument.objects.update_or_create(application_id=application.pk, defaults=values)
+
+
+def document_rank(values, terms):
+    """Rank of a document containing every term in ``terms``, else ``None``."""
+    weights = Counter()
+    for field, weight in SEARCH_DOCUMENT:
+        for token in tokenize(values[field]):
+            if token in terms:
+                weights[token] += WEIGHT_VALUES[weight]
+    if len(weights) < len(terms):
+        return None
+    return sum(weights.values())
+
+
+def rank_applications(queryset, text):
+    """
+    Restrict ``queryset`` to applications whose documents match ``text``,
+    annotated with ``search_rank`` and ordered best match first.
+    """
+    if uses_search_vector(queryset.db):
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        queryset = queryset.filter(document__search_vector=query).annotate(
+            search_rank=Cast(SearchRank(F('document__search_vector'), query), FloatField())
+        )
+    else:
+        terms = set(tokenize(text))
+        documents = ApplicationDocument.objects.filter(
+            application__in=queryset.order_by().values('pk')
+        ).values('pk', *(field for field, _ in SEARCH_DOCUMENT))
+        ranks = {}
+        for values in documents:
+            rank = document_rank(values, terms)
+            if rank is not None:
+                ranks[values['pk']] = rank
+        if not ranks:
+            return queryset.none()
+        queryset = queryset.filter(pk__in=list(ranks)).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(rank)) for pk, rank in ranks.items()],
+                output_field=FloatField(),
+            )
+        )
+    return queryset.order_by('-search_rank', *(queryset.query.order_by or queryset.model._meta.ordering))
@@ -0,0 +1,103 @@
+# apps/applications/serializers.py
+from django.utils import timezone
+from rest_framework import serializers
+from .models import Application, ArchivedApplication
+from apps.jobs.serializers import JobListSerializer
+from apps.authentication.serializers import UserSerializer
+
+class ApplicationCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Application
+        fields = ['id', 'job', 'cover_letter', 'resume']
+        read_only_fields = ['id']
+    
+    def validate_job(self, job):
+        if not job.is_active:
+            raise serializers.ValidationError("This job is no longer accepting applications")
+        # Until expire_jobs catches up, a job past its deadline is still active
+        if job.application_deadline and job.application_deadline < timezone.localdate():
+            raise serializers.ValidationError("The application deadline for this job has passed")
+        return job
+    
+    def validate(self, data):
+        user = self.context['request'].user
+        if Application.objects.filter(job=data['job'], applicant=user).exists():
+            raise serializers.ValidationError("You have already applied for this job")
+        return data
+
+class ApplicationListSerializer(serializers.ModelSerializer):
+    job_title = serializers.CharField(source='job.title', read_only=True)
+    company_name = serializers.CharField(source='job.company_name', read_only=True)
+    applicant_name = serializers.CharField(source='applicant.full_name', read_only=True)
+    applicant_email = serializers.EmailField(source='applicant.email', read_only=True)
+    
+    class Meta:
+        model = Application
+        fields = [
+            'id', 'job', 'job_title', 'company_name', 'applicant_name',
+            'applicant_email', 'status', 'applied_at'
+        ]
+        field_sources = {'applicant_name': ['applicant__first_name', 'applicant__last_name']}
+
+class ApplicationMatchSerializer(ApplicationListSerializer):
+    search_rank = serializers.FloatField(read_only=True)
+    
+    class Meta(ApplicationListSerializer.Meta):
+        fields = ApplicationListSerializer.Meta.fields + ['search_rank']
+
+class ApplicationDetailSerializer(serializers.ModelSerializer):
+    job = JobListSerializer(read_only=True)
+    applicant = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = Application
+        fields = [
+            'id', 'job', 'applicant', 'cover_letter', 'resume', 'status',
+            'notes', 'applied_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'job', 'applicant', 'status', 'notes', 'applied_at', 'updated_at']
+
+class ApplicationStatusUpdateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Application
+        fields = ['status', 'notes']
+
+class ApplicationBulkStatusSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Application.STATUS_CHOICES)
+    notes = serializers.CharField(required=False, allow_blank=True)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False,
+        help_text='Applications to change; omit to use the job/status query filters'
+    )
+
+class ApplicationBulkStatusResultSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    matched = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    unchanged = serializers.IntegerField()
+    not_allowed = serializers.DictField(child=serializers.IntegerField())
+
+class ApplicationFunnelSerializer(serializers.Serializer):
+    job = serializers.IntegerField(allow_null=True)
+    category = serializers.IntegerField(allow_null=True)
+    pending = serializers.IntegerField()
+    reviewed = serializers.IntegerField()
+    shortlisted = serializers.IntegerField()
+    rejected = serializers.IntegerField()
+    accepted = serializers.IntegerField()
+    total = serializers.IntegerField()
+    reviews = serializers.IntegerField(help_text='Applications that have left pending')
+    avg_time_to_review = serializers.FloatField(allow_null=True, help_text='Mean seconds from applying to first review')
+
+class ArchivedApplicationSerializer(serializers.ModelSerializer):
+    job_title = serializers.CharField(source='job.title', read_only=True)
+    company_name = serializers.CharField(source='job.company_name', read_only=True)
+    applicant_email = serializers.EmailField(source='applicant.email', read_only=True)
+    
+    class Meta:
+        model = ArchivedApplication
+        fields = [
+            'id', 'job', 'job_title', 'company_name', 'applicant', 'applicant_email', 'cover_letter',
+            'resume', 'status', 'notes', 'status_history', 'applied_at', 'updated_at', 'reviewed_at',
+            'archived_at'
+        ]
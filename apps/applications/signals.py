@@ -0,0 +1,64 @@
+# apps/applications/signals.py
+from collections import Counter
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from apps.jobs.models import Job
+from . import tasks
+from .funnel import adjust_funnels, application_deltas, count_new_application, lock_funnel_values, seconds_between
+from .models import Application, JobFunnel
+
+@receiver(post_save, sender=Application)
+def increment_job_applications_count(sender, instance, created, **kwargs):
+    if created:
+        Job.objects.filter(pk=instance.job_id).update(applications_count=F('applications_count') + 1)
+
+@receiver(post_delete, sender=Application)
+def decrement_job_applications_count(sender, instance, **kwargs):
+    Job.objects.filter(pk=instance.job_id).update(applications_count=Greatest(F('applications_count') - 1, 0))
+
+@receiver(post_save, sender=Application)
+def queue_text_extraction(sender, instance, created, **kwargs):
+    old_values = {} if created else getattr(instance, '_loaded_values', {})
+    old_resume = old_values.get('resume')
+    if (
+        created or getattr(old_resume, 'name', old_resume) != instance.resume.name
+        or old_values.get('cover_letter') != instance.cover_letter
+    ):
+        tasks.extract_application_text.enqueue(instance.pk)
+
+@receiver(post_save, sender=Application)
+def update_job_funnel(sender, instance, created, using, **kwargs):
+    if created:
+        count_new_application(instance, using)
+        return
+    # The row as stored before this save, locked by Application.save
+    stored = getattr(instance, '_funnel_values', None)
+    if stored is None:
+        # update_fields left status and reviewed_at alone, or the row is gone
+        return
+    deltas = Counter()
+    if stored['status'] != instance.status:
+        deltas.update({stored['status']: -1, instance.status: 1})
+    if stored['reviewed_at'] is None and instance.reviewed_at:
+        deltas['reviews'] += 1
+        deltas['review_seconds'] += seconds_between(instance.applied_at, instance.reviewed_at)
+    adjust_funnels({instance.job_id: deltas}, using)
+
+@receiver(pre_delete, sender=Application)
+def lock_deleted_application(sender, instance, using, **kwargs):
+    # Of two concurrent deletes only the first still finds the row to count
+    instance._funnel_values = lock_funnel_values(instance, using)
+
+@receiver(post_delete, sender=Application)
+def remove_from_job_funnel(sender, instance, using, **kwargs):
+    stored = instance.__dict__.pop('_funnel_values', None)
+    if stored is not None:
+        adjust_funnels({instance.job_id: application_deltas(stored, sign=-1)}, using)
+
+@receiver(post_save, sender=Job)
+def move_job_funnel(sender, instance, created, **kwargs):
+    old_category_id = getattr(instance, '_loaded_values', {}).get('category_id', instance.category_id)
+    if not created and old_category_id != instance.category_id:
+        JobFunnel.objects.filter(job=instance).update(category_id=instance.category_id)
@@ -0,0 +1,13 @@
+# apps/applications/tasks.py
+from apps.core.taskqueue import task
+from .models import Application
+from .screening import update_document
+
+
+@task()
+def extract_application_text(application_id):
+    """Index the resume and cover letter text of an application for screening."""
+    application = Application.objects.filter(pk=application_id).only('resume', 'cover_letter').first()
+    # Withdrawn before the task ran
+    if application is not None:
+        update_document(application)
@@ -1,3 +1,292 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.authentication.authentication import user_cache
+from apps.authentication.models import User
+from apps.core.models import StoredBlob, Task
+from apps.core.storage import blob_storage, collect_blobs
+from apps.core.taskqueue import run_pending
+from apps.core.testing import QueryBudgetMixin
+from apps.jobs.models import Job, Category
+from .funnel import rebuild_funnels
+from .models import Application, ApplicationDocument, ApplicationStatusChange, JobFunnel
 
-# Create your tests here.
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ApplicationQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        cls.applicant = User.objects.create_user(
+            email='jane@example.com', password='pass12345', first_name='Jane', last_name='Doe'
+        )
+        category = Category.objects.create(name='Engineering', slug='engineering')
+        cls.jobs = [
+            Job.objects.create(
+                title=f'Engineer {index}', description='Build things', category=category,
+                company_name='Andela', location='Nairobi', job_type='full-time',
+                requirements='python', responsibilities='Ship features', posted_by=cls.admin,
+            )
+            for index in range(10)
+        ]
+        applicants = [cls.applicant] + [
+            User.objects.create_user(email=f'applicant{index}@example.com', password='pass12345')
+            for index in range(5)
+        ]
+        for job in cls.jobs:
+            for applicant in applicants:
+                Application.objects.create(
+                    job=job, applicant=applicant, cover_letter='Hire me', resume='application_resumes/cv.pdf'
+                )
+        # The placeholder resumes do not exist, so skip extracting them
+        Task.objects.all().delete()
+
+    def test_admin_list_budget_is_independent_of_page_size(self):
+        self.client.force_authenticate(self.admin)
+        # validator aggregate, COUNT, page
+        self.assertBudgetIndependentOf(3, [5, 50], 'get', '/api/applications/')
+
+    def test_applicant_list_budget_is_independent_of_page_size(self):
+        self.client.force_authenticate(self.applicant)
+        self.assertBudgetIndependentOf(3, [5, 50], 'get', '/api/applications/')
+
+    def test_detail(self):
+        self.client.force_authenticate(self.applicant)
+        application = self.applicant.applications.first()
+        self.assertEndpointBudget(2, 'get', f'/api/applications/{application.pk}/')
+
+    def test_my_applications(self):
+        self.client.force_authenticate(self.applicant)
+        response = self.assertEndpointBudget(1, 'get', '/api/applications/my_applications/')
+        self.assertEqual(len(response.data), 10)
+
+    def test_by_job(self):
+        self.client.force_authenticate(self.admin)
+        response = self.assertEndpointBudget(1, 'get', f'/api/applications/job/{self.jobs[0].pk}/')
+        self.assertEqual(len(response.data), 6)
+
+    def test_by_job_streams_exports_to_admins_only(self):
+        url = f'/api/applications/job/{self.jobs[0].pk}/'
+        self.client.force_authenticate(self.applicant)
+        self.assertEqual(self.client.get(url, {'format': 'csv'}).status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        with self.assertMaxQueries(1):
+            response = self.client.get(url, {'format': 'ndjson'})
+            rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        filename = f'applications-job-{self.jobs[0].pk}.ndjson'
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{filename}"')
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row['job'] for row in rows}, {self.jobs[0].pk})
+        # Detail views do not offer the export formats
+        application = Application.objects.filter(job=self.jobs[0]).first()
+        self.assertEqual(self.client.get(f'/api/applications/{application.pk}/', {'format': 'csv'}).status_code, 404)
+
+    async def test_async_reads_match_sync(self):
+        authorization = f'Bearer {AccessToken.for_user(self.applicant)}'
+        expected = await sync_to_async(self.client.get)(
+            '/api/applications/my_applications/', HTTP_AUTHORIZATION=authorization
+        )
+        with self.settings(ROOT_URLCONF='job_board.asgi_urls', SERVER_TIMING_ENABLED=True):
+            user_cache.clear()
+            response = await self.async_client.get(
+                '/api/applications/my_applications/', headers={'Authorization': authorization}
+            )
+            listing = await self.async_client.get(
+                '/api/applications/', {'page_size': 5}, headers={'Authorization': authorization}
+            )
+            anonymous = await self.async_client.get('/api/applications/my_applications/')
+        self.assertEqual(response.json(), expected.json())
+        # user lookup, applications
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertEqual(listing.json()['count'], 10)
+        self.assertEqual(anonymous.status_code, 401)
+
+    def test_apply_keeps_counter_in_step(self):
+        job = self.jobs[0]
+        user = User.objects.create_user(email='new@example.com', password='pass12345')
+        self.client.force_authenticate(user)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            # job lookup, duplicate check, INSERT, counter UPDATE, blob reference upsert, extraction task INSERT,
+            # funnel upsert
+            self.assertEndpointBudget(7, 'post', '/api/applications/', {
+                'job': job.pk, 'cover_letter': 'Hire me',
+                'resume': SimpleUploadedFile('cv.pdf', b'%PDF-1.4', content_type='application/pdf'),
+            }, status_code=201, format='multipart')
+        job.refresh_from_db()
+        self.assertEqual(job.applications_count, 7)
+
+    def test_bulk_status_applies_allowed_transitions_in_constant_queries(self):
+        self.client.force_authenticate(self.admin)
+        job = self.jobs[0]
+        Application.objects.filter(job=job, applicant=self.applicant).update(status='accepted')
+        # job filter lookup, locking SELECT, UPDATE, funnel UPDATE, audit INSERT
+        # (+2 savepoint statements under test)
+        response = self.assertEndpointBudget(
+            7, 'patch', f'/api/applications/bulk-status/?job={job.pk}', {'status': 'rejected'}, format='json'
+        )
+        self.assertEqual(
+            (response.data['matched'], response.data['updated'], response.data['not_allowed']),
+            (6, 5, {'accepted': 1}),
+        )
+        self.assertEqual(ApplicationStatusChange.objects.filter(to_status='rejected', changed_by=self.admin).count(), 5)
+
+        ids = list(Application.objects.filter(status='pending').values_list('pk', flat=True))
+        response = self.assertEndpointBudget(
+            6, 'patch', '/api/applications/bulk-status/', {'status': 'reviewed', 'ids': ids}, format='json'
+        )
+        self.assertEqual(response.data['updated'], len(ids))
+        changes = ApplicationStatusChange.objects.filter(to_status='reviewed', changed_by=self.admin)
+        self.assertEqual(dict(changes.values_list('application_id', 'from_status')), dict.fromkeys(ids, 'pending'))
+
+    def test_funnel_stats_follow_every_write(self):
+        self.client.force_authenticate(self.admin)
+        first, second = self.jobs[-1], self.jobs[-2]
+        application = first.applications.first()
+        self.client.patch(f'/api/applications/{application.pk}/update_status/', {'status': 'reviewed'}, format='json')
+        self.client.patch(f'/api/applications/bulk-status/?job={first.pk}&status=pending', {'status': 'rejected'})
+        second.applications.first().delete()
+
+        response = self.assertEndpointBudget(1, 'get', '/api/applications/stats/', {'group_by': 'job', 'limit': 2})
+        rows = {row['job']: row for row in response.data}
+        self.assertEqual(
+            [rows[first.pk][status] for status in ('pending', 'reviewed', 'rejected', 'total', 'reviews')],
+            [0, 1, 5, 6, 6],
+        )
+        self.assertIsNotNone(rows[first.pk]['avg_time_to_review'])
+        self.assertEqual((rows[second.pk]['pending'], rows[second.pk]['reviews']), (5, 0))
+        totals = self.client.get('/api/applications/stats/', {'group_by': 'total'}).data
+
+        rebuild_funnels()
+        rebuilt = self.client.get('/api/applications/stats/', {'group_by': 'total'}).data
+        # Incremental updates add whole seconds per application, the rebuild truncates the sum
+        self.assertAlmostEqual(rebuilt[0].pop('avg_time_to_review'), totals[0].pop('avg_time_to_review'), delta=1)
+        self.assertEqual(rebuilt, totals)
+        self.assertEqual(totals[0]['total'], 59)
+
+    def test_funnel_counts_each_change_once_from_stale_instances(self):
+        job = self.jobs[0]
+        pk = Application.objects.filter(job=job, status='pending').values_list('pk', flat=True)[0]
+        before = JobFunnel.objects.values('pending', 'reviewed', 'reviews').get(job=job)
+        # Both read the application while it was pending, as two concurrent requests would
+        first, second = Application.objects.get(pk=pk), Application.objects.get(pk=pk)
+        for application in (first, second):
+            application.status = 'reviewed'
+            application.save()
+        self.assertEqual(JobFunnel.objects.values('pending', 'reviewed', 'reviews').get(job=job), {
+            'pending': before['pending'] - 1, 'reviewed': before['reviewed'] + 1, 'reviews': before['reviews'] + 1,
+        })
+
+        first, second = Application.objects.get(pk=pk), Application.objects.get(pk=pk)
+        first.delete()
+        second.delete()
+        self.assertEqual(JobFunnel.objects.values_list('reviewed', flat=True).get(job=job), before['reviewed'])
+
+    def test_bulk_status_requires_a_selection(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch('/api/applications/bulk-status/', {'status': 'rejected'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        for query in ('?job=', '?status=', '?job=&status='):
+            with self.subTest(query=query):
+                response = self.client.patch(
+                    f'/api/applications/bulk-status/{query}', {'status': 'rejected'}, format='json'
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Application.objects.filter(status='rejected').exists())
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ResumeStorageTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user(email='admin@example.com', password='pass12345', role='admin')
+        category = Category.objects.create(name='Engineering', slug='engineering')
+        cls.jobs = [
+            Job.objects.create(
+                title=f'Engineer {index}', description='Build things', category=category,
+                company_name='Andela', location='Nairobi', job_type='full-time',
+                requirements='python', responsibilities='Ship features', posted_by=admin,
+            )
+            for index in range(2)
+        ]
+        cls.applicant = User.objects.create_user(email='jane@example.com', password='pass12345')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = self.settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client.force_authenticate(self.applicant)
+
+    def apply(self, job, content=b'%PDF-1.4 same cv', name='cv.pdf'):
+        return self.client.post('/api/applications/', {
+            'job': job.pk, 'cover_letter': 'Hire me',
+            'resume': SimpleUploadedFile(name, content, content_type='application/pdf'),
+        }, format='multipart')
+
+    def test_identical_resumes_are_stored_once_and_reference_counted(self):
+        for job in self.jobs:
+            self.assertEqual(self.apply(job, name=f'cv-{job.pk}.PDF').status_code, 201)
+        names = set(Application.objects.values_list('resume', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertRegex(name, r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual(len(os.listdir(os.path.dirname(blob_storage().path(name)))), 1)
+        self.assertEqual(StoredBlob.objects.get(name=name).ref_count, 2)
+
+        applications = list(Application.objects.all())
+        applications[0].delete()
+        self.assertEqual(collect_blobs(timedelta(0)), (0, 0))
+        applications[1].delete()
+        self.assertEqual(StoredBlob.objects.get(name=name).ref_count, 0)
+        self.assertEqual(collect_blobs(timedelta(0)), (1, len(b'%PDF-1.4 same cv')))
+        self.assertFalse(blob_storage().exists(name))
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_by_job_ranks_applicants_on_text_extracted_at_upload(self):
+        docx = io.BytesIO()
+        with zipfile.ZipFile(docx, 'w') as archive:
+            archive.writestr('word/document.xml', (
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+                '<w:p><w:r><w:t>Senior Python developer</w:t></w:r></w:p><w:p><w:r><w:t>Django, PostgreSQL</w:t></w:r></w:p>'
+                '</w:body></w:document>'
+            ))
+        resumes = [('cv.docx', docx.getvalue()), ('cv.txt', b'Java and Spring'), ('copy.docx', docx.getvalue())]
+        for index, (name, content) in enumerate(resumes):
+            Application.objects.create(
+                job=self.jobs[0], applicant=User.objects.create_user(email=f'screen{index}@example.com'),
+                cover_letter='I also write Python' if name == 'cv.txt' else 'Hire me',
+                resume=SimpleUploadedFile(name, content),
+            )
+        self.assertEqual(run_pending(), 3)
+        self.assertEqual(ApplicationDocument.objects.filter(resume_text__contains='Python developer').count(), 2)
+
+        self.client.force_authenticate(User.objects.get(email='admin@example.com'))
+        url = f'/api/applications/job/{self.jobs[0].pk}/'
+        response = self.client.get(url, {'q': 'python'})
+        emails = [row['applicant_email'] for row in response.data]
+        self.assertEqual(sorted(emails[:2]), ['screen0@example.com', 'screen2@example.com'])
+        self.assertEqual(emails[2], 'screen1@example.com')
+        self.assertGreater(response.data[0]['search_rank'], response.data[2]['search_rank'])
+        response = self.client.get(url, {'q': 'spring java'})
+        self.assertEqual([row['applicant_email'] for row in response.data], ['screen1@example.com'])
+
+    @override_settings(FILE_UPLOAD_MAX_SIZE=1024)
+    def test_oversized_uploads_are_refused(self):
+        response = self.apply(self.jobs[0], content=b'x' * 4096)
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Application.objects.exists())
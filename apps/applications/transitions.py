@@ -0,0 +1,84 @@
+# apps/applications/transitions.py
+"""
+Application status workflow.
+
+``bulk_transition`` moves every matching application that may make the
+transition with one locking SELECT, one UPDATE, one funnel UPDATE and one
+audit INSERT, whatever the number of rows.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .funnel import adjust_funnels, status_change_deltas
+from .models import Application, ApplicationStatusChange
+
+# Statuses each status may move to in bulk screening; rejected and accepted are final
+ALLOWED_TRANSITIONS = {
+    'pending': {'reviewed', 'shortlisted', 'rejected'},
+    'reviewed': {'shortlisted', 'rejected'},
+    'shortlisted': {'accepted', 'rejected'},
+    'rejected': set(),
+    'accepted': set(),
+}
+
+
+def can_transition(from_status, to_status):
+    return to_status in ALLOWED_TRANSITIONS.get(from_status, set())
+
+
+def record_status_changes(from_statuses, to_status, changed_by):
+    """Write audit rows for ``{application_id: old status}``."""
+    ApplicationStatusChange.objects.bulk_create([
+        ApplicationStatusChange(
+            application_id=application_id, from_status=from_status,
+            to_status=to_status, changed_by=changed_by,
+        )
+        for application_id, from_status in from_statuses.items()
+    ])
+
+
+def bulk_transition(queryset, to_status, changed_by, notes=None):
+    """
+    Move the applications in ``queryset`` to ``to_status`` where allowed.
+
+    Returns a summary: how many matched, were updated or already had the
+    status, and how many were left alone per current status because the
+    transition is not allowed.
+    """
+    with transaction.atomic():
+        rows = queryset.select_related(None).order_by().select_for_update().values_list(
+            'pk', 'status', 'job_id', 'applied_at', 'reviewed_at'
+        )
+        from_statuses, moved, unchanged, not_allowed = {}, [], 0, Counter()
+        for application_id, status, job_id, applied_at, reviewed_at in rows:
+            if status == to_status:
+                unchanged += 1
+            elif can_transition(status, to_status):
+                from_statuses[application_id] = status
+                moved.append((job_id, status, applied_at, reviewed_at))
+            else:
+                not_allowed[status] += 1
+
+        if from_statuses:
+            now = timezone.now()
+            values = {
+                'status': to_status, 'updated_at': now,
+                'reviewed_at': Coalesce(F('reviewed_at'), Value(now, output_field=DateTimeField())),
+            }
+            if notes is not None:
+                values['notes'] = notes
+            Application.objects.filter(pk__in=list(from_statuses)).update(**values)
+            adjust_funnels(status_change_deltas(moved, to_status, now))
+            record_status_changes(from_statuses, to_status, changed_by)
+
+    return {
+        'status': to_status,
+        'matched': len(from_statuses) + unchanged + sum(not_allowed.values()),
+        'updated': len(from_statuses),
+        'unchanged': unchanged,
+        'not_allowed': dict(not_allowed),
+    }
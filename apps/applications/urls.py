@@ -1,9 +1,11 @@
 # apps/applications/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ApplicationViewSet
+from .views import ApplicationViewSet, ArchivedApplicationViewSet
 
 router = DefaultRouter()
+# Before applications/, whose detail route would otherwise match archive/
+router.register(r'applications/archive', ArchivedApplicationViewSet, basename='archived-application')
 router.register(r'applications', ApplicationViewSet, basename='application')
 
 urlpatterns = [
@@ -1,32 +1,53 @@
 # apps/applications/views.py
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Application
+from .funnel import funnel_stats
+from .models import Application, ArchivedApplication, JobFunnel
 from .serializers import (
-    ApplicationCreateSerializer, ApplicationListSerializer,
-    ApplicationDetailSerializer, ApplicationStatusUpdateSerializer
+    ApplicationCreateSerializer, ApplicationListSerializer, ApplicationMatchSerializer,
+    ApplicationDetailSerializer, ApplicationStatusUpdateSerializer,
+    ApplicationBulkStatusSerializer, ApplicationBulkStatusResultSerializer, ApplicationFunnelSerializer,
+    ArchivedApplicationSerializer
 )
 from .permissions import IsApplicantOrAdmin, IsAdminUser
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from .screening import rank_applications
+from .transitions import bulk_transition, record_status_changes
+from apps.core.asyncviews import AsyncReadMixin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.exports import StreamingExportMixin
+from apps.core.fieldsets import FIELDS_PARAMETER, SparseFieldsetMixin
+from apps.core.instrumentation import SerializerTimingMixin
+from apps.core.pagination import OptionalKeysetPagination
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
 @extend_schema_view(
-    list=extend_schema(tags=['Applications'], description='List applications'),
-    retrieve=extend_schema(tags=['Applications'], description='Get application details'),
+    list=extend_schema(tags=['Applications'], description='List applications. Admins can stream the full result with ?format=csv|ndjson',
+                       parameters=[FIELDS_PARAMETER]),
+    retrieve=extend_schema(tags=['Applications'], description='Get application details', parameters=[FIELDS_PARAMETER]),
     create=extend_schema(tags=['Applications'], description='Apply for a job'),
     update=extend_schema(tags=['Applications'], description='Update application'),
     partial_update=extend_schema(tags=['Applications'], description='Partially update application'),
     destroy=extend_schema(tags=['Applications'], description='Withdraw application'),
 )
-class ApplicationViewSet(viewsets.ModelViewSet):
+class ApplicationViewSet(ConditionalGetMixin, SerializerTimingMixin, SparseFieldsetMixin, StreamingExportMixin,
+                         AsyncReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing job applications
     """
-    queryset = Application.objects.select_related('job', 'applicant', 'job__category')
+    queryset = Application.objects.select_related(
+        'job', 'applicant', 'job__category', 'job__posted_by'
+    ).defer('job__search_vector')
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'job']
+    export_filename = 'applications'
+    export_actions = ('list', 'by_job')
+    list_validator_fields = ('updated_at', 'job__updated_at', 'applicant__updated_at')
+    detail_validator_fields = ('updated_at', 'job__updated_at', 'applicant__updated_at')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -35,6 +56,8 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             return ApplicationListSerializer
         elif self.action == 'update_status':
             return ApplicationStatusUpdateSerializer
+        elif self.action == 'bulk_status':
+            return ApplicationBulkStatusSerializer
         return ApplicationDetailSerializer
     
     def get_queryset(self):
@@ -68,20 +91,99 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        # As stored when the save locked the row, which a concurrent request may have changed since it was read
+        old_status = (application._funnel_values or {}).get('status', application.status)
+        if application.status != old_status:
+            record_status_changes({application.pk: old_status}, application.status, request.user)
         return Response(ApplicationDetailSerializer(application).data)
     
     @extend_schema(
         tags=['Applications'],
-        description='Get applications for a specific job (Admin only)',
-        responses={200: ApplicationListSerializer(many=True)}
+        description=(
+            'Change the status of many applications at once (Admin only). Select them with "ids" '
+            'or with the job/status query filters. Only allowed transitions are applied '
+            '(pending -> reviewed/shortlisted/rejected, reviewed -> shortlisted/rejected, '
+            'shortlisted -> accepted/rejected); the response counts what was changed and skipped'
+        ),
+        request=ApplicationBulkStatusSerializer,
+        responses={200: ApplicationBulkStatusResultSerializer}
+    )
+    @action(detail=False, methods=['patch'], url_path='bulk-status', permission_classes=[IsAdminUser])
+    def bulk_status(self, request):
+        serializer = ApplicationBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        # django-filter ignores blank values, so ?job= alone must not select every application
+        if 'ids' in data:
+            queryset = queryset.filter(pk__in=data['ids'])
+        elif not any(
+            value.strip() for field in self.filterset_fields for value in request.query_params.getlist(field)
+        ):
+            raise ValidationError({'ids': ['Provide ids or filter by job and/or status.']})
+        
+        summary = bulk_transition(queryset, data['status'], request.user, notes=data.get('notes'))
+        return Response(ApplicationBulkStatusResultSerializer(summary).data)
+    
+    @extend_schema(
+        tags=['Applications'],
+        description=(
+            'Get applications for a specific job (Admin only). With ?q=, only applicants whose resume '
+            'or cover letter matches, best match first. Stream with ?format=csv|ndjson'
+        ),
+        parameters=[OpenApiParameter('q', str, description='Keywords to screen resumes and cover letters for')],
+        responses={200: ApplicationMatchSerializer(many=True)}
     )
     @action(detail=False, methods=['get'], url_path='job/(?P<job_id>[0-9]+)', 
             permission_classes=[IsAdminUser])
     def by_job(self, request, job_id=None):
         applications = self.get_queryset().filter(job_id=job_id)
-        serializer = ApplicationListSerializer(applications, many=True)
+        serializer_class = ApplicationListSerializer
+        text = request.query_params.get('q', '').strip()
+        if text:
+            # Ranks the text extracted on upload; no resume is opened here
+            applications = rank_applications(applications, text)
+            serializer_class = ApplicationMatchSerializer
+        if self.is_export_request():
+            return self.export_response(
+                applications, serializer_class, filename=f'applications-job-{job_id}'
+            )
+        serializer = serializer_class(applications, many=True)
         return Response(serializer.data)
     
+    @extend_schema(
+        tags=['Applications'],
+        description=(
+            'Recruitment funnel (Admin only): applications per status and mean time to first review, '
+            'per category (default), per job or in total. Read from counts maintained on every write'
+        ),
+        parameters=[
+            OpenApiParameter('group_by', str, enum=['category', 'job', 'total']),
+            OpenApiParameter('job', int, description='Only this job'),
+            OpenApiParameter('category', int, description='Only jobs in this category'),
+            OpenApiParameter('limit', int, description='Maximum jobs when grouping by job (default 100, max 1000)'),
+        ],
+        responses={200: ApplicationFunnelSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser], pagination_class=None)
+    def stats(self, request):
+        params = request.query_params
+        group_by = params.get('group_by', 'category')
+        if group_by not in ('category', 'job', 'total'):
+            raise ValidationError({'group_by': ['Must be one of category, job, total.']})
+        funnels = JobFunnel.objects.all()
+        try:
+            if params.get('job'):
+                funnels = funnels.filter(job_id=int(params['job']))
+            if params.get('category'):
+                funnels = funnels.filter(category_id=int(params['category']))
+            limit = min(max(int(params.get('limit', 100)), 1), 1000)
+        except ValueError:
+            raise ValidationError('job, category and limit must be integers.')
+        rows = funnel_stats(funnels, group_by, limit)
+        return Response(ApplicationFunnelSerializer(rows, many=True).data)
+    
     @extend_schema(
         tags=['Applications'],
         description='Get current user\'s applications',
@@ -89,8 +191,29 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=['get'])
     def my_applications(self, request):
-        applications = Application.objects.filter(
-            applicant=request.user
-        ).select_related('job', 'job__category')
-        serializer = ApplicationListSerializer(applications, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        serializer = ApplicationListSerializer(self.get_my_applications(), many=True)
+        return Response(serializer.data)
+    
+    async def amy_applications(self, request):
+        applications = [application async for application in self.get_my_applications()]
+        return Response(ApplicationListSerializer(applications, many=True).data)
+    
+    def get_my_applications(self):
+        return Application.objects.filter(
+            applicant=self.request.user
+        ).select_related('job', 'applicant').defer('job__search_vector')
+
+@extend_schema_view(
+    list=extend_schema(tags=['Applications'], description='List archived applications (Admin only)'),
+    retrieve=extend_schema(tags=['Applications'], description='Get archived application details (Admin only)'),
+)
+class ArchivedApplicationViewSet(SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only access to the applications of archived jobs
+    """
+    queryset = ArchivedApplication.objects.select_related('job', 'applicant')
+    serializer_class = ArchivedApplicationSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = OptionalKeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['job', 'applicant', 'status']
\ No newline at end of file
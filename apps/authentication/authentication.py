@@ -0,0 +1,118 @@
+# apps/authentication/authentication.py
+"""
+JWT authentication that resolves users from a short-lived in-process cache.
+
+simplejwt's ``JWTAuthentication`` loads the user row on every request. Here
+the row is looked up by the token's ``user_id`` claim in a bounded LRU cache
+with a short TTL; the database is only hit on a miss. Entries are dropped
+when the user is saved or deleted (see ``signals.py``), and the TTL bounds
+how long another worker can serve a stale row.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.core.metrics import metrics
+
+
+class UserCache:
+    """Thread-safe LRU of ``user_id -> (expires_at, user)``."""
+
+    def __init__(self, max_size=None, ttl=None):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+
+    @property
+    def max_size(self):
+        return self._max_size or getattr(settings, 'AUTH_USER_CACHE_SIZE', 10_000)
+
+    @property
+    def ttl(self):
+        return self._ttl if self._ttl is not None else getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache()
+metrics.register_gauge('auth_user_cache.size', lambda: len(user_cache))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = self.load_user(validated_token)
+        # Views may modify request.user; never hand out the cached instance itself
+        return copy.copy(user)
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views; only cache misses leave the event loop."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = await sync_to_async(self.load_user)(validated_token)
+        return copy.copy(user), validated_token
+
+    def get_cached_user(self, validated_token):
+        user = user_cache.get(self.get_user_id(validated_token))
+        if user is not None:
+            metrics.incr('auth_user_cache.hits')
+        return user
+
+    def load_user(self, validated_token):
+        metrics.incr('auth_user_cache.misses')
+        user = super().get_user(validated_token)
+        user_cache.set(self.get_user_id(validated_token), user)
+        return user
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
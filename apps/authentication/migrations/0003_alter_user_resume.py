@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:14
+
+import apps.core.storage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='resume',
+            field=apps.core.storage.BlobFileField(blank=True, null=True, storage=apps.core.storage.blob_storage, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,10 @@
+# apps/authentication/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import user_cache
+from .models import User
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
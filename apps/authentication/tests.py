@@ -1,3 +1,98 @@
-from django.test import TestCase
+from unittest import mock
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.core.testing import QueryBudgetMixin
+from .authentication import UserCache, user_cache
+from .models import User
 
-# Create your tests here.
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class AuthenticationQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        for index in range(20):
+            User.objects.create_user(email=f'user{index}@example.com', password='pass12345')
+
+    def setUp(self):
+        user_cache.clear()
+
+    def obtain_token(self):
+        response = self.client.post('/api/auth/token/', {'email': 'admin@example.com', 'password': 'pass12345'})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['access']
+
+    def test_profile_is_served_from_the_user_cache(self):
+        authorization = f'Bearer {self.obtain_token()}'
+        self.assertEndpointBudget(1, 'get', '/api/auth/profile/', HTTP_AUTHORIZATION=authorization)
+        response = self.assertEndpointBudget(0, 'get', '/api/auth/profile/', HTTP_AUTHORIZATION=authorization)
+        self.assertEqual(response.data['email'], 'admin@example.com')
+
+    def test_user_list_budget_is_independent_of_page_size(self):
+        authorization = f'Bearer {self.obtain_token()}'
+        # COUNT and page, the user itself comes from the cache
+        self.client.get('/api/auth/profile/', HTTP_AUTHORIZATION=authorization)
+        self.assertBudgetIndependentOf(2, [5, 21], 'get', '/api/auth/users/', HTTP_AUTHORIZATION=authorization)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, AUTH_USER_CACHE_TTL=60)
+class CachedJWTAuthenticationTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='jane@example.com', password='pass12345', first_name='Jane', last_name='Doe'
+        )
+
+    def setUp(self):
+        user_cache.clear()
+        self.authorization = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def profile(self, budget, status_code=200):
+        return self.assertEndpointBudget(
+            budget, 'get', '/api/auth/profile/', status_code=status_code, HTTP_AUTHORIZATION=self.authorization
+        )
+
+    def test_saving_the_user_evicts_it(self):
+        self.profile(1)
+        self.assertEqual(self.profile(0).data['role'], 'user')
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION=self.authorization).status_code, 403)
+        user = User.objects.get(pk=self.user.pk)
+        user.role = 'admin'
+        user.save()
+        self.assertEqual(self.profile(1).data['role'], 'admin')
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION=self.authorization).status_code, 200)
+
+    def test_deactivated_and_deleted_users_are_refused(self):
+        self.profile(1)
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        self.profile(1, status_code=401)
+        user.is_active = True
+        user.save()
+        self.profile(1)
+        user.delete()
+        self.profile(1, status_code=401)
+
+    def test_entries_expire_after_the_ttl(self):
+        with mock.patch('apps.authentication.authentication.time.monotonic', return_value=1000.0):
+            self.profile(1)
+            # Writes that bypass the signals are only picked up once the entry expires
+            User.objects.filter(pk=self.user.pk).update(first_name='Janet')
+            self.assertEqual(self.profile(0).data['first_name'], 'Jane')
+        with mock.patch('apps.authentication.authentication.time.monotonic', return_value=1061.0):
+            self.assertEqual(self.profile(1).data['first_name'], 'Janet')
+            self.profile(0)
+
+    def test_cache_is_bounded(self):
+        cache = UserCache(max_size=2, ttl=60)
+        for user_id in (1, 2, 3):
+            cache.set(user_id, f'user {user_id}')
+        self.assertEqual((cache.get(1), len(cache)), (None, 2))
+        # Reads refresh an entry, so the least recently used one goes next
+        cache.get(2)
+        cache.set(4, 'user 4')
+        self.assertEqual([cache.get(user_id) for user_id in (2, 3, 4)], ['user 2', None, 'user 4'])
@@ -6,6 +6,10 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from .serializers import UserRegistrationSerializer, UserSerializer
 from .permissions import IsOwnerOrAdmin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.exports import StreamingExportMixin
+from apps.core.fieldsets import FIELDS_PARAMETER, SparseFieldsetMixin
+from apps.core.instrumentation import SerializerTimingMixin
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
 User = get_user_model()
@@ -37,7 +41,7 @@ class RegisterView(generics.CreateAPIView):
     tags=['Authentication'],
     responses={200: UserSerializer}
 )
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(ConditionalGetMixin, SerializerTimingMixin, generics.RetrieveUpdateAPIView):
     """
     Get or update user profile
     """
@@ -46,18 +50,25 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     
     def get_object(self):
         return self.request.user
+    
+    def get_detail_validators(self):
+        # The profile is the authenticated user, already loaded by authentication
+        return (self.request.user.updated_at,)
 
 @extend_schema(
     tags=['Authentication'],
+    description='List users. Admins can stream the full list with ?format=csv|ndjson',
+    parameters=[FIELDS_PARAMETER],
     responses={200: UserSerializer(many=True)}
 )
-class UserListView(generics.ListAPIView):
+class UserListView(SerializerTimingMixin, SparseFieldsetMixin, StreamingExportMixin, generics.ListAPIView):
     """
     List all users (Admin only)
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    export_filename = 'users'
     
     def get_queryset(self):
         if self.request.user.is_admin():
@@ -0,0 +1,18 @@
+# apps/core/admin.py
+from django.contrib import admin
+from django.utils import timezone
+from .models import Task
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'run_at', 'started_at', 'finished_at']
+    list_filter = ['status', 'name']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'claimed_by', 'lease_expires_at', 'last_error']
+    ordering = ['-created_at']
+    actions = ['requeue']
+    
+    @admin.action(description='Requeue selected tasks now')
+    def requeue(self, request, queryset):
+        queryset.exclude(status='running').update(
+            status='queued', run_at=timezone.now(), attempts=0, last_error='', finished_at=None
+        )
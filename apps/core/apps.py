@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    label = 'core'
+
+    def ready(self):
+        from django.core import checks
+        from django.utils.module_loading import autodiscover_modules
+        from .instrumentation import install_query_timing
+        from .replicas import check_pin_cache
+        from . import taskqueue  # noqa: F401 (registers the queue gauges)
+        install_query_timing()
+        checks.register(check_pin_cache, checks.Tags.caches)
+        # Register the @task functions in every app's tasks.py
+        autodiscover_modules('tasks')
@@ -0,0 +1,169 @@
+# apps/core/asyncviews.py
+"""
+Async read paths for DRF viewsets, served when the project runs under ASGI.
+
+DRF dispatches synchronously, so under ASGI Django runs every view in a worker
+thread. ``async_viewset_view`` dispatches a viewset on the event loop instead:
+actions with an async counterpart (``alist`` for ``list``, ...) are awaited
+and use the async ORM, every other action runs the regular sync view in a
+thread. ``async_urlpatterns`` swaps these views into an existing URLconf.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.urls import URLPattern, URLResolver
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    """
+    ``alist``/``aretrieve`` for a ``GenericAPIView``. Filtering runs in a
+    thread when the request has query parameters, because filter backends
+    may validate them against the database.
+    """
+
+    async def afilter_queryset(self, queryset):
+        if not self.request.query_params:
+            return self.filter_queryset(queryset)
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        paginate = getattr(self.paginator, 'apaginate_queryset', None)
+        if paginate is None:
+            return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+        return await paginate(queryset, self.request, view=self)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(await self.aget_object())
+        return Response(serializer.data)
+
+
+def has_async_action(viewset_class, action):
+    return callable(getattr(viewset_class, f'a{action}', None))
+
+
+async def aauthenticate(request):
+    """``Request._authenticate`` using ``aauthenticate`` where available."""
+    for authenticator in request.authenticators:
+        authenticate = getattr(authenticator, 'aauthenticate', None)
+        try:
+            if authenticate is not None:
+                user_auth_tuple = await authenticate(request)
+            else:
+                user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+        if user_auth_tuple is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+            return
+    request._not_authenticated()
+
+
+async def arender(response):
+    """
+    Render a DRF response and return it as a plain ``HttpResponse``; Django
+    would otherwise call ``render()`` again from a worker thread. Only JSON
+    is rendered on the event loop.
+    """
+    if not isinstance(response, Response):
+        # 304s and streaming exports
+        return response
+    if isinstance(response.accepted_renderer, JSONRenderer):
+        response.render()
+    else:
+        await sync_to_async(response.render)()
+    rendered = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    rendered.cookies = response.cookies
+    return rendered
+
+
+def async_viewset_view(viewset_class, actions, **initkwargs):
+    """
+    Async counterpart of ``viewset_class.as_view(actions, **initkwargs)``.
+    Requests for actions without an async handler run the sync view.
+    """
+    sync_view = viewset_class.as_view(actions, **initkwargs)
+    actions = dict(actions)
+    if 'get' in actions and 'head' not in actions:
+        actions['head'] = actions['get']
+
+    async def view(request, *args, **kwargs):
+        action = actions.get(request.method.lower())
+        if action is None or not has_async_action(viewset_class, action):
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+        self = viewset_class(**initkwargs)
+        self.action_map = actions
+        for method, method_action in actions.items():
+            setattr(self, method, getattr(self, method_action))
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await aauthenticate(request)
+            self.initial(request, *args, **kwargs)
+            response = await getattr(self, f'a{action}')(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return await arender(self.response)
+
+    # What DRF's as_view() exposes, for the schema generator and metrics
+    view.cls = viewset_class
+    view.initkwargs = initkwargs
+    view.actions = actions
+    view.csrf_exempt = True
+    view.__name__ = sync_view.__name__
+    view.__doc__ = sync_view.__doc__
+    return view
+
+
+def async_urlpatterns(patterns):
+    """
+    Copy of ``patterns`` where every viewset route with an async action is
+    served by ``async_viewset_view``.
+    """
+    converted = []
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            entry = URLResolver(
+                entry.pattern, async_urlpatterns(entry.url_patterns), entry.default_kwargs,
+                entry.app_name, entry.namespace,
+            )
+        else:
+            viewset_class = getattr(entry.callback, 'cls', None)
+            actions = getattr(entry.callback, 'actions', None)
+            if actions and any(has_async_action(viewset_class, action) for action in actions.values()):
+                callback = async_viewset_view(viewset_class, actions, **entry.callback.initkwargs)
+                entry = URLPattern(entry.pattern, callback, entry.default_args, entry.name)
+        converted.append(entry)
+    return converted
@@ -0,0 +1,113 @@
+# apps/core/benchmark.py
+"""
+Latency statistics, baseline comparison and an HTTP load generator for the
+benchmark commands.
+"""
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (``pct`` in 0-100)."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(timings_ms, query_counts, errors, elapsed):
+    """Report for one scenario: latency percentiles, throughput and queries."""
+    if not timings_ms:
+        return {'requests': 0, 'errors': errors}
+    return {
+        'requests': len(timings_ms),
+        'errors': errors,
+        'p50_ms': round(percentile(timings_ms, 50), 2),
+        'p95_ms': round(percentile(timings_ms, 95), 2),
+        'p99_ms': round(percentile(timings_ms, 99), 2),
+        'mean_ms': round(statistics.fmean(timings_ms), 2),
+        'max_ms': round(max(timings_ms), 2),
+        'throughput_rps': round(len(timings_ms) / elapsed, 1) if elapsed else None,
+        'queries_mean': round(statistics.fmean(query_counts), 2),
+        'queries_max': max(query_counts),
+    }
+
+
+def compare(current, baseline, max_regression=None):
+    """
+    Compare two benchmark reports scenario by scenario.
+
+    Returns ``(rows, regressions)``: a row per shared scenario with the
+    baseline value, current value and change for p50/p95/p99 and queries,
+    and human-readable descriptions of every p95 slowdown beyond
+    ``max_regression`` percent and every increase in queries per request.
+    """
+    rows = []
+    regressions = []
+    for name, now in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before or not now.get('requests') or not before.get('requests'):
+            continue
+        row = {'scenario': name}
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_max'):
+            old, new = before[key], now[key]
+            change = (new - old) / old * 100 if old else 0.0
+            row[key] = (old, new, round(change, 1))
+        rows.append(row)
+
+        p95_change = row['p95_ms'][2]
+        if max_regression is not None and p95_change > max_regression:
+            regressions.append(f'{name}: p95 {before["p95_ms"]} ms -> {now["p95_ms"]} ms (+{p95_change}%)')
+        if now['queries_max'] > before['queries_max']:
+            regressions.append(f'{name}: queries per request {before["queries_max"]} -> {now["queries_max"]}')
+    return rows, regressions
+
+
+def run_load(base_url, paths, concurrency, duration, headers=None):
+    """
+    Drive ``paths`` round-robin against a running server from ``concurrency``
+    threads, each holding one keep-alive connection, for ``duration``
+    seconds. Returns ``summarize``-style stats plus a per-status count.
+    """
+    url = urlsplit(base_url)
+    deadline = time.perf_counter() + duration
+    timings, statuses, lock = [], {}, threading.Lock()
+
+    def client(offset):
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        local_timings, local_statuses = [], {}
+        index = offset
+        while time.perf_counter() < deadline:
+            path = url.path.rstrip('/') + paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                status = 'error'
+            local_timings.append((time.perf_counter() - started) * 1000)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        connection.close()
+        with lock:
+            timings.extend(local_timings)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    errors = sum(count for status, count in statuses.items() if status == 'error' or status >= 400)
+    result = summarize(timings, [0] * len(timings), errors, time.perf_counter() - started)
+    result.pop('queries_mean', None)
+    result.pop('queries_max', None)
+    result['statuses'] = {str(status): count for status, count in sorted(statuses.items(), key=str)}
+    return result
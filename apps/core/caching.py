@@ -0,0 +1,171 @@
+# apps/core/caching.py
+"""
+Generation-versioned response cache for anonymous reads.
+
+Each model a view depends on has a generation number in the cache. Response
+keys embed the current generations, so bumping a generation when a row is
+saved or deleted makes every older entry unreachable without scanning or
+deleting keys; stale entries simply age out.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .metrics import metrics
+
+GENERATION_PREFIX = 'cache-gen'
+# Entries are ``(data, validators)`` pairs
+RESPONSE_PREFIX = 'cached-response-v2'
+
+
+def _generation_key(model):
+    # A model, or the name of a generation not tied to one model
+    name = model if isinstance(model, str) else model._meta.label_lower
+    return f'{GENERATION_PREFIX}:{name}'
+
+
+def _initial_generation():
+    # Time-based so a generation lost to eviction never reuses an old number
+    return int(time.time() * 1000)
+
+
+def get_generations(models):
+    keys = [_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, _initial_generation(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+async def aget_generations(models):
+    keys = [_generation_key(model) for model in models]
+    generations = await cache.aget_many(keys)
+    for key in keys:
+        if key not in generations:
+            await cache.aadd(key, _initial_generation(), timeout=None)
+            generations[key] = await cache.aget(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(model):
+    key = _generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_generation(), timeout=None)
+    metrics.incr('response_cache.invalidations')
+
+
+def invalidate_on_change(sender, **kwargs):
+    """``post_save`` / ``post_delete`` receiver bumping the sender's generation."""
+    bump_generation(sender)
+
+
+class CachedResponseMixin:
+    """
+    Caches ``list`` and ``retrieve`` responses for anonymous GET requests,
+    keyed on host, path, normalized query string, renderer and the
+    generations of ``cache_dependencies``. Set ``cache_response = False`` to
+    switch it off for a viewset.
+
+    Each entry is stored with ``response_validators``, which
+    ``ConditionalGetMixin`` sets before the response is built, so hits can
+    be validated without a query.
+    """
+    cache_response = True
+    cache_dependencies = ()
+    cache_timeout = None
+    response_validators = None
+
+    def is_cacheable_request(self, request):
+        renderer = getattr(request, 'accepted_renderer', None)
+        return (
+            self.cache_response
+            and getattr(settings, 'RESPONSE_CACHE_ENABLED', True)
+            and request.method == 'GET'
+            and renderer is not None and renderer.format == 'json'
+            and not request.user.is_authenticated
+        )
+
+    def get_response_cache_key(self, request, generations=None):
+        params = sorted(
+            (key, value)
+            for key in request.query_params
+            for value in request.query_params.getlist(key)
+        )
+        if generations is None:
+            generations = get_generations(self.cache_dependencies)
+        raw = repr((request.get_host(), request.path, params, generations))
+        digest = hashlib.md5(raw.encode('utf-8'), usedforsecurity=False).hexdigest()
+        return f'{RESPONSE_PREFIX}:{self.basename}:{self.action}:{digest}'
+
+    def get_cache_timeout(self):
+        return self.cache_timeout or getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60)
+
+    def get_cached_entry(self, request):
+        """The cached ``(data, validators)`` for ``request`` or None, looked up once per request."""
+        if not hasattr(self, '_cache_lookup'):
+            key = self.get_response_cache_key(request)
+            self._cache_lookup = (key, cache.get(key))
+        return self._cache_lookup[1]
+
+    async def aget_cached_entry(self, request):
+        if not hasattr(self, '_cache_lookup'):
+            key = self.get_response_cache_key(request, await aget_generations(self.cache_dependencies))
+            self._cache_lookup = (key, await cache.aget(key))
+        return self._cache_lookup[1]
+
+    def cache_hit(self, data):
+        metrics.incr('response_cache.hits')
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if not self.is_cacheable_request(request):
+            return handler(request, *args, **kwargs)
+
+        entry = self.get_cached_entry(request)
+        if entry is not None:
+            return self.cache_hit(entry[0])
+
+        metrics.incr('response_cache.misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            key = self._cache_lookup[0]
+            cache.set(key, (response.data, self.response_validators), self.get_cache_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
+
+    async def acached_response(self, request, handler, *args, **kwargs):
+        if not self.is_cacheable_request(request):
+            return await handler(request, *args, **kwargs)
+
+        entry = await self.aget_cached_entry(request)
+        if entry is not None:
+            return self.cache_hit(entry[0])
+
+        metrics.incr('response_cache.misses')
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            key = self._cache_lookup[0]
+            await cache.aset(key, (response.data, self.response_validators), self.get_cache_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(request, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(request, super().aretrieve, *args, **kwargs)
@@ -0,0 +1,152 @@
+# apps/core/conditional.py
+"""
+Conditional GET support (ETag / Last-Modified -> 304 Not Modified).
+
+Validators come from a cheap query over ``updated_at``-style columns (an
+aggregate for lists, a single ``values_list`` row for details) that runs
+before anything is serialized. When the client's ``If-None-Match`` or
+``If-Modified-Since`` still matches, the view is skipped entirely.
+
+Views that also use ``CachedResponseMixin`` store the validators with each
+cached response. A cache hit is validated against them, so a cached 200 or
+its 304 never queries; only a miss runs the validator query.
+"""
+import hashlib
+from calendar import timegm
+from datetime import datetime
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .caching import CachedResponseMixin
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag/Last-Modified validators to ``list`` and ``retrieve``.
+
+    ``list_validator_fields`` are aggregated with ``MAX()`` (alongside a row
+    count, so deletions change the validator); ``detail_validator_fields`` are
+    read from the single row being retrieved. Related fields (``category__
+    updated_at``) cover nested representations. Last-Modified is sent only
+    when all validators are timestamps; otherwise clients rely on the ETag.
+    ``alist``/``aretrieve`` are the async counterparts served under ASGI.
+    """
+    list_validator_fields = ('updated_at',)
+    detail_validator_fields = ('updated_at',)
+    conditional_formats = ('json', 'api')
+
+    def get_list_validators(self):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        return self.list_validators_from(queryset.aggregate(**self.list_validator_aggregates()))
+
+    def list_validator_aggregates(self):
+        aggregates = {f'max_{index}': Max(field) for index, field in enumerate(self.list_validator_fields)}
+        return {'total': Count('pk'), **aggregates}
+
+    def list_validators_from(self, values):
+        return [values['total']] + [values[f'max_{index}'] for index in range(len(self.list_validator_fields))]
+
+    def get_detail_validators(self):
+        return self.detail_validator_queryset(self.filter_queryset(self.get_queryset())).first()
+
+    def detail_validator_queryset(self, queryset):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return queryset.filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).values_list(*self.detail_validator_fields)
+
+    async def aget_list_validators(self):
+        queryset = (await self.afilter_queryset(self.get_queryset())).order_by()
+        return self.list_validators_from(await queryset.aaggregate(**self.list_validator_aggregates()))
+
+    async def aget_detail_validators(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        return await self.detail_validator_queryset(queryset).afirst()
+
+    def get_cached_validators(self, request):
+        """The validators stored with the cached response to ``request``, if any."""
+        if isinstance(self, CachedResponseMixin) and self.is_cacheable_request(request):
+            entry = self.get_cached_entry(request)
+            return entry and entry[1]
+        return None
+
+    async def aget_cached_validators(self, request):
+        if isinstance(self, CachedResponseMixin) and self.is_cacheable_request(request):
+            entry = await self.aget_cached_entry(request)
+            return entry and entry[1]
+        return None
+
+    def get_etag(self, request, validators):
+        user = request.user
+        raw = repr((
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            user.pk if user.is_authenticated else None,
+            [value.isoformat() if isinstance(value, datetime) else value for value in validators],
+        ))
+        return 'W/' + quote_etag(hashlib.sha1(raw.encode('utf-8'), usedforsecurity=False).hexdigest())
+
+    def wants_validators(self, request):
+        return request.method in ('GET', 'HEAD') and request.accepted_renderer.format in self.conditional_formats
+
+    def get_conditional_headers(self, request, validators):
+        etag = self.get_etag(request, validators)
+        # Last-Modified is only sound when every validator is a timestamp; counts
+        # (rows deleted, counters bumped) can change without moving updated_at
+        last_modified = None
+        if validators and all(isinstance(value, datetime) for value in validators):
+            last_modified = timegm(max(validators).utctimetuple())
+        return etag, last_modified
+
+    def set_conditional_headers(self, request, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            if request.user.is_authenticated:
+                patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def conditional_response(self, request, get_validators, handler, *args, **kwargs):
+        validators = None
+        if self.wants_validators(request):
+            validators = self.get_cached_validators(request) or get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        self.response_validators = validators
+
+        etag, last_modified = self.get_conditional_headers(request, validators)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.set_conditional_headers(request, response, etag, last_modified)
+
+    async def aconditional_response(self, request, get_validators, handler, *args, **kwargs):
+        validators = None
+        if self.wants_validators(request):
+            validators = await self.aget_cached_validators(request) or await get_validators()
+        if validators is None:
+            return await handler(request, *args, **kwargs)
+        self.response_validators = validators
+
+        etag, last_modified = self.get_conditional_headers(request, validators)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self.set_conditional_headers(request, response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.get_list_validators, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.get_detail_validators, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional_response(request, self.aget_list_validators, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(
+            request, self.aget_detail_validators, super().aretrieve, *args, **kwargs
+        )
@@ -0,0 +1,214 @@
+# apps/core/datasets.py
+"""
+Reproducible synthetic data for benchmarks.
+
+Rows are bulk-inserted in batches, each batch in its own transaction, and
+generation tops up to the requested totals so a run can be resumed or grown.
+Synthetic users share the ``BENCHMARK_EMAIL_DOMAIN`` domain and the
+``BENCHMARK_PASSWORD`` password (hashed once, not per row).
+"""
+import math
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from apps.applications.funnel import rebuild_funnels
+from apps.applications.models import Application
+from apps.jobs.counters import reconcile_counters
+from apps.jobs.geo import resolve_job_locations
+from apps.jobs.models import Category, Job
+from apps.jobs.search import search_index
+from apps.jobs.suggest import suggestion_index
+from .caching import bump_generation
+
+User = get_user_model()
+
+BENCHMARK_EMAIL_DOMAIN = 'bench.example.com'
+BENCHMARK_ADMIN_EMAIL = 'benchmark@example.com'
+BENCHMARK_PASSWORD = 'benchmark-pass-1'
+
+TITLES = [
+    'Backend Engineer', 'Frontend Developer', 'Data Scientist', 'DevOps Engineer',
+    'Product Manager', 'QA Analyst', 'Mobile Developer', 'Site Reliability Engineer',
+    'Machine Learning Engineer', 'Technical Writer', 'Security Analyst', 'UX Designer',
+]
+SENIORITY = ['Junior', 'Mid-level', 'Senior', 'Lead', 'Principal']
+COMPANIES = [
+    'Safaricom', 'Andela', 'Twiga Foods', 'Cellulant', 'Sendy', 'M-Kopa',
+    'Kopo Kopo', 'BRCK', 'Ushahidi', 'Africa\'s Talking', 'Lipa Later', 'Wasoko',
+]
+SKILLS = [
+    'python', 'django', 'postgresql', 'react', 'typescript', 'kubernetes', 'docker',
+    'aws', 'terraform', 'golang', 'kotlin', 'swift', 'pandas', 'pytorch', 'redis',
+    'graphql', 'linux', 'ci/cd', 'figma', 'airflow', 'spark', 'kafka', 'nginx',
+]
+FILLER = (
+    'we are looking for a motivated teammate to join our growing team and help '
+    'build reliable products for millions of customers across the region'
+).split()
+LOCATIONS = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru', 'Eldoret', 'Remote']
+FIRST_NAMES = ['Amina', 'Brian', 'Cynthia', 'David', 'Esther', 'Felix', 'Grace', 'Hassan', 'Irene', 'James']
+LAST_NAMES = ['Otieno', 'Wanjiru', 'Kamau', 'Mwangi', 'Achieng', 'Kiprop', 'Njoroge', 'Mutua', 'Chebet', 'Odhiambo']
+CATEGORIES = [
+    ('engineering', 'Engineering'), ('data', 'Data'), ('design', 'Design'), ('product', 'Product'),
+    ('operations', 'Operations'), ('marketing', 'Marketing'), ('sales', 'Sales'), ('finance', 'Finance'),
+]
+STATUS_WEIGHTS = [('pending', 60), ('reviewed', 20), ('shortlisted', 10), ('rejected', 8), ('accepted', 2)]
+
+
+def benchmark_email(index):
+    return f'user{index}@{BENCHMARK_EMAIL_DOMAIN}'
+
+
+def benchmark_users():
+    return User.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}')
+
+
+def fake_job(rng, user, categories):
+    skills = rng.sample(SKILLS, 5)
+    salary_min = rng.randrange(30_000, 300_000, 5_000) if rng.random() < 0.8 else None
+    return Job(
+        title=f'{rng.choice(SENIORITY)} {rng.choice(TITLES)}',
+        company_name=rng.choice(COMPANIES),
+        category=rng.choice(categories),
+        location=rng.choice(LOCATIONS),
+        job_type=rng.choice(Job.JOB_TYPE_CHOICES)[0],
+        salary_min=salary_min,
+        salary_max=salary_min * 2 if salary_min else None,
+        description=' '.join(rng.choices(FILLER, k=60) + skills[:2]),
+        requirements=', '.join(skills),
+        responsibilities=' '.join(rng.choices(FILLER, k=30)),
+        is_active=rng.random() < 0.9,
+        posted_by=user,
+    )
+
+
+def _coprime_step(size, rng):
+    """A stride that visits every index of ``range(size)`` exactly once."""
+    while True:
+        step = rng.randrange(1, size) if size > 1 else 1
+        if math.gcd(step, size) == 1:
+            return step
+
+
+class DatasetGenerator:
+    """
+    Tops the database up to the requested number of categories, synthetic
+    users, jobs and applications. ``progress`` is called with
+    ``(label, done, total)`` after every batch.
+    """
+
+    def __init__(self, seed=42, batch_size=5000, progress=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.progress = progress or (lambda label, done, total: None)
+
+    def generate(self, categories=0, users=0, jobs=0, applications=0):
+        admin = self.ensure_admin()
+        category_rows = self.ensure_categories(categories)
+        self.generate_users(users)
+        self.generate_jobs(jobs, admin, category_rows)
+        self.generate_applications(applications)
+        self.finish()
+
+    def ensure_admin(self):
+        admin, created = User.objects.get_or_create(
+            email=BENCHMARK_ADMIN_EMAIL,
+            defaults={'first_name': 'Bench', 'last_name': 'Mark', 'role': 'admin'},
+        )
+        if created or not admin.has_usable_password():
+            admin.set_password(BENCHMARK_PASSWORD)
+            admin.save(update_fields=['password'])
+        return admin
+
+    def ensure_categories(self, count):
+        wanted = CATEGORIES[:max(count, 1)]
+        wanted += [(f'category-{index}', f'Category {index}') for index in range(len(wanted), count)]
+        return [
+            Category.objects.get_or_create(slug=slug, defaults={'name': name})[0]
+            for slug, name in wanted
+        ]
+
+    def insert(self, label, model, missing, build):
+        """Bulk-insert ``missing`` rows made by ``build(offset, size)``."""
+        done = 0
+        while done < missing:
+            size = min(self.batch_size, missing - done)
+            with transaction.atomic():
+                model.objects.bulk_create(build(done, size), batch_size=self.batch_size, ignore_conflicts=True)
+            done += size
+            self.progress(label, done, missing)
+
+    def generate_users(self, target):
+        existing = benchmark_users().count()
+        password = make_password(BENCHMARK_PASSWORD)
+        rng = self.rng
+
+        def build(offset, size):
+            return [
+                User(
+                    email=benchmark_email(existing + offset + index),
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    password=password,
+                )
+                for index in range(size)
+            ]
+
+        self.insert('users', User, target - existing, build)
+
+    def generate_jobs(self, target, admin, categories):
+        rng = self.rng
+        self.insert(
+            'jobs', Job, target - Job.objects.count(),
+            lambda offset, size: [fake_job(rng, admin, categories) for _ in range(size)],
+        )
+
+    def generate_applications(self, target):
+        """
+        Spread applications round-robin over the synthetic users. Each user
+        walks the job list from a random offset with a stride coprime to its
+        length, so no (job, applicant) pair repeats until the user has
+        applied to every job.
+        """
+        existing = Application.objects.filter(applicant__in=benchmark_users()).count()
+        missing = target - existing
+        if missing <= 0:
+            return
+        user_ids = list(benchmark_users().order_by('pk').values_list('pk', flat=True))
+        job_ids = list(Job.objects.order_by('pk').values_list('pk', flat=True))
+        if not user_ids or not job_ids:
+            return
+        missing = min(missing, len(user_ids) * len(job_ids) - existing)
+        offsets = [self.rng.randrange(len(job_ids)) for _ in user_ids]
+        step = _coprime_step(len(job_ids), self.rng)
+        statuses, weights = zip(*STATUS_WEIGHTS)
+        rng = self.rng
+
+        def build(offset, size):
+            rows = []
+            for number in range(existing + offset, existing + offset + size):
+                user_index, nth = number % len(user_ids), number // len(user_ids)
+                job_index = (offsets[user_index] + nth * step) % len(job_ids)
+                rows.append(Application(
+                    job_id=job_ids[job_index],
+                    applicant_id=user_ids[user_index],
+                    cover_letter='I would love to join your team.',
+                    resume='application_resumes/benchmark.pdf',
+                    status=rng.choices(statuses, weights)[0],
+                ))
+            return rows
+
+        self.insert('applications', Application, missing, build)
+
+    def finish(self):
+        # bulk_create skips the signals that keep counters, caches and indexes current
+        reconcile_counters()
+        rebuild_funnels()
+        resolve_job_locations()
+        bump_generation(Job)
+        bump_generation(Category)
+        search_index.reset()
+        suggestion_index.reset()
@@ -0,0 +1,142 @@
+# apps/core/exports.py
+"""
+Streaming CSV / NDJSON exports for list endpoints.
+
+A view using ``StreamingExportMixin`` answers ``?format=csv`` or
+``?format=ndjson`` with a ``StreamingHttpResponse``. Rows are read with a
+chunked ``QuerySet.iterator()`` and serialized one at a time by a single
+serializer instance, so memory stays flat however many rows are exported.
+"""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.authentication.permissions import IsAdminUser
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the value straight back."""
+
+    def write(self, value):
+        return value
+
+
+def _flatten(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=JSONEncoder)
+    return '' if value is None else value
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def start(self, fieldnames):
+        self.writer = csv.writer(_Echo())
+        return self.writer.writerow(fieldnames)
+
+    def render_row(self, row):
+        return self.writer.writerow([_flatten(value) for value in row.values()])
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Non-streamed payloads, e.g. error responses
+        rows = data if isinstance(data, list) else [data or {}]
+        if not rows:
+            return ''
+        output = [self.start(list(rows[0]))]
+        output.extend(self.render_row(row) for row in rows)
+        return ''.join(output)
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def start(self, fieldnames):
+        return ''
+
+    def render_row(self, row):
+        return json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data or {}]
+        return ''.join(self.render_row(row) for row in rows)
+
+
+EXPORT_RENDERERS = (CSVRenderer, NDJSONRenderer)
+EXPORT_FORMATS = tuple(renderer.format for renderer in EXPORT_RENDERERS)
+
+
+def stream_rows(renderer, queryset, serializer, chunk_size=EXPORT_CHUNK_SIZE):
+    yield renderer.start(list(serializer.fields))
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield renderer.render_row(serializer.to_representation(obj))
+
+
+async def astream_rows(renderer, queryset, serializer, chunk_size=EXPORT_CHUNK_SIZE):
+    """``stream_rows`` for ASGI, which would buffer a sync iterator whole."""
+    yield renderer.start(list(serializer.fields))
+    async for obj in queryset.aiterator(chunk_size=chunk_size):
+        yield renderer.render_row(serializer.to_representation(obj))
+
+
+class StreamingExportMixin:
+    """
+    Adds ``?format=csv|ndjson`` streaming exports to a list view. Exports are
+    restricted to admins and offered only by the actions in ``export_actions``;
+    custom list actions listed there call ``export_response``. Other actions
+    do not negotiate the export formats, so asking for one gives a 404.
+    """
+    export_actions = ('list',)
+    export_permission_classes = [IsAdminUser]
+    export_chunk_size = EXPORT_CHUNK_SIZE
+    export_filename = None
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if getattr(self, 'action', None) in self.export_actions:
+            renderers += [renderer() for renderer in EXPORT_RENDERERS]
+        return renderers
+
+    def is_export_request(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return renderer is not None and renderer.format in EXPORT_FORMATS
+
+    def check_export_permissions(self, request):
+        for permission in [permission() for permission in self.export_permission_classes]:
+            if not permission.has_permission(request, self):
+                self.permission_denied(request, message='Exports are available to admins only.')
+
+    def get_export_serializer(self, serializer_class):
+        return serializer_class(context=self.get_serializer_context())
+
+    def export_response(self, queryset, serializer_class=None, filename=None, asynchronous=False):
+        self.check_export_permissions(self.request)
+        renderer = self.request.accepted_renderer
+        serializer = self.get_export_serializer(serializer_class or self.get_serializer_class())
+        stream = astream_rows if asynchronous else stream_rows
+        response = StreamingHttpResponse(
+            stream(renderer, queryset, serializer, self.export_chunk_size),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        filename = filename or self.export_filename or 'export'
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{renderer.format}"'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if self.is_export_request():
+            return self.export_response(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        if self.is_export_request():
+            queryset = await self.afilter_queryset(self.get_queryset())
+            return self.export_response(queryset, asynchronous=True)
+        return await super().alist(request, *args, **kwargs)
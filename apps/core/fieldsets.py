@@ -0,0 +1,175 @@
+# apps/core/fieldsets.py
+"""
+Sparse fieldsets: ``?fields=id,title,company_name``.
+
+``SparseFieldsetMixin`` trims the serializer to the requested fields and
+selects only the columns those fields read, with ``only()`` across the model
+and the ``select_related`` joins they go through; joins no field needs are
+dropped. Lists do the same for their full serializer when no fields are
+asked for, so text columns only the detail view shows are never read for a
+list.
+
+Columns are found by following each field's ``source`` through the model.
+Serializers name the columns behind computed attributes in
+``Meta.field_sources``; a field whose columns cannot be found loads the
+whole row it reads from.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+FIELDS_PARAM = 'fields'
+
+FIELDS_PARAMETER = OpenApiParameter(
+    FIELDS_PARAM, str, description='Comma-separated fields to return, e.g. id,title; only their columns are read'
+)
+
+
+def row_paths(model, prefix=''):
+    return {prefix + field.name for field in model._meta.concrete_fields}
+
+
+def source_paths(field, model, prefix=''):
+    """ORM paths of the columns ``field`` reads from an instance of ``model``."""
+    if field.source == '*':
+        return row_paths(model, prefix)
+    paths = set()
+    for index, attr in enumerate(field.source_attrs):
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # A property or method: it may read any column of the row
+            return paths | row_paths(model, prefix)
+        path = prefix + model_field.name
+        if not model_field.concrete or model_field.many_to_many:
+            # Reverse and many-to-many relations come from other queries
+            return paths
+        if not model_field.is_relation:
+            return paths | {path}
+        paths.add(path)
+        if index == len(field.source_attrs) - 1:
+            if isinstance(field, BaseSerializer):
+                paths |= serializer_paths(field, model_field.related_model, path + '__')
+            return paths
+        model, prefix = model_field.related_model, path + '__'
+    return paths
+
+
+def serializer_paths(serializer, model, prefix=''):
+    """ORM paths of the columns the readable fields of ``serializer`` need."""
+    if isinstance(serializer, ListSerializer):
+        serializer = serializer.child
+    sources = getattr(getattr(serializer, 'Meta', None), 'field_sources', {})
+    paths = set()
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in sources:
+            paths.update(prefix + path for path in sources[name])
+        else:
+            paths |= source_paths(field, model, prefix)
+    return paths
+
+
+def ordering_paths(queryset):
+    """Model fields the queryset is ordered by; keyset pagination reads them from each row."""
+    model = queryset.model
+    paths = set()
+    for name in queryset.query.order_by or model._meta.ordering:
+        if not isinstance(name, str):
+            continue
+        name = name.lstrip('-')
+        current = model
+        try:
+            for attr in name.split('__'):
+                model_field = current._meta.get_field(attr)
+                current = model_field.related_model if model_field.is_relation else None
+        except (FieldDoesNotExist, AttributeError):
+            # Annotations such as a search rank, and unknown names
+            continue
+        paths.add(name)
+    return paths
+
+
+def prune_columns(queryset, serializer):
+    """
+    ``queryset`` loading only the columns ``serializer`` renders, joined only
+    to the relations those columns live on.
+    """
+    model = queryset.model
+    paths = serializer_paths(serializer, model) | ordering_paths(queryset)
+    deferred, defer = queryset.query.deferred_loading
+    if defer:
+        # Keep columns the view deferred (search vectors) out of whole-row loads
+        paths -= deferred
+    # Every path through a relation needs its join; a path ending at a foreign key reads its column
+    relations = set()
+    for path in paths:
+        parts = path.split('__')
+        relations.update('__'.join(parts[:depth]) for depth in range(1, len(parts)))
+    queryset = queryset.select_related(None)
+    if relations:
+        # select_related() without arguments would follow every foreign key
+        queryset = queryset.select_related(*sorted(relations))
+    return queryset.only(*sorted(paths))
+
+
+def requested_fields(request):
+    """Field names asked for with ``?fields=``, or ``None``."""
+    value = request.query_params.get(FIELDS_PARAM)
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def trim_serializer(serializer, names):
+    fields = (serializer.child if isinstance(serializer, ListSerializer) else serializer).fields
+    for name in list(fields):
+        if name not in names:
+            fields.pop(name)
+    return serializer
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=`` for the ``sparse_actions`` of a ``GenericAPIView``, and
+    column pruning for its list; views without actions count as lists.
+    Unknown field names are a 400.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_action(self):
+        return getattr(self, 'action', 'list')
+
+    def get_sparse_fields(self):
+        if self.get_sparse_action() not in self.sparse_actions:
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            names = requested_fields(self.request)
+            if names is not None:
+                available = list(self.get_serializer_class()().fields)
+                unknown = [name for name in names if name not in available]
+                if unknown or not names:
+                    raise ValidationError({FIELDS_PARAM: [
+                        f'Unknown field(s): {", ".join(unknown) or "none given"}. '
+                        f'Choose from: {", ".join(available)}.'
+                    ]})
+            self._sparse_fields = names
+        return self._sparse_fields
+
+    def sparse_serializer(self, serializer):
+        names = self.get_sparse_fields()
+        return serializer if names is None else trim_serializer(serializer, names)
+
+    def get_serializer(self, *args, **kwargs):
+        return self.sparse_serializer(super().get_serializer(*args, **kwargs))
+
+    def get_export_serializer(self, serializer_class):
+        return self.sparse_serializer(super().get_export_serializer(serializer_class))
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_action() == 'list' or self.get_sparse_fields() is not None:
+            queryset = prune_columns(queryset, self.sparse_serializer(self.get_serializer_class()()))
+        return queryset
@@ -0,0 +1,355 @@
+# apps/core/indexadvisor.py
+"""
+Composite and partial index advice from the queries the app really runs.
+
+Sampled SELECTs (``apps.core.querylog``) are grouped by statement and
+explained on PostgreSQL. On a table of at least ``min_rows`` rows, a sort
+over a scan, a sequential scan with a filter, and an intersection of
+bitmap index scans are findings. Each becomes a candidate index: the
+columns the scan compares for equality, then the sort keys (or else a
+range column), partial on the boolean columns the filter pins, as in
+``(category, -created_at) WHERE is_active``.
+
+A candidate is only proposed once it is shown to help: it is created in a
+transaction that is rolled back, the statements behind it are explained
+again, and it must be used, remove the scan or sort it was derived from
+and lower the planner's cost.
+"""
+import json
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.db import DatabaseError, connection, migrations, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.db.models import Index, Q
+
+from .operations import AddIndexConcurrently
+
+MIN_ROWS = 10000
+
+SORT_NODES = {'Sort', 'Incremental Sort'}
+CONDITION_KEYS = ('Index Cond', 'Recheck Cond', 'Filter')
+
+# "jobs.created_at DESC"; expressions such as a search rank do not match
+SORT_KEY_RE = re.compile(r'^(?:(\w+)\.)?(\w+)( DESC)?(?: NULLS (?:FIRST|LAST))?$')
+# "(category_id = 4)", "((job_type)::text = 'contract'::text)", "(id = ANY (...))"
+EQUALS_RE = re.compile(r'(?<![\w.])(?:\w+\.)?(\w+)\)?(?:::[a-z ]+?)?\s=\s')
+RANGE_RE = re.compile(r'(?<![\w.])(?:\w+\.)?(\w+)\)?(?:::[a-z ]+?)?\s(?:<=|>=|<|>)\s')
+
+
+def walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk(child)
+
+
+def sorted_scan(sort):
+    """The scan of the table ``sort`` orders by: the one its first key names, else its outermost input."""
+    match = SORT_KEY_RE.match(sort['Sort Key'][0])
+    if match and match[1]:
+        return next((node for node in walk(sort) if 'Relation Name' in node and node.get('Alias') == match[1]), None)
+    node = sort
+    while 'Relation Name' not in node:
+        if not node.get('Plans'):
+            return None
+        node = node['Plans'][0]
+    return node
+
+
+def explain(sql, params):
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def model_tables():
+    return {model._meta.db_table: model for model in apps.get_models() if model._meta.managed}
+
+
+def table_rows(tables):
+    """Planner row estimates of ``tables``."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relname = ANY(%s)", [list(tables)]
+        )
+        return {name: max(rows, 0) for name, rows in cursor.fetchall()}
+
+
+def group_statements(samples):
+    """Samples grouped by SQL, slowest in total first."""
+    statements = {}
+    for sample in samples:
+        statement = statements.get(sample['sql'])
+        if statement is None:
+            statement = statements[sample['sql']] = {
+                'sql': sample['sql'], 'params': sample['params'], 'calls': 0, 'ms': 0.0, 'endpoints': set(),
+            }
+        statement['calls'] += 1
+        statement['ms'] += sample['ms']
+        statement['endpoints'].add(sample['endpoint'] or '-')
+    return sorted(statements.values(), key=lambda statement: -statement['ms'])
+
+
+def parse_condition(text, model):
+    """``(equal, ranges, predicate)``: columns of ``model`` compared in ``text``, and booleans it pins."""
+    fields = {field.column: field for field in model._meta.concrete_fields}
+    booleans = [column for column, field in fields.items() if field.get_internal_type() == 'BooleanField']
+    predicate = {}
+    for column in booleans:
+        negated = re.compile(rf'NOT \(?(?:\w+\.)?{column}\b')
+        if negated.search(text):
+            predicate[column] = False
+            text = negated.sub('', text)
+        elif re.search(rf'(?<![\w.])(?:\w+\.)?{column}\b(?!\)?\s(?:=|<>|IS)\s)', text):
+            predicate[column] = True
+
+    def columns(regex):
+        found = []
+        for column in regex.findall(text):
+            if column in fields and column not in booleans and column not in found:
+                found.append(column)
+        return found
+    return columns(EQUALS_RE), columns(RANGE_RE), predicate
+
+
+def sort_columns(sort, scan, model):
+    """``[(column, descending)]``: the leading sort keys that are plain columns of the scanned table."""
+    fields = {field.column for field in model._meta.concrete_fields}
+    found = []
+    for key in sort.get('Sort Key', []):
+        match = SORT_KEY_RE.match(key)
+        if not match or match[1] not in (None, scan.get('Alias'), scan['Relation Name']) or match[2] not in fields:
+            break
+        found.append((match[2], bool(match[3])))
+    return found
+
+
+class Candidate:
+    def __init__(self, model, columns, predicate):
+        self.model = model
+        self.columns = columns
+        self.predicate = predicate
+        self.findings = []
+        self.results = []
+
+    @property
+    def key(self):
+        return self.model._meta.db_table, tuple(self.columns), tuple(sorted(self.predicate.items()))
+
+    def covers(self, other):
+        return (
+            self.model is other.model and self.predicate == other.predicate
+            and self.columns[:len(other.columns)] == other.columns
+        )
+
+    def index(self):
+        field_names = {field.column: field.name for field in self.model._meta.concrete_fields}
+        fields = [('-' if descending else '') + field_names[column] for column, descending in self.columns]
+        condition = None
+        if self.predicate:
+            condition = Q(**{field_names[column]: value for column, value in sorted(self.predicate.items())})
+        # A condition needs a name up front; set_name_with_model replaces it
+        index = Index(fields=fields, condition=condition, name='advised')
+        index.set_name_with_model(self.model)
+        return index
+
+    def __str__(self):
+        columns = ', '.join(column + (' DESC' if descending else '') for column, descending in self.columns)
+        where = ' AND '.join(
+            column if value else f'NOT {column}' for column, value in sorted(self.predicate.items())
+        )
+        return f'{self.model._meta.db_table} ({columns})' + (f' WHERE {where}' if where else '')
+
+
+def findings(plan, tables, rows, min_rows):
+    """``(kind, scan, sort)`` for every problem ``plan`` has on a large table."""
+    def large(scan):
+        return scan is not None and scan['Relation Name'] in tables and rows.get(scan['Relation Name'], 0) >= min_rows
+
+    # Sorts feeding a merge join order by the join key; an index on it is another matter
+    join_sorts = {
+        id(child) for node in walk(plan) if node['Node Type'] == 'Merge Join' for child in node['Plans']
+    }
+    for node in walk(plan):
+        if node['Node Type'] in SORT_NODES and id(node) not in join_sorts:
+            scan = sorted_scan(node)
+            if large(scan) and sort_columns(node, scan, tables[scan['Relation Name']]):
+                yield 'sort', scan, node
+        elif 'Relation Name' in node and large(node):
+            if node['Node Type'] == 'Seq Scan' and node.get('Filter'):
+                yield 'seq scan', node, None
+            elif node['Node Type'] == 'Bitmap Heap Scan' and node['Plans'][0]['Node Type'] == 'BitmapAnd':
+                yield 'index intersection', node, None
+
+
+def column_distinct(tables, rows):
+    """``{(table, column): distinct values}`` from the planner statistics."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT tablename, attname, n_distinct FROM pg_stats WHERE tablename = ANY(%s)', [list(tables)]
+        )
+        # A negative n_distinct is a fraction of the rows
+        return {
+            (table, column): distinct if distinct >= 0 else -distinct * rows.get(table, 0)
+            for table, column, distinct in cursor.fetchall()
+        }
+
+
+def indexed(candidate):
+    """Whether the table already has an index on the candidate's columns, in its order."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, candidate.model._meta.db_table)
+    wanted = [(column, 'DESC' if descending else 'ASC') for column, descending in candidate.columns]
+    return any(
+        name == candidate.index().name
+        or list(zip(constraint['columns'], constraint.get('orders') or ['ASC'] * len(constraint['columns']))) == wanted
+        for name, constraint in constraints.items() if constraint['index']
+    )
+
+
+def candidate_for(scan, sort, model, distinct=None):
+    """
+    The index for a finding: equality columns, most distinct values first,
+    then the sort keys or a range column; ``None`` when nothing fits.
+    """
+    text = ' AND '.join(scan[key] for key in CONDITION_KEYS if scan.get(key))
+    equal, ranges, predicate = parse_condition(text, model)
+    table = model._meta.db_table
+    equal.sort(key=lambda column: -(distinct or {}).get((table, column), 0))
+    unique = {field.column for field in model._meta.concrete_fields if field.unique}
+    if unique.intersection(equal):
+        # At most one row already
+        return None
+    order = [
+        (column, descending) for column, descending in (sort_columns(sort, scan, model) if sort else [])
+        if column not in equal and column not in predicate
+    ]
+    columns = [(column, False) for column in equal] + order
+    if not order and ranges:
+        columns.append((ranges[0], False))
+    if not columns:
+        return None
+    return Candidate(model, columns, predicate)
+
+
+def signature(kind, scan, sort):
+    return kind, scan.get('Alias'), tuple(sort['Sort Key']) if sort else None
+
+
+def verify(candidate, problems):
+    """
+    Create the index in a rolled-back transaction and explain the statements
+    behind it again; ``candidate.results`` gets one row per statement. The
+    plain ``CREATE INDEX`` holds a SHARE lock on the table, blocking writes
+    to it until the transaction ends.
+    ``problems(plan)`` gives the signatures of the findings in a plan.
+    Returns whether any finding is gone.
+    """
+    index = candidate.index()
+    with transaction.atomic():
+        with connection.schema_editor() as editor:
+            editor.add_index(candidate.model, index)
+        for statement, kind, scan, sort in candidate.findings:
+            after = explain(statement['sql'], statement['params'])
+            used = any(node.get('Index Name') == index.name for node in walk(after))
+            before_cost, after_cost = statement['plan']['Total Cost'], after['Total Cost']
+            candidate.results.append({
+                'statement': statement,
+                'problem': kind,
+                'before': before_cost,
+                'after': after_cost,
+                'fixed': used and after_cost < before_cost and signature(kind, scan, sort) not in problems(after),
+            })
+        transaction.set_rollback(True)
+    return any(result['fixed'] for result in candidate.results)
+
+
+def advise(samples, min_rows=MIN_ROWS, top=None):
+    """
+    Explain the sampled statements and verify an index per finding.
+
+    Returns ``(explained, failed, accepted, rejected)``: how many statements
+    were explained and could not be, and the verified and refuted candidates.
+    """
+    statements = group_statements(samples)[:top]
+    tables = model_tables()
+    rows = table_rows(tables)
+    distinct = column_distinct(tables, rows)
+    candidates = {}
+    explained = failed = 0
+    for statement in statements:
+        try:
+            statement['plan'] = explain(statement['sql'], statement['params'])
+        except DatabaseError:
+            # Parameters that did not survive the log, or a statement for another database
+            failed += 1
+            continue
+        explained += 1
+        for kind, scan, sort in findings(statement['plan'], tables, rows, min_rows):
+            candidate = candidate_for(scan, sort, tables[scan['Relation Name']], distinct)
+            if candidate is not None:
+                candidate = candidates.setdefault(candidate.key, candidate)
+                candidate.findings.append((statement, kind, scan, sort))
+
+    candidates = {key: candidate for key, candidate in candidates.items() if not indexed(candidate)}
+    # An index whose columns lead a wider one with the same condition is served by it
+    merged = []
+    for candidate in sorted(candidates.values(), key=lambda candidate: -len(candidate.columns)):
+        wider = next((kept for kept in merged if kept.covers(candidate)), None)
+        if wider is None:
+            merged.append(candidate)
+        else:
+            wider.findings.extend(candidate.findings)
+
+    accepted, rejected = [], []
+    def problems(plan):
+        return {signature(*finding) for finding in findings(plan, tables, rows, min_rows)}
+
+    for candidate in merged:
+        (accepted if verify(candidate, problems) else rejected).append(candidate)
+    return explained, failed, accepted, rejected
+
+
+def model_source(index):
+    """The ``Meta.indexes`` entry for ``index``."""
+    parts = [f'fields={index.fields!r}']
+    if index.condition is not None:
+        parts.append('condition=models.Q({})'.format(
+            ', '.join(f'{name}={value!r}' for name, value in index.condition.children)
+        ))
+    parts.append(f'name={index.name!r}')
+    return f'models.Index({", ".join(parts)})'
+
+
+def write_migrations(candidates):
+    """
+    One migration per app adding the indexes of ``candidates`` without
+    blocking writes (``CREATE INDEX CONCURRENTLY``). Returns the paths written.
+    """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    by_app = {}
+    for candidate in candidates:
+        by_app.setdefault(candidate.model._meta.app_label, []).append(candidate)
+    paths = []
+    for app_label, app_candidates in sorted(by_app.items()):
+        leaf = max(loader.graph.leaf_nodes(app_label))
+        number = int(leaf[1].split('_')[0]) + 1
+        migration = migrations.Migration(f'{number:04d}_advised_indexes', app_label)
+        migration.dependencies = [leaf]
+        migration.operations = [
+            AddIndexConcurrently(model_name=candidate.model._meta.model_name, index=candidate.index())
+            for candidate in app_candidates
+        ]
+        writer = MigrationWriter(migration)
+        # Concurrent index builds cannot run inside a transaction; the writer has no option for it
+        header = 'class Migration(migrations.Migration):\n'
+        source = writer.as_string().replace(header, header + '    atomic = False\n', 1)
+        path = Path(writer.path)
+        path.write_text(source)
+        paths.append(path)
+    return paths
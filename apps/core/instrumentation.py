@@ -0,0 +1,131 @@
+# apps/core/instrumentation.py
+"""
+Per-request performance profile: SQL query count, database time, time spent
+serializing (``serializer.data`` in views using ``SerializerTimingMixin``)
+and rendering the response, collected for whatever request is running in the
+current context. ``ServerTimingMiddleware`` starts a profile per request
+and reports it; the pieces here do the recording.
+
+The profile lives in a context variable, so it follows a request into the
+worker threads the async ORM runs queries on. A sampled profile also keeps
+the SELECTs it ran, for ``apps.core.querylog``.
+"""
+import contextvars
+import functools
+import time
+
+from django.db.backends.signals import connection_created
+from rest_framework.renderers import JSONRenderer
+
+from .querylog import is_sampled
+
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    def __init__(self, sample_queries=False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.endpoint = None
+        self.sampled = [] if sample_queries else None
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if self.sampled is not None and not many and is_sampled(sql):
+                self.sampled.append((sql, params, elapsed * 1000))
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+            f'render;dur={self.render_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+def start_profile(sample_queries=False):
+    profile = RequestProfile(sample_queries)
+    return profile, _current_profile.set(profile)
+
+
+def end_profile(token):
+    _current_profile.reset(token)
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+def _profile_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile.record_query(execute, sql, params, many, context)
+
+
+def _add_query_wrapper(sender, connection, **kwargs):
+    if _profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_profile_query)
+
+
+def install_query_timing():
+    """Time every query on every new connection against the current profile."""
+    connection_created.connect(_add_query_wrapper, dispatch_uid='core-query-timing')
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that adds its rendering time to the current profile."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        profile = _current_profile.get()
+        if profile is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            profile.render_time += time.perf_counter() - started
+
+
+class _TimedData:
+    @property
+    def data(self):
+        profile = _current_profile.get()
+        if profile is None:
+            return super().data
+        started = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            profile.serialize_time += time.perf_counter() - started
+
+
+@functools.lru_cache(maxsize=None)
+def _timed_serializer_class(serializer_class):
+    return type(serializer_class.__name__, (_TimedData, serializer_class), {'__module__': serializer_class.__module__})
+
+
+class SerializerTimingMixin:
+    """
+    Adds the time views spend in ``serializer.data`` to the current profile.
+    List the mixin before other mixins overriding ``get_serializer``.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if not isinstance(serializer, _TimedData):
+            serializer.__class__ = _timed_serializer_class(type(serializer))
+        return serializer
@@ -0,0 +1,93 @@
+# apps/core/management/commands/advise_indexes.py
+import os
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.core import indexadvisor, querylog
+
+
+class Command(BaseCommand):
+    help = (
+        'Explain the SQL the app runs (sampled from live traffic, or replayed from the benchmark scenarios), '
+        'propose composite and partial indexes that remove sequential scans and sorts, and verify each one '
+        'against the current dataset. Verifying builds each candidate with a plain CREATE INDEX in a rolled-back '
+        'transaction, which holds a SHARE lock on its table and blocks writes to it while the index builds: run it '
+        'against a benchmark or staging copy of the data and pass --allow-table-locks'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', action='append', dest='logs', default=[],
+                            help='Query sample log to read (default: QUERY_SAMPLE_LOG); repeatable')
+        parser.add_argument('--replay', type=int, default=0, metavar='REQUESTS',
+                            help='Sample this many requests per benchmark scenario (default: 20 without a log)')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Only replay scenarios starting with this name (repeatable)')
+        parser.add_argument('--min-rows', type=int, default=indexadvisor.MIN_ROWS,
+                            help=f'Ignore tables smaller than this (default: {indexadvisor.MIN_ROWS})')
+        parser.add_argument('--top', type=int, default=50,
+                            help='Explain only the statements with the most total time (default: 50)')
+        parser.add_argument('--write', action='store_true',
+                            help='Write a migration per app adding the verified indexes')
+        parser.add_argument('--allow-table-locks', action='store_true',
+                            help='Confirm that blocking writes to each table while a candidate index builds is '
+                                 'acceptable on this database (required)')
+
+    def handle(self, *args, **options):
+        if not options['allow_table_locks']:
+            raise CommandError(
+                'Verifying candidates builds each index without CONCURRENTLY, blocking writes to its table '
+                'until the build finishes. Run against a benchmark or staging database with --allow-table-locks'
+            )
+        if connection.vendor != 'postgresql':
+            raise CommandError('The index advisor reads PostgreSQL plans; point it at the PostgreSQL database')
+        logs = options['logs'] or [path for path in [settings.QUERY_SAMPLE_LOG] if path and os.path.exists(path)]
+        replay = options['replay'] or (0 if logs else 20)
+
+        samples = []
+        for path in logs:
+            samples.extend(querylog.read_samples(path))
+        if replay:
+            samples.extend(self.replay(replay, options['scenarios']))
+        if not samples:
+            raise CommandError('No queries sampled; set QUERY_SAMPLE_RATE and QUERY_SAMPLE_LOG, or use --replay')
+
+        explained, failed, accepted, rejected = indexadvisor.advise(samples, options['min_rows'], options['top'])
+        self.stdout.write(
+            f'Explained {explained} statements from {len(samples)} sampled queries'
+            + (f' ({failed} could not be explained)' if failed else '')
+        )
+        for candidate in accepted:
+            self.report('Proposed', candidate)
+            self.stdout.write(f'    {indexadvisor.model_source(candidate.index())}')
+        for candidate in rejected:
+            self.report('Rejected', candidate)
+        if not accepted:
+            self.stdout.write('No index to propose')
+            return
+        if options['write']:
+            for path in indexadvisor.write_migrations(accepted):
+                self.stdout.write(f'Wrote {path}')
+            self.stdout.write("Add the proposed indexes to the models' Meta.indexes to keep makemigrations quiet")
+
+    def replay(self, requests, scenarios):
+        with querylog.collecting() as samples:
+            call_command(
+                'run_benchmark', requests=requests, warmup=0, scenarios=scenarios, no_response_cache=True,
+                output=os.devnull, stderr=StringIO(),
+            )
+        return samples
+
+    def report(self, verdict, candidate):
+        self.stdout.write(f'{verdict}: {candidate}')
+        for result in candidate.results:
+            statement = result['statement']
+            outcome = 'removed' if result['fixed'] else 'kept'
+            self.stdout.write(
+                f'    {", ".join(sorted(statement["endpoints"]))}: {result["problem"]} {outcome}, '
+                f'cost {result["before"]:.1f} -> {result["after"]:.1f} '
+                f'({statement["calls"]} calls, {statement["ms"]:.0f} ms sampled)'
+            )
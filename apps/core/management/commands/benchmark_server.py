@@ -0,0 +1,146 @@
+# apps/core/management/commands/benchmark_server.py
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core.benchmark import run_load
+from apps.core.datasets import benchmark_users
+from apps.jobs.models import Job
+
+# gunicorn command lines for each serving mode; the worker count is appended
+SERVERS = {
+    'wsgi': ['-m', 'gunicorn', 'job_board.wsgi:application'],
+    'asgi': ['-m', 'gunicorn', '-k', 'uvicorn.workers.UvicornWorker', 'job_board.asgi:application'],
+}
+STARTUP_TIMEOUT = 30
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the read endpoints over HTTP with many concurrent keep-alive clients, against '
+        'a running server (--url) or WSGI and ASGI servers started for the run (--serve), and '
+        'report throughput and p50/p95/p99 latency as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls', default=[],
+                            help='Base URL of a running server (repeatable)')
+        parser.add_argument('--serve', action='append', choices=sorted(SERVERS), default=[],
+                            help='Start this kind of server on a free port for the run (repeatable)')
+        parser.add_argument('--workers', type=int, default=2, help='Worker processes per started server (default: 2)')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients (default: 32)')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per target (default: 10)')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Path to request, cycled through (repeatable; default: a mix of job, '
+                                 'category and application reads)')
+        parser.add_argument('--anonymous', action='store_true', help='Send no Authorization header')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if not options['urls'] and not options['serve']:
+            raise CommandError('Pass --url and/or --serve')
+        paths = options['paths'] or self.default_paths()
+        headers = {} if options['anonymous'] else self.auth_headers()
+
+        results = {}
+        for url in options['urls']:
+            results[url] = self.run(url, paths, headers, options)
+        for mode in options['serve']:
+            with _Server(mode, options['workers'], self.stderr) as url:
+                results[mode] = self.run(url, paths, headers, options)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'concurrency': options['concurrency'],
+                'duration_s': options['duration'],
+                'workers': options['workers'],
+                'authenticated': bool(headers),
+                'paths': paths,
+            },
+            'targets': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def default_paths(self):
+        job_ids = list(Job.objects.filter(is_active=True).order_by('-pk').values_list('pk', flat=True)[:20])
+        return [
+            '/api/jobs/',
+            '/api/jobs/?job_type=full-time&ordering=salary_min',
+            '/api/categories/',
+            '/api/applications/my_applications/',
+            *(f'/api/jobs/{pk}/' for pk in job_ids[:5]),
+        ]
+
+    def auth_headers(self):
+        # An authenticated user bypasses the anonymous response cache
+        user = benchmark_users().first()
+        if user is None:
+            raise CommandError('No benchmark dataset; run "manage.py generate_dataset" first or pass --anonymous')
+        return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    def run(self, url, paths, headers, options):
+        result = run_load(url, paths, options['concurrency'], options['duration'], headers)
+        self.stderr.write(
+            f'{url:<28} {result.get("throughput_rps", 0):>8} req/s  p50 {result.get("p50_ms")} ms  '
+            f'p95 {result.get("p95_ms")} ms  p99 {result.get("p99_ms")} ms  {result["errors"]} errors'
+        )
+        return result
+
+
+class _Server:
+    """Context manager running one gunicorn server and yielding its base URL."""
+
+    def __init__(self, mode, workers, log):
+        self.mode = mode
+        self.workers = workers
+        self.log = log
+
+    def __enter__(self):
+        port = free_port()
+        command = [
+            sys.executable, *SERVERS[self.mode], '--bind', f'127.0.0.1:{port}',
+            '--workers', str(self.workers), '--log-level', 'warning',
+        ]
+        # Let the server use the same settings, database and urlconf defaults as this process
+        env = {**os.environ, 'ALLOWED_HOSTS': f'{os.environ.get("ALLOWED_HOSTS", "")},127.0.0.1'}
+        self.process = subprocess.Popen(command, env=env)
+        url = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                urllib.request.urlopen(f'{url}/api/categories/', timeout=5).read()
+                break
+            except OSError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.__exit__(None, None, None)
+                    raise CommandError(f'{self.mode} server did not start')
+                time.sleep(0.2)
+        self.log.write(f'Started {self.mode} server on {url} ({self.workers} workers)')
+        return url
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
@@ -0,0 +1,27 @@
+# apps/core/management/commands/collect_blobs.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.core.storage import collect_blobs, reconcile_blob_refs
+
+
+class Command(BaseCommand):
+    help = 'Delete stored upload blobs (resumes) that no row references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help='Keep unreferenced blobs touched within this many hours (default: 24)')
+        parser.add_argument('--reconcile', action='store_true',
+                            help='Recount references from the database first, repairing drift left by '
+                                 'bulk writes or raw SQL')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be done')
+
+    def handle(self, *args, **options):
+        if options['reconcile']:
+            drifted = reconcile_blob_refs(dry_run=options['dry_run'])
+            verb = 'drifted' if options['dry_run'] else 'fixed'
+            self.stdout.write(f'Reference counts: {drifted} blobs {verb}')
+        removed, freed = collect_blobs(timedelta(hours=options['grace_hours']), dry_run=options['dry_run'])
+        verb = 'would be removed' if options['dry_run'] else 'removed'
+        self.stdout.write(f'{removed} blobs {verb} ({freed} bytes)')
@@ -0,0 +1,36 @@
+# apps/core/management/commands/generate_dataset.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.datasets import BENCHMARK_ADMIN_EMAIL, BENCHMARK_PASSWORD, DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = 'Top the database up to a synthetic benchmark dataset using bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000, help='Synthetic users (default: 10000)')
+        parser.add_argument('--jobs', type=int, default=100_000, help='Total jobs (default: 100000)')
+        parser.add_argument('--applications', type=int, default=500_000,
+                            help='Applications by synthetic users (default: 500000)')
+        parser.add_argument('--categories', type=int, default=8, help='Categories (default: 8)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        generator = DatasetGenerator(seed=options['seed'], batch_size=options['batch_size'], progress=self.progress)
+        generator.generate(
+            categories=options['categories'], users=options['users'],
+            jobs=options['jobs'], applications=options['applications'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Dataset ready in {time.perf_counter() - started:.0f} s. '
+            f'Admin: {BENCHMARK_ADMIN_EMAIL}, password for all synthetic users: {BENCHMARK_PASSWORD}'
+        ))
+
+    def progress(self, label, done, total):
+        in_place = done < total and self.stdout.isatty()
+        self.stdout.write(f'{label}: {done}/{total}', ending='\r' if in_place else '\n')
+        self.stdout.flush()
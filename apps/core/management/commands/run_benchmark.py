@@ -0,0 +1,225 @@
+# apps/core/management/commands/run_benchmark.py
+import json
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.applications.models import Application
+from apps.core.benchmark import compare, summarize
+from apps.core.datasets import BENCHMARK_ADMIN_EMAIL, BENCHMARK_PASSWORD, benchmark_users
+from apps.jobs.models import Category, Job
+
+User = get_user_model()
+
+SEARCH_QUERIES = ['python', 'senior backend engineer', 'django postgresql', 'kubernetes', 'safaricom']
+SAMPLE_SIZE = 500
+BENCHMARK_APPLICANT_EMAIL = 'benchmark-applicant@example.com'
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the main API endpoints in-process against the current database and report '
+        'p50/p95/p99 latency, throughput and queries per request as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Measured requests per scenario (default: 100)')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario (default: 5)')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Only run scenarios starting with this name (repeatable)')
+        parser.add_argument('--no-response-cache', action='store_true',
+                            help='Disable the anonymous response cache while measuring')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--baseline', help='JSON report to compare against')
+        parser.add_argument('--max-regression', type=float,
+                            help='Fail when a p95 is this many percent slower than the baseline, '
+                                 'or any scenario needs more queries')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.load_samples()
+
+        scenarios = self.scenarios()
+        if options['scenarios']:
+            scenarios = {
+                name: build for name, build in scenarios.items()
+                if any(name.startswith(prefix) for prefix in options['scenarios'])
+            }
+        if not scenarios:
+            raise CommandError('No scenario matches --scenario')
+
+        media_root = tempfile.mkdtemp()
+        overrides = {
+            # Same as the test runner: the in-process client talks to "testserver"
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+            'MEDIA_ROOT': media_root,
+        }
+        if options['no_response_cache']:
+            overrides['RESPONSE_CACHE_ENABLED'] = False
+        try:
+            with override_settings(**overrides):
+                results = {
+                    name: self.run_scenario(name, build, options['requests'], options['warmup'])
+                    for name, build in scenarios.items()
+                }
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'database': connection.vendor,
+                'dataset': self.dataset_size(),
+                'requests_per_scenario': options['requests'],
+                'response_cache': settings.RESPONSE_CACHE_ENABLED and not options['no_response_cache'],
+                'seed': options['seed'],
+            },
+            'scenarios': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['baseline']:
+            self.compare_baseline(report, options['baseline'], options['max_regression'])
+
+    def load_samples(self):
+        try:
+            self.admin = User.objects.get(email=BENCHMARK_ADMIN_EMAIL)
+        except User.DoesNotExist:
+            raise CommandError('No benchmark dataset; run "manage.py generate_dataset" first')
+        user_ids = list(benchmark_users().values_list('pk', flat=True))
+        job_ids = list(Job.objects.filter(is_active=True).values_list('pk', flat=True))
+        if not user_ids or not job_ids:
+            raise CommandError('No benchmark dataset; run "manage.py generate_dataset" first')
+
+        self.job_ids = self.rng.sample(job_ids, min(SAMPLE_SIZE, len(job_ids)))
+        self.applied_job_ids = list(
+            Job.objects.filter(applications_count__gt=0).values_list('pk', flat=True)[:SAMPLE_SIZE]
+        ) or self.job_ids
+        # Applies always come from a user with no real applications; they are rolled back
+        self.applicant, _ = User.objects.get_or_create(
+            email=BENCHMARK_APPLICANT_EMAIL, defaults={'first_name': 'Bench', 'last_name': 'Applicant'}
+        )
+        self.users = list(benchmark_users().filter(pk__in=self.rng.sample(user_ids, min(50, len(user_ids)))))
+        self.tokens = {user.pk: f'Bearer {AccessToken.for_user(user)}' for user in self.users + [self.admin, self.applicant]}
+        self.category_ids = list(Category.objects.values_list('pk', flat=True))
+        self.locations = list(Job.objects.values_list('location', flat=True).distinct()[:20])
+
+    def dataset_size(self):
+        return {
+            'users': benchmark_users().count(),
+            'jobs': Job.objects.count(),
+            'applications': Application.objects.count(),
+            'categories': Category.objects.count(),
+        }
+
+    def auth(self, user):
+        return {'HTTP_AUTHORIZATION': self.tokens[user.pk]}
+
+    def scenarios(self):
+        """
+        ``{name: build}``; ``build()`` returns ``(method, path, data, extra,
+        expected_status)`` for one request.
+        """
+        rng = self.rng
+        job_types = [value for value, _ in Job.JOB_TYPE_CHOICES]
+        return {
+            'jobs.list': lambda: ('get', '/api/jobs/', {}, {}, 200),
+            'jobs.list.filtered': lambda: ('get', '/api/jobs/', {
+                'category': rng.choice(self.category_ids),
+                'job_type': rng.choice(job_types),
+                'location': rng.choice(self.locations),
+            }, {}, 200),
+            'jobs.search': lambda: ('get', '/api/jobs/', {'search': rng.choice(SEARCH_QUERIES)}, {}, 200),
+            'jobs.detail': lambda: ('get', f'/api/jobs/{rng.choice(self.job_ids)}/', {}, {}, 200),
+            'categories.list': lambda: ('get', '/api/categories/', {}, {}, 200),
+            'applications.list': lambda: ('get', '/api/applications/', {}, self.auth(rng.choice(self.users)), 200),
+            'applications.apply': lambda: ('post', '/api/applications/', {
+                'job': rng.choice(self.job_ids),
+                'cover_letter': 'I would love to join your team.',
+                'resume': SimpleUploadedFile('resume.pdf', b'%PDF-1.4 benchmark', content_type='application/pdf'),
+            }, self.auth(self.applicant), 201),
+            'applications.by_job': lambda: (
+                'get', f'/api/applications/job/{rng.choice(self.applied_job_ids)}/', {}, self.auth(self.admin), 200
+            ),
+            'applications.my_applications': lambda: (
+                'get', '/api/applications/my_applications/', {}, self.auth(rng.choice(self.users)), 200
+            ),
+            'auth.token': lambda: ('post', '/api/auth/token/', {
+                'email': rng.choice(self.users).email, 'password': BENCHMARK_PASSWORD,
+            }, {}, 200),
+        }
+
+    def run_scenario(self, name, build, count, warmup):
+        client = Client()
+        for _ in range(warmup):
+            self.request(client, build())
+
+        timings, query_counts, errors = [], [], 0
+        started = time.perf_counter()
+        for _ in range(count):
+            response, elapsed_ms, queries, expected = self.request(client, build())
+            if response.status_code != expected:
+                errors += 1
+            timings.append(elapsed_ms)
+            query_counts.append(queries)
+        result = summarize(timings, query_counts, errors, time.perf_counter() - started)
+        self.stderr.write(
+            f'{name:<32} p50 {result["p50_ms"]:>8} ms  p95 {result["p95_ms"]:>8} ms  '
+            f'{result["queries_max"]:>3} queries  {errors} errors'
+        )
+        return result
+
+    def request(self, client, spec):
+        method, path, data, extra, expected = spec
+        counter = QueryCounter()
+        # Writes are rolled back so runs leave the dataset unchanged and the
+        # same applicant never trips the duplicate-application check
+        with transaction.atomic():
+            started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                response = getattr(client, method)(path, data, **extra)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            transaction.set_rollback(method != 'get')
+        return response, elapsed_ms, counter.queries, expected
+
+    def compare_baseline(self, report, path, max_regression):
+        with open(path) as handle:
+            baseline = json.load(handle)
+        rows, regressions = compare(report, baseline, max_regression)
+        out = self.stderr
+        out.write(f'\n{"scenario":<32} {"p50 ms":>22} {"p95 ms":>22} {"p99 ms":>22} {"queries":>14}')
+        for row in rows:
+            cells = ' '.join(
+                f'{f"{old} -> {new} ({change:+.0f}%)":>22}' for old, new, change in
+                (row['p50_ms'], row['p95_ms'], row['p99_ms'])
+            )
+            old_queries, new_queries, _ = row['queries_max']
+            out.write(f'{row["scenario"]:<32} {cells} {f"{old_queries} -> {new_queries}":>14}')
+        if regressions and max_regression is not None:
+            raise CommandError('Regressions against baseline:\n' + '\n'.join(regressions))
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
@@ -0,0 +1,26 @@
+# apps/core/management/commands/run_tasks.py
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.taskqueue import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks until stopped (SIGTERM/SIGINT finish the tasks in flight first)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.TASK_WORKER_CONCURRENCY,
+                            help=f'Tasks run at once (default: {settings.TASK_WORKER_CONCURRENCY})')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds between polls while the queue is empty (default: 1)')
+        parser.add_argument('--burst', action='store_true', help='Exit once no task is due')
+
+    def handle(self, *args, **options):
+        worker = Worker(concurrency=options['concurrency'], poll_interval=options['poll_interval'])
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: worker.stop())
+        self.stdout.write(f'Worker {worker.worker_id} running {options["concurrency"]} tasks at a time')
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(f'Stopped after {processed} tasks')
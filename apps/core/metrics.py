@@ -0,0 +1,53 @@
+# apps/core/metrics.py
+"""
+Minimal in-process metrics registry.
+
+Counters and timings are kept per worker process and exposed, together with
+any registered gauges, through the admin-only ``/api/metrics/`` endpoint.
+"""
+import threading
+from collections import defaultdict
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._timings = {}
+        self._gauges = {}
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name, value):
+        """Record one sample of a duration or size (count, sum, max)."""
+        with self._lock:
+            timing = self._timings.setdefault(name, {'count': 0, 'sum': 0.0, 'max': 0.0})
+            timing['count'] += 1
+            timing['sum'] += value
+            timing['max'] = max(timing['max'], value)
+
+    def register_gauge(self, name, func):
+        """Register a callable evaluated whenever a snapshot is taken."""
+        self._gauges[name] = func
+
+    def snapshot(self):
+        with self._lock:
+            data = {
+                'counters': dict(self._counters),
+                'timings': {
+                    name: dict(timing, avg=timing['sum'] / timing['count'] if timing['count'] else 0.0)
+                    for name, timing in self._timings.items()
+                },
+            }
+        data['gauges'] = {name: func() for name, func in self._gauges.items()}
+        return data
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,174 @@
+# apps/core/middleware.py
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import OperationalError
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from .instrumentation import current_profile, end_profile, start_profile
+from .metrics import metrics
+from .querylog import record as record_queries, should_sample
+from .replicas import (
+    SAFE_METHODS, ais_pinned, apin, current_routing, end_routing, is_pinned, pin, replica_aliases,
+    replica_health, start_routing,
+)
+
+logger = logging.getLogger('job_board.performance')
+
+
+def endpoint_name(view_func, method):
+    """``JobViewSet.list``-style name for the resolved view."""
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', 'unknown')
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{view_class.__name__}.{actions.get(method.lower(), method.lower())}'
+
+
+class ServerTimingMiddleware:
+    """
+    Records query count, database, serialization and rendering time for every
+    request, aggregates them per endpoint in the metrics registry, logs
+    requests slower than ``SLOW_REQUEST_MS`` and keeps the SQL of sampled
+    requests (``QUERY_SAMPLE_RATE``). The ``Server-Timing`` header reporting
+    them goes to admins, and to everyone with ``SERVER_TIMING_ENABLED`` (on
+    under DEBUG). Runs natively under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile, token = start_profile(should_sample())
+        try:
+            response = self.get_response(request)
+        finally:
+            end_profile(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile, token = start_profile(should_sample())
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_profile(token)
+        return self.finish(request, response, profile)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = current_profile()
+        if profile is not None:
+            profile.endpoint = endpoint_name(view_func, request.method)
+
+    def finish(self, request, response, profile):
+        if self.exposes_timing(request):
+            response['Server-Timing'] = profile.server_timing()
+        self.record(request, profile)
+        return response
+
+    def exposes_timing(self, request):
+        if getattr(settings, 'SERVER_TIMING_ENABLED', settings.DEBUG):
+            return True
+        # Query counts and timings are for the team: DRF has set the authenticated user by now
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_authenticated and user.is_admin())
+
+    def record(self, request, profile):
+        total_ms = profile.total_time * 1000
+        if profile.endpoint:
+            metrics.observe(f'endpoint.{profile.endpoint}.queries', profile.queries)
+            metrics.observe(f'endpoint.{profile.endpoint}.ms', total_ms)
+        slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 0)
+        if slow_ms and total_ms >= slow_ms:
+            logger.warning(
+                'Slow request %s %s (%s): %.0f ms total, %d queries in %.0f ms, serialize %.0f ms, render %.0f ms',
+                request.method, request.get_full_path(), profile.endpoint or '-', total_ms,
+                profile.queries, profile.db_time * 1000, profile.serialize_time * 1000, profile.render_time * 1000,
+            )
+        if profile.sampled:
+            record_queries(profile.endpoint, profile.sampled)
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise that stays async under ASGI. The stock middleware is sync
+    only, which makes Django run everything below it, views included, in a
+    worker thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class ReadReplicaMiddleware:
+    """
+    Sends the reads of safe-method requests to the read replicas, unless
+    the client wrote recently, and pins clients to the primary after every
+    write (see ``apps.core.replicas``). Does nothing without replicas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        safe = request.method in SAFE_METHODS
+        token = start_routing(safe and not is_pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            end_routing(token)
+        if not safe:
+            pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        safe = request.method in SAFE_METHODS
+        token = start_routing(safe and not await ais_pinned(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_routing(token)
+        if not safe:
+            await apin(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        routing = current_routing()
+        if isinstance(exception, OperationalError) and routing and routing.alias in replica_aliases():
+            replica_health.mark_down(routing.alias, exception)
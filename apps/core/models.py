@@ -0,0 +1,56 @@
+# apps/core/models.py
+from django.db import models
+
+class StoredBlob(models.Model):
+    """
+    A file in the content-addressed storage. ``name`` embeds the SHA-256 of
+    the content; ``ref_count`` is the number of rows whose ``BlobFileField``
+    points at it (see ``apps.core.storage``).
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'stored_blobs'
+        indexes = [
+            models.Index(fields=['ref_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+class Task(models.Model):
+    """A unit of background work queued by ``apps.core.taskqueue``."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(help_text="Not claimed before this time")
+    claimed_by = models.CharField(max_length=100, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'tasks'
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+            models.Index(fields=['status', 'lease_expires_at']),
+            models.Index(fields=['status', 'finished_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,24 @@
+# apps/core/operations.py
+"""Migration operations shared by the apps."""
+from django.contrib.postgres import operations as postgres
+from django.db.migrations import AddIndex
+
+
+class AddIndexConcurrently(postgres.AddIndexConcurrently):
+    """
+    ``CREATE INDEX CONCURRENTLY`` on PostgreSQL, so building the index does
+    not block writes to the table; a plain ``AddIndex`` on other databases.
+    The migration must set ``atomic = False``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
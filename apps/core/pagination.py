@@ -0,0 +1,325 @@
+# apps/core/pagination.py
+"""
+Keyset (cursor) pagination.
+
+``OptionalKeysetPagination`` keeps the existing page-number behaviour for
+clients that send ``?page=``, and switches to keyset pagination when the
+request carries ``?cursor=`` (any value, empty for the first page). A keyset
+page is fetched with ``WHERE (key, id) > (last_key, last_id) ORDER BY key, id
+LIMIT n`` instead of ``COUNT(*)`` + ``OFFSET``, so deep pages cost the same as
+the first one. The total count is only computed on request (``?count=exact``)
+or estimated from the query planner (``?count=estimate``).
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound, ValidationError as InvalidParameter
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+COUNT_MODES = ('exact', 'estimate')
+
+
+def estimate_count(queryset):
+    """
+    Row estimate from the PostgreSQL planner; exact count elsewhere.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the queryset's ordering plus the primary key
+    as a tie-breaker, e.g. ``(created_at, id)``. Works with any ordering set by
+    ``OrderingFilter``; nullable keys sort last in both directions.
+    """
+    page_size = PageNumberPagination.page_size
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    cursor_query_description = 'Pagination cursor; send an empty value for the first page.'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        values = self.start_page(queryset, request)
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == 'exact':
+            self.count = queryset.count()
+        elif count_mode == 'estimate':
+            self.count = estimate_count(queryset)
+        return self.finish_page(list(self.page_queryset(queryset, values)), values)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        values = self.start_page(queryset, request)
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == 'exact':
+            self.count = await queryset.acount()
+        elif count_mode == 'estimate':
+            self.count = await sync_to_async(estimate_count)(queryset)
+        return self.finish_page([obj async for obj in self.page_queryset(queryset, values)], values)
+
+    def start_page(self, queryset, request):
+        """Read the page size and cursor; returns the cursor position."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.keys = self.get_keys(queryset)
+        self.count = None
+        values, self.reverse = self.decode_cursor(request)
+        return values
+
+    def page_queryset(self, queryset, values):
+        if values is not None:
+            queryset = queryset.filter(self.get_position_filter(values))
+        # One extra row tells whether there is another page
+        return queryset.order_by(*self.get_ordering())[:self.page_size + 1]
+
+    def finish_page(self, results, values):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        self.has_next = has_more if not self.reverse else values is not None
+        self.has_previous = values is not None if not self.reverse else has_more
+        self.first = self.get_position(results[0]) if results else values
+        self.last = self.get_position(results[-1]) if results else values
+        return results
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_keys(self, queryset):
+        """
+        Return ``[(name, descending, nullable, to_python), ...]`` for the
+        queryset ordering, always ending with the primary key.
+        """
+        model = queryset.model
+        ordering = queryset.query.order_by or model._meta.ordering
+        pk_name = model._meta.pk.name
+        keys = []
+        for term in ordering:
+            if not isinstance(term, str):
+                continue
+            descending = term.startswith('-')
+            name = term.lstrip('-')
+            if name in ('pk', pk_name):
+                break
+            if name in queryset.query.annotations:
+                output_field = queryset.query.annotations[name].output_field
+                keys.append((name, descending, False, output_field.to_python))
+            else:
+                field = model._meta.get_field(name)
+                keys.append((field.attname, descending, field.null, field.to_python))
+        descending = keys[0][1] if keys else False
+        keys.append((pk_name, descending, False, model._meta.pk.to_python))
+        return keys
+
+    def get_ordering(self):
+        ordering = []
+        for name, descending, nullable, _ in self.keys:
+            expression = F(name).desc if descending != self.reverse else F(name).asc
+            if nullable:
+                # Nulls sort last going forwards, so they come first going backwards
+                ordering.append(expression(nulls_first=True) if self.reverse else expression(nulls_last=True))
+            else:
+                ordering.append(expression())
+        return ordering
+
+    def get_position_filter(self, values):
+        """
+        Lexicographic "comes after ``values``" condition over the keys, in
+        the direction of travel.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, nullable, _), value in zip(self.keys, values):
+            forward = descending == self.reverse
+            if value is None:
+                # Nulls sort last going forwards, first going backwards
+                after = Q(**{f'{name}__isnull': False}) if self.reverse else Q(pk__in=[])
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f'{name}__gt' if forward else f'{name}__lt': value})
+                if nullable and not self.reverse:
+                    after |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            condition |= equal & after
+            equal &= same
+        return condition
+
+    def get_position(self, obj):
+        return [getattr(obj, name) for name, _, _, _ in self.keys]
+
+    def encode_cursor(self, values, reverse):
+        payload = {
+            'k': [name for name, _, _, _ in self.keys],
+            'v': [None if value is None else force_str(value) for value in values],
+        }
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param, '')
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if payload['k'] != [name for name, _, _, _ in self.keys]:
+                raise ValueError('cursor does not match the current ordering')
+            values = [
+                None if value is None else to_python(value)
+                for (_, _, _, to_python), value in zip(self.keys, payload['v'], strict=True)
+            ]
+            return values, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise InvalidParameter({self.cursor_query_param: [self.invalid_cursor_message]})
+
+    def get_link(self, values, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values, reverse))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.get_link(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.get_link(self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': self.cursor_query_description,
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include a total count with cursor pages: exact or estimate.',
+                'schema': {'type': 'string', 'enum': list(COUNT_MODES)},
+            },
+        ]
+
+
+async def apaginate_page_number(pagination, queryset, request, view=None):
+    """
+    ``PageNumberPagination.paginate_queryset`` on the async ORM. The count is
+    primed on Django's paginator so the page and links are built as usual.
+    """
+    page_size = pagination.get_page_size(request)
+    if not page_size:
+        return None
+
+    paginator = pagination.django_paginator_class(queryset, page_size)
+    paginator.count = await queryset.acount()
+    page_number = pagination.get_page_number(request, paginator)
+    try:
+        pagination.page = paginator.page(page_number)
+    except InvalidPage as exc:
+        msg = pagination.invalid_page_message.format(page_number=page_number, message=str(exc))
+        raise NotFound(msg)
+    pagination.page.object_list = [obj async for obj in pagination.page.object_list]
+
+    if paginator.num_pages > 1 and pagination.template is not None:
+        pagination.display_page_controls = True
+    pagination.request = request
+    return list(pagination.page)
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """Project default pagination, with an async code path for ASGI."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await apaginate_page_number(self, queryset, request, view)
+
+
+class OptionalKeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; keyset pagination when the request
+    carries a ``cursor`` parameter. Lets crawlers walk deep result sets
+    cheaply without changing responses for existing clients.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        self.keyset = None
+        return await apaginate_page_number(self, queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count']['description'] = (
+            'Total rows. Omitted for cursor pages unless requested with count=exact|estimate.'
+        )
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return (super().get_schema_operation_parameters(view) +
+                self.keyset_pagination_class().get_schema_operation_parameters(view))
+
+    def get_html_context(self):
+        if self.keyset is not None:
+            return {'previous_url': self.keyset.get_previous_link(),
+                    'next_url': self.keyset.get_next_link()}
+        return super().get_html_context()
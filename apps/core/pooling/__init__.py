@@ -0,0 +1,10 @@
+# apps/core/pooling/__init__.py
+"""
+Pooled PostgreSQL backend: ``'ENGINE': 'apps.core.pooling'``.
+
+Each worker process keeps up to ``POOL['MAX_SIZE']`` open connections per
+database alias. Django still "closes" its connection at the end of every
+request; this backend hands it back to the pool instead, so the next
+request skips the connect, TLS and authentication round trips. See
+``apps.core.pooling.pool`` for the checkout rules.
+"""
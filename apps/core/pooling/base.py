@@ -0,0 +1,45 @@
+# apps/core/pooling/base.py
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from .pool import close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    # PostgreSQL refuses to drop or copy a database with open connections
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        close_pools(self.connection.settings_dict['NAME'])
+        super()._clone_test_db(suffix, verbosity, keepdb)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+
+    def get_new_connection(self, conn_params):
+        key = (
+            self.alias, conn_params.get('dbname'), conn_params.get('host'),
+            conn_params.get('port'), conn_params.get('user'),
+        )
+        self.pool = get_pool(
+            key, self.alias, lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+            self.settings_dict.get('POOL', {}),
+        )
+        # Normally set while connecting; a reused connection still needs it
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return self.pool.getconn()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
@@ -0,0 +1,238 @@
+# apps/core/pooling/pool.py
+"""
+A bounded, thread-safe pool of DB-API connections, one per worker process
+and database.
+
+``getconn`` hands out the most recently returned idle connection, opens a
+new one while fewer than ``max_size`` exist, and otherwise waits up to
+``timeout`` seconds for one to come back before raising
+``OperationalError``. A connection idle for more than ``check_after``
+seconds runs ``SELECT 1`` before it is handed out, and one that fails is
+replaced. ``putconn`` rolls back any open transaction; connections that are
+broken, older than ``max_lifetime`` or idle beyond ``max_idle`` are closed
+rather than kept.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import Error as DatabaseError, OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+from apps.core.metrics import metrics
+
+logger = logging.getLogger('job_board.db')
+
+DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 5,
+    'CHECK_AFTER': 10,
+    'MAX_IDLE': 300,
+    'MAX_LIFETIME': 3600,
+}
+
+
+class PooledConnection:
+    __slots__ = ('connection', 'created', 'returned')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.returned = time.monotonic()
+
+
+class ConnectionPool:
+    def __init__(self, name, connect, max_size=10, timeout=5, check_after=10, max_idle=300, max_lifetime=3600):
+        self.name = name
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._active = {}
+        self._size = 0
+        self._waiting = 0
+        self._stats = {'checkouts': 0, 'connects': 0, 'discards': 0, 'timeouts': 0, 'failed_checks': 0, 'waits': 0}
+
+    def getconn(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            entry = self._reserve(deadline)
+            if entry is None:
+                entry = self._open()
+            elif not self._usable(entry):
+                self._discard(entry)
+                continue
+            waited = time.monotonic() - started
+            with self._cond:
+                self._active[id(entry.connection)] = entry
+                self._stats['checkouts'] += 1
+            metrics.incr('db.pool.checkouts')
+            metrics.observe('db.pool.wait_ms', waited * 1000)
+            return entry.connection
+
+    def _reserve(self, deadline):
+        """An idle entry, or ``None`` once a slot for a new connection is reserved."""
+        with self._cond:
+            waited = False
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    entry = self._idle.pop()
+                    if now - entry.returned <= self.max_idle:
+                        return entry
+                    self._close(entry.connection)
+                    self._size -= 1
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    metrics.incr('db.pool.timeouts')
+                    raise OperationalError(
+                        f'Connection pool {self.name!r} exhausted: all {self.max_size} connections '
+                        f'in use for {self.timeout}s'
+                    )
+                if not waited:
+                    waited = True
+                    self._stats['waits'] += 1
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats['connects'] += 1
+        metrics.incr('db.pool.connects')
+        return PooledConnection(connection)
+
+    def _usable(self, entry):
+        connection = entry.connection
+        if connection.closed or connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - entry.returned <= self.check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+            return True
+        except DatabaseError as exc:
+            logger.info('Discarding pooled connection to %s that failed its check: %s', self.name, exc)
+            with self._cond:
+                self._stats['failed_checks'] += 1
+            return False
+
+    def putconn(self, connection):
+        """Return ``connection``; it is closed instead if it cannot be reused."""
+        with self._cond:
+            entry = self._active.pop(id(connection), None)
+        if entry is None:
+            # Not ours (the pool was reset after a fork); nothing to account for
+            self._close(connection)
+            return
+        keep = not connection.closed and time.monotonic() - entry.created < self.max_lifetime
+        if keep and connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            # Closed mid-transaction, or after an error; UNKNOWN means the link is gone
+            keep = connection.info.transaction_status != TRANSACTION_STATUS_UNKNOWN
+            try:
+                connection.rollback()
+            except DatabaseError:
+                keep = False
+        if not keep:
+            self._discard(entry)
+            return
+        entry.returned = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _discard(self, entry):
+        self._close(entry.connection)
+        with self._cond:
+            self._size -= 1
+            self._stats['discards'] += 1
+            self._cond.notify()
+        metrics.incr('db.pool.discards')
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except DatabaseError:
+            pass
+
+    def close_idle(self):
+        """Close every idle connection; checked-out ones come back as usual."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close(entry.connection)
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'active': len(self._active),
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                **self._stats,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def get_pool(key, name, connect, options):
+    """The pool for ``key`` in this process, created on first use."""
+    global _pid
+    with _pools_lock:
+        if os.getpid() != _pid:
+            # Connections inherited across a fork belong to the parent
+            _pools.clear()
+            _pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            options = {**DEFAULTS, **options}
+            pool = _pools[key] = ConnectionPool(
+                name, connect,
+                max_size=options['MAX_SIZE'], timeout=options['TIMEOUT'], check_after=options['CHECK_AFTER'],
+                max_idle=options['MAX_IDLE'], max_lifetime=options['MAX_LIFETIME'],
+            )
+        return pool
+
+
+def close_pools(database=None):
+    """Close the idle connections of every pool, or of those connected to ``database``."""
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if database is None or key[1] == database]
+    for pool in pools:
+        pool.close_idle()
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {pool.name: pool.snapshot() for pool in pools.values()}
+
+
+metrics.register_gauge('db_pools', pool_stats)
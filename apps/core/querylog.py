@@ -0,0 +1,87 @@
+# apps/core/querylog.py
+"""
+Samples of the SQL that requests run, for the index advisor
+(``manage.py advise_indexes``).
+
+A share ``QUERY_SAMPLE_RATE`` of requests keep the SELECTs they run; once
+the response is ready ``ServerTimingMiddleware`` appends them to
+``QUERY_SAMPLE_LOG`` as JSON lines: endpoint, SQL with its placeholders,
+parameters and milliseconds. Inside ``collecting()`` every request is
+sampled into a list instead, which is how the advisor replays the benchmark.
+"""
+import datetime
+import decimal
+import json
+import random
+import threading
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_collectors = []
+_write_lock = threading.Lock()
+
+
+def should_sample():
+    if _collectors:
+        return True
+    rate = getattr(settings, 'QUERY_SAMPLE_RATE', 0)
+    return rate > 0 and random.random() < rate
+
+
+def is_sampled(sql):
+    return sql.lstrip()[:6].upper() == 'SELECT'
+
+
+@contextmanager
+def collecting():
+    """Sample every request while the block runs; yields the list the samples go to."""
+    samples = []
+    _collectors.append(samples)
+    try:
+        yield samples
+    finally:
+        _collectors.remove(samples)
+
+
+def jsonable(value):
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'Cannot log parameter of type {type(value).__name__}')
+
+
+def record(endpoint, queries):
+    """Keep the ``(sql, params, ms)`` a sampled request ran."""
+    samples = [{'endpoint': endpoint, 'sql': sql, 'params': params, 'ms': ms} for sql, params, ms in queries]
+    if _collectors:
+        for collector in _collectors:
+            collector.extend(samples)
+        return
+    path = getattr(settings, 'QUERY_SAMPLE_LOG', '')
+    if not path:
+        return
+    lines = []
+    for sample in samples:
+        try:
+            sample['params'] = jsonable(sample['params'])
+        except TypeError:
+            # Binary parameters and the like: the statement cannot be replayed
+            continue
+        lines.append(json.dumps(sample) + '\n')
+    with _write_lock, open(path, 'a') as handle:
+        handle.write(''.join(lines))
+
+
+def read_samples(path):
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,216 @@
+# apps/core/replicas.py
+"""
+Read-replica routing.
+
+``ReplicaRouter`` sends a read to a replica only while
+``ReadReplicaMiddleware`` has marked the current request as a replica read:
+a GET, HEAD or OPTIONS request from a client that has not written recently.
+Everything else, including reads made while handling a write, management
+commands and background tasks, uses ``default``. Each request sticks to one
+replica for all its reads.
+
+A client that writes is pinned to the primary for ``REPLICA_PIN_SECONDS``
+so it reads its own writes: by a cookie, and through the cache by its
+``Authorization`` header for API clients that drop cookies. That cache must
+be shared by every worker; system check ``core.W001`` flags a per-process
+one. Replicas are checked at most every ``REPLICA_CHECK_INTERVAL`` seconds
+and left out while they are unreachable or more than ``REPLICA_MAX_LAG``
+seconds behind.
+"""
+import contextvars
+import hashlib
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .metrics import metrics
+
+logger = logging.getLogger('job_board.db')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'db_pin'
+PIN_PREFIX = 'db-pin'
+
+# Replay delay, or 0 when the replica has applied everything it received (an idle primary sends nothing)
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class ReplicaHealth:
+    """Last known state of each replica, refreshed by whichever request finds it stale."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def healthy(self):
+        aliases = replica_aliases()
+        deadline = time.monotonic() - _setting('REPLICA_CHECK_INTERVAL', 5)
+        stale = [alias for alias in aliases if self._states.get(alias, {}).get('checked', float('-inf')) < deadline]
+        # One thread checks; the others carry on with the previous results
+        if stale and self._lock.acquire(blocking=False):
+            try:
+                for alias in stale:
+                    self.check(alias)
+            finally:
+                self._lock.release()
+        return [alias for alias in aliases if self._states.get(alias, {}).get('healthy')]
+
+    def check(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(POSTGRES_LAG_SQL if connections[alias].vendor == 'postgresql' else 'SELECT 0')
+                lag = float(cursor.fetchone()[0] or 0)
+        except DatabaseError as exc:
+            self.mark_down(alias, exc)
+            return
+        max_lag = _setting('REPLICA_MAX_LAG', 5)
+        healthy = lag <= max_lag
+        if not healthy and self._states.get(alias, {}).get('healthy', True):
+            logger.warning('Replica %s is %.1fs behind (limit %ss); reading from the primary', alias, lag, max_lag)
+        self._states[alias] = {'healthy': healthy, 'lag_s': round(lag, 3), 'checked': time.monotonic(), 'error': ''}
+
+    def mark_down(self, alias, error):
+        """Take ``alias`` out of rotation until its next check."""
+        if self._states.get(alias, {}).get('healthy', True):
+            logger.warning('Replica %s is unavailable: %s', alias, error)
+            metrics.incr('db.replica_failures')
+        self._states[alias] = {'healthy': False, 'lag_s': None, 'checked': time.monotonic(), 'error': str(error)[:200]}
+        # Drop the broken connection so the next check reconnects
+        connections[alias].close()
+
+    def reset(self):
+        self._states = {}
+
+    def snapshot(self):
+        return {
+            alias: {key: value for key, value in self._states.get(alias, {}).items() if key != 'checked'}
+            for alias in replica_aliases()
+        }
+
+
+replica_health = ReplicaHealth()
+
+
+class ReadRouting:
+    """Routing decision for one request; ``alias`` is chosen at its first read."""
+
+    def __init__(self):
+        self.alias = None
+
+
+_routing = contextvars.ContextVar('replica_routing', default=None)
+
+
+def current_routing():
+    return _routing.get()
+
+
+def start_routing(use_replica):
+    """Route this context's reads to a replica (``use_replica``) or the primary."""
+    return _routing.set(ReadRouting() if use_replica else None)
+
+
+def end_routing(token):
+    _routing.reset(token)
+
+
+class ReplicaRouter:
+    """Database router sending the reads of replica-read requests to a healthy replica."""
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return DEFAULT_DB_ALIAS
+        if routing.alias is None:
+            healthy = replica_health.healthy()
+            routing.alias = random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+            metrics.incr('db.replica_requests' if healthy else 'db.primary_fallbacks')
+        return routing.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in replica_aliases() else None
+
+
+def pin_key(request):
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return None
+    return f'{PIN_PREFIX}:{hashlib.sha256(authorization.encode("utf-8")).hexdigest()}'
+
+
+def is_pinned(request):
+    """Whether the client wrote within the last ``REPLICA_PIN_SECONDS``."""
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    key = pin_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+async def ais_pinned(request):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    key = pin_key(request)
+    return key is not None and await cache.aget(key) is not None
+
+
+def _set_pin_cookie(response):
+    seconds = _setting('REPLICA_PIN_SECONDS', 10)
+    response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+    return seconds
+
+
+def pin(request, response):
+    """Send the client's reads to the primary for ``REPLICA_PIN_SECONDS``."""
+    seconds = _set_pin_cookie(response)
+    key = pin_key(request)
+    if key is not None:
+        cache.set(key, 1, seconds)
+
+
+async def apin(request, response):
+    seconds = _set_pin_cookie(response)
+    key = pin_key(request)
+    if key is not None:
+        await cache.aset(key, 1, seconds)
+
+
+def check_pin_cache(app_configs=None, **kwargs):
+    """Warn when replicas are on but pins live in a cache other workers cannot see."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if replica_aliases() and backend.endswith('.LocMemCache'):
+        return [checks.Warning(
+            'DB_REPLICA_HOSTS is set but the default cache is a per-process LocMemCache, so a write '
+            'pins reads to the primary only in the worker that served it.',
+            hint='Point CACHE_BACKEND/CACHE_LOCATION at a cache shared by all workers, such as Redis.',
+            id='core.W001',
+        )]
+    return []
+
+
+metrics.register_gauge('replicas', replica_health.snapshot)
@@ -0,0 +1,250 @@
+# apps/core/storage.py
+"""
+Content-addressed file storage for uploads such as resumes.
+
+``ContentAddressedStorage`` saves every distinct content once, under a name
+derived from its SHA-256 (``blobs/3f/3f8a...c1.pdf``): uploading the same CV
+for fifty applications writes it once. The digest is computed while the
+upload streams in (see ``apps.core.uploads``), so saving does not read the
+file again.
+
+``BlobFileField`` keeps ``StoredBlob.ref_count`` in step with the rows that
+point at each blob. Unreferenced blobs are removed by ``collect_blobs``
+after a grace period, never inline, so a blob that is released and uploaded
+again at the same moment is not lost.
+"""
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.files.utils import validate_file_name
+from django.db import connections, models, transaction
+from django.db.models import Count, F
+from django.db.models.fields.files import FileDescriptor
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+BLOB_PREFIX = 'blobs'
+MAX_EXTENSION_LENGTH = 10
+
+
+def file_digest(content):
+    """SHA-256 of a ``File``, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f'{BLOB_PREFIX}/')
+
+
+def _file_name(value):
+    return getattr(value, 'name', value) or None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    ``FileSystemStorage`` that names files by content. Saving content that is
+    already stored only refreshes the file's modification time, which
+    ``collect_blobs`` uses as the start of its grace period.
+    """
+
+    def blob_name(self, digest, name):
+        extension = os.path.splitext(name or '')[1].lower()
+        if len(extension) > MAX_EXTENSION_LENGTH:
+            extension = ''
+        return f'{BLOB_PREFIX}/{digest[:2]}/{digest}{extension}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        # Set by the hashing upload handlers; anything else is hashed here
+        digest = getattr(content, 'content_hash', None) or file_digest(content)
+        name = self.blob_name(digest, name)
+        validate_file_name(name, allow_relative_path=True)
+        return self._save(name, content)
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.utime(full_path)
+            return name
+
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        if hasattr(content, 'temporary_file_path'):
+            # Uploads spooled to disk are moved, not copied
+            file_move_safe(content.temporary_file_path(), full_path, allow_overwrite=True)
+        else:
+            # Write next to the target and rename, so readers never see a partial blob
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+            try:
+                with os.fdopen(fd, 'wb') as handle:
+                    for chunk in content.chunks():
+                        handle.write(chunk)
+                os.replace(temp_path, full_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+
+def blob_storage():
+    return storages['blobs']
+
+
+def retain_blob(name, storage, using='default'):
+    """Add a reference to ``name``, creating its ``StoredBlob`` row if needed."""
+    from .models import StoredBlob
+    connection = connections[using]
+    table = connection.ops.quote_name(StoredBlob._meta.db_table)
+    # One statement, safe against concurrent uploads of the same content
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (name, size, ref_count, created_at) VALUES (%s, %s, 1, %s) '
+            f'ON CONFLICT (name) DO UPDATE SET ref_count = {table}.ref_count + 1',
+            [name, storage.size(name), timezone.now()],
+        )
+
+
+def release_blob(name, using='default'):
+    from .models import StoredBlob
+    StoredBlob.objects.using(using).filter(name=name).update(ref_count=F('ref_count') - 1)
+
+
+class BlobFileDescriptor(FileDescriptor):
+    def __set__(self, instance, value):
+        # The first value set is the one loaded from the database; saves compare against it
+        instance.__dict__.setdefault(self.field.loaded_attname, _file_name(value))
+        super().__set__(instance, value)
+
+
+class BlobFileField(models.FileField):
+    """
+    ``FileField`` stored in the content-addressed storage, counting
+    references to each blob as rows are created, changed and deleted.
+    """
+    descriptor_class = BlobFileDescriptor
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('storage', blob_storage)
+        super().__init__(*args, **kwargs)
+
+    @property
+    def loaded_attname(self):
+        return f'_{self.attname}_loaded'
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        if not cls._meta.abstract:
+            post_save.connect(self.update_blob_refs, sender=cls)
+            post_delete.connect(self.release_deleted_blob, sender=cls)
+
+    def update_blob_refs(self, instance, created, raw=False, using='default', update_fields=None, **kwargs):
+        if raw or (update_fields is not None and self.name not in update_fields):
+            return
+        if self.attname not in instance.__dict__:
+            # Deferred and never loaded, so unchanged
+            return
+        new = _file_name(instance.__dict__[self.attname])
+        old = None if created else instance.__dict__.get(self.loaded_attname)
+        if new != old:
+            if is_blob(new):
+                retain_blob(new, self.storage, using)
+            if is_blob(old):
+                release_blob(old, using)
+        instance.__dict__[self.loaded_attname] = new
+
+    def release_deleted_blob(self, instance, using='default', **kwargs):
+        name = _file_name(instance.__dict__.get(self.attname))
+        if is_blob(name):
+            release_blob(name, using)
+
+
+def blob_fields():
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, BlobFileField)
+    ]
+
+
+def reconcile_blob_refs(dry_run=False):
+    """
+    Recount the references to every blob from the rows that hold them.
+    Returns the number of ``StoredBlob`` rows that had drifted.
+    """
+    from .models import StoredBlob
+    counts = Counter()
+    for model, field in blob_fields():
+        rows = (
+            model._default_manager.filter(**{f'{field.name}__startswith': f'{BLOB_PREFIX}/'})
+            .order_by().values_list(field.attname).annotate(total=Count('pk'))
+        )
+        for name, total in rows:
+            counts[name] += total
+
+    stored = dict(StoredBlob.objects.values_list('name', 'ref_count'))
+    drifted = [name for name in set(counts) | set(stored) if counts.get(name, 0) != stored.get(name)]
+    if not dry_run:
+        storage = blob_storage()
+        for name in drifted:
+            if name in stored:
+                StoredBlob.objects.filter(name=name).update(ref_count=counts.get(name, 0))
+            elif storage.exists(name):
+                StoredBlob.objects.create(name=name, size=storage.size(name), ref_count=counts[name])
+    return len(drifted)
+
+
+def collect_blobs(grace=timedelta(hours=24), dry_run=False):
+    """
+    Delete blobs nobody references, and files left behind by uploads whose
+    row was never saved, once they are older than ``grace``. Returns
+    ``(files_removed, bytes_freed)``.
+    """
+    from .models import StoredBlob
+    storage = blob_storage()
+    cutoff = timezone.now() - grace
+    removed, freed = 0, 0
+
+    def expired(name):
+        return not storage.exists(name) or storage.get_modified_time(name) < cutoff
+
+    with transaction.atomic():
+        unreferenced = StoredBlob.objects.select_for_update(skip_locked=True).filter(ref_count__lte=0)
+        for blob in unreferenced:
+            if not expired(blob.name):
+                continue
+            removed += 1
+            freed += blob.size
+            if not dry_run:
+                storage.delete(blob.name)
+                blob.delete()
+
+    if storage.exists(BLOB_PREFIX):
+        known = set(StoredBlob.objects.values_list('name', flat=True))
+        for directory in storage.listdir(BLOB_PREFIX)[0]:
+            for filename in storage.listdir(f'{BLOB_PREFIX}/{directory}')[1]:
+                name = f'{BLOB_PREFIX}/{directory}/{filename}'
+                # Skips the temporary files of in-flight writes along with live blobs
+                if filename.startswith('.') or name in known or not expired(name):
+                    continue
+                removed += 1
+                freed += storage.size(name)
+                if not dry_run:
+                    storage.delete(name)
+    return removed, freed
@@ -0,0 +1,287 @@
+# apps/core/taskqueue.py
+"""
+Database-backed background task queue; no broker needed.
+
+    @task(max_attempts=5)
+    def extract_resume_text(application_id):
+        ...
+
+    extract_resume_text.enqueue(application.pk)
+
+``enqueue`` inserts a ``Task`` row in the caller's transaction, so work
+queued by a request that rolls back never runs. ``manage.py run_tasks``
+claims due rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` and runs them on
+a thread pool. Failures are retried with exponential backoff until
+``max_attempts``; a task whose worker dies is reclaimed when its lease
+expires. Arguments must be JSON-serializable (pass ids, not instances).
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Avg, Count, F, Max, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .metrics import metrics
+
+logger = logging.getLogger('job_board.tasks')
+
+registry = {}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class TaskFunction:
+    """A function registered with ``@task``; call it directly or ``enqueue`` it."""
+
+    def __init__(self, func, name, max_attempts=None, backoff=None):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        return enqueue(self, args, kwargs)
+
+    def retry_delay(self, attempts):
+        """Seconds before retry number ``attempts``: exponential, capped, jittered."""
+        base = self.backoff if self.backoff is not None else _setting('TASK_RETRY_BACKOFF', 10)
+        delay = min(base * 2 ** (attempts - 1), _setting('TASK_MAX_BACKOFF', 3600))
+        return delay * random.uniform(0.5, 1)
+
+
+def task(name=None, max_attempts=None, backoff=None):
+    """Register a function as a background task."""
+    def decorator(func):
+        task_function = TaskFunction(func, name or f'{func.__module__}.{func.__qualname__}', max_attempts, backoff)
+        registry[task_function.name] = task_function
+        return task_function
+    return decorator
+
+
+def get_task(name):
+    if name not in registry:
+        # Default names are import paths, so a worker can find tasks it has not imported yet
+        import_string(name)
+    return registry[name]
+
+
+def enqueue(task_function, args=(), kwargs=None, run_at=None):
+    """Queue ``task_function``; returns the ``Task`` row (``None`` in eager mode)."""
+    from .models import Task
+    args, kwargs = list(args), kwargs or {}
+    if _setting('TASKS_EAGER', False):
+        transaction.on_commit(lambda: task_function(*args, **kwargs))
+        return None
+    metrics.incr('tasks.enqueued')
+    return Task.objects.create(
+        name=task_function.name, args=args, kwargs=kwargs,
+        max_attempts=task_function.max_attempts or _setting('TASK_MAX_ATTEMPTS', 3),
+        run_at=run_at or timezone.now(),
+    )
+
+
+def claim(worker_id, limit):
+    """Mark up to ``limit`` due tasks as running for this worker and return them."""
+    from .models import Task
+    now = timezone.now()
+    claimable = Q(status='queued', run_at__lte=now) | Q(status='running', lease_expires_at__lt=now)
+    token = f'{worker_id}:{uuid.uuid4().hex[:8]}'
+    with transaction.atomic():
+        ids = list(
+            Task.objects.select_for_update(skip_locked=True).filter(claimable)
+            .order_by('run_at').values_list('pk', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # Repeating the condition keeps claims exclusive where SKIP LOCKED is unavailable (SQLite)
+        Task.objects.filter(claimable, pk__in=ids).update(
+            status='running', claimed_by=token, attempts=F('attempts') + 1, started_at=now,
+            lease_expires_at=now + timedelta(seconds=_setting('TASK_LEASE_SECONDS', 300)),
+        )
+    return list(Task.objects.filter(pk__in=ids, claimed_by=token))
+
+
+def run_task(task_row):
+    """Run one claimed task and record the outcome."""
+    from .models import Task
+    metrics.observe('tasks.wait_ms', (task_row.started_at - task_row.run_at).total_seconds() * 1000)
+    started = time.perf_counter()
+    owned = Task.objects.filter(pk=task_row.pk, claimed_by=task_row.claimed_by)
+    task_function = None
+    try:
+        if task_row.attempts > task_row.max_attempts:
+            raise RuntimeError('Worker lost the task before it finished (lease expired)')
+        task_function = get_task(task_row.name)
+        task_function.func(*task_row.args, **task_row.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if task_function is not None and task_row.attempts < task_row.max_attempts:
+            delay = task_function.retry_delay(task_row.attempts)
+            owned.update(
+                status='queued', run_at=now + timedelta(seconds=delay), last_error=error,
+                claimed_by='', lease_expires_at=None,
+            )
+            metrics.incr('tasks.retried')
+            logger.warning('Task %s #%s failed (attempt %d), retrying in %.0fs\n%s',
+                           task_row.name, task_row.pk, task_row.attempts, delay, error)
+        else:
+            owned.update(status='failed', finished_at=now, last_error=error, lease_expires_at=None)
+            metrics.incr('tasks.failed')
+            logger.error('Task %s #%s failed after %d attempts\n%s',
+                         task_row.name, task_row.pk, task_row.attempts, error)
+    else:
+        owned.update(status='succeeded', finished_at=timezone.now(), lease_expires_at=None)
+        metrics.incr('tasks.succeeded')
+    finally:
+        metrics.observe('tasks.run_ms', (time.perf_counter() - started) * 1000)
+
+
+def prune(retention=None):
+    """Delete succeeded tasks finished longer ago than ``TASK_RETENTION_DAYS``."""
+    from .models import Task
+    retention = retention or timedelta(days=_setting('TASK_RETENTION_DAYS', 7))
+    deleted, _ = Task.objects.filter(status='succeeded', finished_at__lt=timezone.now() - retention).delete()
+    return deleted
+
+
+def enqueue_periodic(name, interval):
+    """
+    Queue the task ``name`` unless a run of it is still pending or was queued
+    less than ``interval`` seconds ago; returns the ``Task`` row or ``None``.
+    """
+    from .models import Task
+    recent = Q(status__in=['queued', 'running']) | Q(created_at__gte=timezone.now() - timedelta(seconds=interval))
+    if Task.objects.filter(recent, name=name).exists():
+        return None
+    return enqueue(get_task(name))
+
+
+class Worker:
+    """
+    Claims due tasks and runs up to ``concurrency`` of them at a time, and
+    queues the ``periodic`` tasks (``{name: seconds}``, default
+    ``PERIODIC_TASKS``) when they are due. Workers check the queue before
+    scheduling, so a task runs about once per interval however many run.
+    """
+
+    def __init__(self, concurrency=1, poll_interval=1.0, prune_interval=600, periodic=None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.prune_interval = prune_interval
+        if periodic is None:
+            periodic = _setting('PERIODIC_TASKS', {})
+        self.periodic = {name: interval for name, interval in periodic.items() if interval > 0}
+        self.next_periodic_check = {}
+        self.worker_id = f'{socket.gethostname()[:60]}:{os.getpid()}'
+        self.stopping = threading.Event()
+
+    def stop(self):
+        self.stopping.set()
+
+    def run(self, burst=False):
+        """Process tasks until ``stop()``; with ``burst``, until none are due."""
+        processed = 0
+        last_prune = time.monotonic()
+        in_flight = set()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='task') as pool:
+            while not self.stopping.is_set():
+                in_flight = {future for future in in_flight if not future.done()}
+                free = self.concurrency - len(in_flight)
+                claimed = claim(self.worker_id, free) if free else []
+                for task_row in claimed:
+                    in_flight.add(pool.submit(self.execute, task_row))
+                processed += len(claimed)
+
+                if time.monotonic() - last_prune > self.prune_interval:
+                    prune()
+                    last_prune = time.monotonic()
+                self.schedule_periodic()
+                if not claimed:
+                    if burst and not in_flight:
+                        break
+                    if in_flight:
+                        wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    else:
+                        self.stopping.wait(self.poll_interval)
+                elif len(in_flight) >= self.concurrency:
+                    wait(in_flight, return_when=FIRST_COMPLETED)
+        return processed
+
+    def schedule_periodic(self):
+        now = time.monotonic()
+        for name, interval in self.periodic.items():
+            if now >= self.next_periodic_check.get(name, 0):
+                # Checked at least once a minute, so a run lost with its worker is soon replaced
+                self.next_periodic_check[name] = now + min(interval, 60)
+                if enqueue_periodic(name, interval) is not None:
+                    logger.info('Queued periodic task %s', name)
+
+    def execute(self, task_row):
+        try:
+            run_task(task_row)
+        finally:
+            close_old_connections()
+
+
+def _milliseconds(duration):
+    return round(duration.total_seconds() * 1000, 1) if duration else 0
+
+
+def run_pending(worker_id='inline'):
+    """Run every due task in this thread and return how many ran; for tests and scripts."""
+    processed = 0
+    while claimed := claim(worker_id, 100):
+        for task_row in claimed:
+            run_task(task_row)
+        processed += len(claimed)
+    return processed
+
+
+def queue_stats():
+    """Queue depth and recent latency, read from the database so every process agrees."""
+    from .models import Task
+    now = timezone.now()
+    open_tasks = Q(status='queued') | Q(status='running') | Q(status='failed')
+    stats = Task.objects.filter(open_tasks).aggregate(
+        queued=Count('pk', filter=Q(status='queued')),
+        due=Count('pk', filter=Q(status='queued', run_at__lte=now)),
+        running=Count('pk', filter=Q(status='running')),
+        failed=Count('pk', filter=Q(status='failed')),
+        oldest_due=Min('run_at', filter=Q(status='queued', run_at__lte=now)),
+    )
+    oldest_due = stats.pop('oldest_due')
+    stats['oldest_due_s'] = round((now - oldest_due).total_seconds(), 1) if oldest_due else 0
+
+    recent = Task.objects.filter(status='succeeded', finished_at__gte=now - timedelta(minutes=15)).aggregate(
+        completed=Count('pk'),
+        avg_wait=Avg(F('started_at') - F('run_at')),
+        max_wait=Max(F('started_at') - F('run_at')),
+        avg_run=Avg(F('finished_at') - F('started_at')),
+        max_run=Max(F('finished_at') - F('started_at')),
+    )
+    stats['last_15m'] = {
+        'completed': recent['completed'],
+        **{f'{key}_ms': _milliseconds(recent[key]) for key in ('avg_wait', 'max_wait', 'avg_run', 'max_run')},
+    }
+    return stats
+
+
+metrics.register_gauge('tasks', queue_stats)
@@ -0,0 +1,46 @@
+# apps/core/testing.py
+"""
+Test helpers for per-endpoint SQL query budgets.
+
+    class JobEndpointTests(QueryBudgetMixin, APITestCase):
+        def test_list(self):
+            self.assertEndpointBudget(3, 'get', '/api/jobs/')
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Mixin for ``TestCase`` subclasses that use ``self.client``."""
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            statements = '\n'.join(
+                f'{index}. {query["sql"]}' for index, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{executed} queries executed, budget is {budget}:\n{statements}')
+
+    def assertEndpointBudget(self, budget, method, url, data=None, status_code=200, **extra):
+        """
+        Call ``url`` through ``self.client`` and fail if it returns a status
+        other than ``status_code`` or runs more than ``budget`` queries.
+        """
+        with self.assertMaxQueries(budget):
+            response = getattr(self.client, method)(url, data, **extra)
+        self.assertEqual(response.status_code, status_code, getattr(response, 'data', None))
+        return response
+
+    def assertBudgetIndependentOf(self, budget, sizes, method, url, data=None, param='page_size', **extra):
+        """
+        Assert the same ``budget`` holds for each value of ``param`` (page
+        size by default), catching per-row (N+1) queries.
+        """
+        for size in sizes:
+            with self.subTest(**{param: size}):
+                self.assertEndpointBudget(budget, method, url, {**(data or {}), param: size}, **extra)
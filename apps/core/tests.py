@@ -0,0 +1,332 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.authentication.models import User
+from apps.jobs.imports import JobImporter
+from apps.jobs.models import Category, Job
+from .indexadvisor import candidate_for, findings
+from .models import Task
+from .pooling.pool import ConnectionPool
+from .replicas import PIN_COOKIE, check_pin_cache, replica_health
+from .taskqueue import claim, queue_stats, run_pending, task
+from .testing import QueryBudgetMixin
+
+calls = []
+
+
+@task()
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2, backoff=60)
+def explode():
+    raise ValueError('boom')
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_tasks_run_once(self):
+        record.enqueue('a')
+        record.enqueue('b')
+        self.assertEqual(queue_stats()['due'], 2)
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(sorted(calls), ['a', 'b'])
+        self.assertEqual(run_pending(), 0)
+        self.assertEqual(set(Task.objects.values_list('status', flat=True)), {'succeeded'})
+        self.assertEqual(queue_stats()['last_15m']['completed'], 2)
+
+    def test_failures_back_off_then_fail(self):
+        row = explode.enqueue()
+        with self.assertLogs('job_board.tasks', 'WARNING'):
+            run_pending()
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('queued', 1))
+        self.assertIn('ValueError: boom', row.last_error)
+        self.assertGreaterEqual(row.run_at, timezone.now() + timedelta(seconds=25))
+        # Not due yet
+        self.assertEqual(run_pending(), 0)
+
+        Task.objects.filter(pk=row.pk).update(run_at=timezone.now())
+        with self.assertLogs('job_board.tasks', 'ERROR'):
+            run_pending()
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('failed', 2))
+        self.assertEqual(queue_stats()['failed'], 1)
+
+    def test_expired_leases_are_reclaimed(self):
+        row = record.enqueue('lost')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([task_row.pk for task_row in claim('dead-worker', 10)], [row.pk])
+        # Claimed rows are read back by primary key; claimed_by is not indexed
+        self.assertIn('"tasks"."id" IN', queries[-1]['sql'])
+        self.assertEqual(claim('other-worker', 10), [])
+        Task.objects.filter(pk=row.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['lost'])
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNone(record.enqueue('now'))
+        self.assertEqual(calls, ['now'])
+        self.assertFalse(Task.objects.exists())
+
+
+class ReplicaPinCacheCheckTests(SimpleTestCase):
+    def test_warns_when_pins_would_stay_in_one_worker(self):
+        local = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with self.settings(DATABASE_REPLICAS=['replica_1'], CACHES=local):
+            self.assertEqual([warning.id for warning in check_pin_cache()], ['core.W001'])
+        with self.settings(DATABASE_REPLICAS=['replica_1'], CACHES=shared):
+            self.assertEqual(check_pin_cache(), [])
+        with self.settings(DATABASE_REPLICAS=[], CACHES=local):
+            self.assertEqual(check_pin_cache(), [])
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'Set DB_REPLICA_HOSTS to test replica routing')
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ReplicaRoutingTests(APITestCase):
+    """
+    The replica aliases mirror the test database through their own
+    connections, which cannot see this test's uncommitted rows: to them the
+    replica is lagging behind every write made here.
+    """
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='jane@example.com', password='pass12345')
+        category = Category.objects.create(name='Engineering', slug='engineering')
+        cls.job = Job.objects.create(
+            title='Engineer', description='Build things', category=category, company_name='Andela',
+            location='Nairobi', job_type='full-time', requirements='python', responsibilities='Ship',
+            posted_by=cls.user,
+        )
+
+    def setUp(self):
+        cache.clear()
+        replica_health.reset()
+        self.addCleanup(replica_health.reset)
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def apply(self, **extra):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            return self.client.post('/api/applications/', {
+                'job': self.job.pk, 'cover_letter': 'Hire me',
+                'resume': SimpleUploadedFile('cv.txt', b'python'),
+            }, format='multipart', **extra)
+
+    def test_reads_use_replicas_until_the_client_writes(self):
+        self.assertEqual(self.client.get('/api/jobs/').data['count'], 0)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.apply().status_code, 201)
+        self.assertIn(PIN_COOKIE, self.client.cookies)
+        self.assertEqual(len(self.client.get('/api/applications/my_applications/').data), 1)
+
+        del self.client.cookies[PIN_COOKIE]
+        self.assertEqual(len(self.client.get('/api/applications/my_applications/').data), 0)
+
+    def test_token_clients_are_pinned_without_cookies(self):
+        authorization = f'Bearer {AccessToken.for_user(self.user)}'
+        self.assertEqual(self.client.get('/api/auth/profile/', HTTP_AUTHORIZATION=authorization).status_code, 401)
+        self.assertEqual(self.apply(HTTP_AUTHORIZATION=authorization).status_code, 201)
+        self.client.cookies.clear()
+        response = self.client.get('/api/applications/my_applications/', HTTP_AUTHORIZATION=authorization)
+        self.assertEqual(len(response.data), 1)
+
+    @override_settings(REPLICA_MAX_LAG=-1)
+    def test_lagging_replicas_leave_the_rotation(self):
+        with self.assertLogs('job_board.db', 'WARNING'):
+            self.assertEqual(self.client.get('/api/jobs/').data['count'], 1)
+        self.assertFalse(any(state['healthy'] for state in replica_health.snapshot().values()))
+
+
+# Reads stay on the primary, the only connection that sees this test's rows
+@override_settings(RESPONSE_CACHE_ENABLED=True, DATABASE_REPLICAS=[])
+class ResponseCacheTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email='admin@example.com', password='pass12345', role='admin')
+        cls.category = Category.objects.create(name='Engineering', slug='engineering')
+        cls.jobs = [
+            Job.objects.create(
+                title=f'Engineer {index}', description='Build things', category=cls.category,
+                company_name='Andela', location='Nairobi', job_type='contract' if index % 2 else 'full-time',
+                requirements='python', responsibilities='Ship', posted_by=cls.admin,
+            )
+            for index in range(4)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCache(self, status, url, data=None, **extra):
+        response = self.client.get(url, data, **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get('X-Cache'), status)
+        return response
+
+    def test_repeated_anonymous_reads_hit(self):
+        detail = f'/api/jobs/{self.jobs[0].pk}/'
+        for url in ('/api/jobs/', detail, '/api/categories/'):
+            with self.subTest(url=url):
+                first = self.assertCache('MISS', url)
+                second = self.assertCache('HIT', url)
+                self.assertEqual(second.data, first.data)
+
+    def test_cached_reads_and_not_modified_answers_take_no_queries(self):
+        urls = [
+            '/api/jobs/', f'/api/jobs/{self.jobs[0].pk}/',
+            '/api/categories/', f'/api/categories/{self.category.slug}/',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                etag = self.assertCache('MISS', url)['ETag']
+                response = self.assertEndpointBudget(0, 'get', url)
+                self.assertEqual((response['X-Cache'], response['ETag']), ('HIT', etag))
+                response = self.assertEndpointBudget(0, 'get', url, status_code=304, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response['ETag'], etag)
+
+        etag = self.client.get('/api/jobs/')['ETag']
+        # A miss answers 304 from the validator query alone, without building the page
+        cache.clear()
+        self.assertEndpointBudget(1, 'get', '/api/jobs/', status_code=304, HTTP_IF_NONE_MATCH=etag)
+        self.client.force_authenticate(self.admin)
+        admin_etag = self.client.get('/api/jobs/')['ETag']
+        self.assertEndpointBudget(1, 'get', '/api/jobs/', status_code=304, HTTP_IF_NONE_MATCH=admin_etag)
+        self.client.force_authenticate(None)
+
+        job = Job.objects.get(pk=self.jobs[0].pk)
+        job.title = 'Staff Engineer'
+        job.save()
+        response = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_authenticated_and_non_json_reads_bypass_the_cache(self):
+        self.client.force_authenticate(self.admin)
+        self.assertCache(None, '/api/jobs/')
+        self.assertCache(None, '/api/jobs/')
+        self.client.force_authenticate(None)
+        self.assertCache(None, '/api/jobs/', {'format': 'api'})
+        self.assertCache(None, '/api/jobs/', HTTP_ACCEPT='text/html')
+        # Nothing above was stored for anonymous JSON reads
+        self.assertCache('MISS', '/api/jobs/')
+
+    def test_each_query_string_has_its_own_entry(self):
+        contract = self.assertCache('MISS', '/api/jobs/', {'job_type': 'contract'})
+        self.assertEqual(contract.data['count'], 2)
+        self.assertCache('MISS', '/api/jobs/', {'job_type': 'full-time'})
+        self.assertCache('MISS', '/api/jobs/', {'job_type': 'contract', 'page_size': 1})
+        self.assertCache('HIT', '/api/jobs/', {'job_type': 'contract'})
+        # Parameter order does not matter
+        self.assertCache('HIT', '/api/jobs/?page_size=1&job_type=contract')
+        self.assertCache('MISS', '/api/jobs/')
+
+    def test_writes_invalidate_cached_responses(self):
+        detail = f'/api/categories/{self.category.slug}/'
+        writes = [
+            lambda: Job.objects.get(pk=self.jobs[0].pk).save(),
+            lambda: Category.objects.get(pk=self.category.pk).save(),
+            lambda: Job.objects.get(pk=self.jobs[1].pk).delete(),
+        ]
+        for write in writes:
+            self.assertCache('MISS', '/api/jobs/')
+            self.assertCache('MISS', detail)
+            self.assertCache('HIT', '/api/jobs/')
+            write()
+        self.assertEqual(self.assertCache('MISS', '/api/jobs/').data['count'], 3)
+        self.assertEqual(self.assertCache('MISS', detail).data['jobs_count'], 3)
+
+    def test_bulk_imports_invalidate_cached_responses(self):
+        self.assertEqual(self.assertCache('MISS', '/api/jobs/').data['count'], 4)
+        self.assertCache('HIT', '/api/jobs/')
+        self.assertCache('MISS', '/api/categories/')
+        # bulk_create sends no signals; the importer bumps the generations itself
+        JobImporter(self.admin).run([{
+            'title': 'Imported Engineer', 'description': 'Build things', 'category': self.category.pk,
+            'company_name': 'Andela', 'location': 'Nairobi', 'job_type': 'contract',
+            'requirements': 'python', 'responsibilities': 'Ship',
+        }])
+        self.assertEqual(self.assertCache('MISS', '/api/jobs/').data['count'], 5)
+        self.assertEqual(self.assertCache('MISS', '/api/categories/').data['results'][0]['jobs_count'], 5)
+
+
+class FakeConnection:
+    autocommit = True
+
+    def __init__(self):
+        self.closed = 0
+        self.info = type('Info', (), {'transaction_status': TRANSACTION_STATUS_IDLE})()
+
+    def rollback(self):
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_connections_are_reused_up_to_the_limit(self):
+        pool = ConnectionPool('test', FakeConnection, max_size=1, timeout=0.01)
+        first = pool.getconn()
+        with self.assertRaises(OperationalError):
+            pool.getconn()
+        first.info.transaction_status = TRANSACTION_STATUS_INTRANS
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        self.assertEqual(first.info.transaction_status, TRANSACTION_STATUS_IDLE)
+        stats = pool.snapshot()
+        self.assertEqual((stats['checkouts'], stats['connects'], stats['timeouts'], stats['active']), (2, 1, 1, 1))
+
+    def test_broken_connections_are_replaced(self):
+        pool = ConnectionPool('test', FakeConnection, max_size=1)
+        first = pool.getconn()
+        pool.putconn(first)
+        first.closed = 2
+        second = pool.getconn()
+        self.assertIsNot(second, first)
+        self.assertEqual(pool.snapshot()['discards'], 1)
+
+
+class IndexAdvisorTests(SimpleTestCase):
+    scan = {
+        'Node Type': 'Seq Scan', 'Relation Name': 'jobs', 'Alias': 'jobs',
+        'Filter': "(is_active AND (category_id = 3) AND ((job_type)::text = 'full-time'::text))",
+    }
+    plan = {'Node Type': 'Limit', 'Plans': [
+        {'Node Type': 'Sort', 'Sort Key': ['jobs.created_at DESC'], 'Plans': [scan]},
+    ]}
+
+    def test_sort_over_filtered_scan_gives_partial_composite_index(self):
+        found = list(findings(self.plan, {'jobs': Job}, {'jobs': 100000}, 10000))
+        self.assertEqual([kind for kind, scan, sort in found], ['sort', 'seq scan'])
+        index = candidate_for(*found[0][1:], Job).index()
+        self.assertEqual(index.fields, ['category', 'job_type', '-created_at'])
+        self.assertEqual(index.condition.children, [('is_active', True)])
+        # Small tables and lookups by key are left alone
+        self.assertEqual(list(findings(self.plan, {'jobs': Job}, {'jobs': 500}, 10000)), [])
+        self.assertIsNone(candidate_for({**self.scan, 'Filter': '(id = 5)'}, None, Job))
+
+    def test_refuses_to_lock_tables_without_confirmation(self):
+        with self.assertRaisesMessage(CommandError, '--allow-table-locks'):
+            call_command('advise_indexes', stdout=StringIO())
@@ -0,0 +1,78 @@
+# apps/core/uploads.py
+"""
+Upload handlers that hash files as they stream in and refuse oversized
+uploads before the body has been read.
+
+They replace Django's default memory and temporary-file handlers; whichever
+one keeps a file also hashes its chunks and exposes the SHA-256 as
+``content_hash`` on the uploaded file, for ``ContentAddressedStorage``.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from rest_framework import parsers, status
+from rest_framework.exceptions import APIException
+
+
+class FileTooLarge(RequestDataTooBig):
+    pass
+
+
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Request body is too large.'
+    default_code = 'payload_too_large'
+
+
+def max_file_size():
+    return getattr(settings, 'FILE_UPLOAD_MAX_SIZE', 10 * 1024 * 1024)
+
+
+class HashingUploadMixin:
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Room for the file plus the ordinary form fields
+        limit = max_file_size() + (settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0)
+        if content_length and content_length > limit:
+            raise FileTooLarge(f'Upload of {content_length} bytes exceeds the {limit} byte limit.')
+        return super().handle_raw_input(input_data, META, content_length, boundary, encoding)
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        self.received = 0
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_file_size():
+            raise FileTooLarge(f'"{self.file_name}" is larger than {max_file_size()} bytes.')
+        remaining = super().receive_data_chunk(raw_data, start)
+        if remaining is None:
+            # This handler kept the chunk
+            self.hasher.update(raw_data)
+        return remaining
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self.hasher.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    pass
+
+
+class MultiPartParser(parsers.MultiPartParser):
+    """Answers uploads over the size limits with 413 rather than a bare 400."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return super().parse(stream, media_type, parser_context)
+        except RequestDataTooBig as exc:
+            raise PayloadTooLarge(str(exc))
@@ -0,0 +1,17 @@
+# apps/core/views.py
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_spectacular.utils import extend_schema
+
+from apps.authentication.permissions import IsAdminUser
+from .metrics import metrics
+
+@extend_schema(tags=['Monitoring'], description='Per-process performance metrics (Admin only)')
+class MetricsView(APIView):
+    """
+    Counters, timings and gauges collected by this worker process
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response(metrics.snapshot())
@@ -1,6 +1,7 @@
 # apps/jobs/admin.py
 from django.contrib import admin
-from .models import Job, Category
+from .geo import geohash
+from .models import ArchivedJob, Job, Category, Location
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -9,17 +10,28 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     ordering = ['name']
 
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ['name', 'country', 'latitude', 'longitude', 'geohash']
+    list_filter = ['country']
+    search_fields = ['name', 'aliases']
+    readonly_fields = ['geohash']
+    
+    def save_model(self, request, obj, form, change):
+        obj.geohash = geohash(obj.latitude, obj.longitude)
+        super().save_model(request, obj, form, change)
+
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ['title', 'company_name', 'category', 'location', 'job_type', 'is_active', 'created_at']
     list_filter = ['job_type', 'is_active', 'category', 'created_at']
     search_fields = ['title', 'company_name', 'location', 'description']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['place', 'created_at', 'updated_at']
     ordering = ['-created_at']
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('title', 'company_name', 'category', 'location', 'job_type')
+            'fields': ('title', 'company_name', 'category', 'location', 'place', 'job_type')
         }),
         ('Job Details', {
             'fields': ('description', 'requirements', 'responsibilities', 'benefits')
@@ -34,4 +46,18 @@ class JobAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(ArchivedJob)
+class ArchivedJobAdmin(admin.ModelAdmin):
+    list_display = ['title', 'company_name', 'category', 'application_deadline', 'archived_at']
+    list_filter = ['job_type', 'category', 'archived_at']
+    search_fields = ['title', 'company_name']
+    raw_id_fields = ['posted_by']
+    ordering = ['-archived_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
\ No newline at end of file
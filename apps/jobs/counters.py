@@ -0,0 +1,69 @@
+# apps/jobs/counters.py
+"""
+Set-based recomputation of the denormalized ``Job.applications_count`` and
+``Category.active_jobs_count`` columns. Signals keep them current row by
+row, diffing a job against its row as read under a lock (see
+``lock_counted_values``); ``reconcile_counters`` repairs drift left by writes that bypass them
+(``QuerySet.update()``, raw SQL, bulk operations).
+"""
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Now
+
+
+def lock_counted_values(job, using=None):
+    """
+    Lock ``job``'s row and return its stored ``is_active`` and ``category_id``
+    (None once the row is gone). Concurrent writers of the same job wait for
+    each other, so each sees what the previous one stored and a transition is
+    counted once. Call inside a transaction.
+    """
+    from .models import Job
+    rows = Job.objects.using(using).select_for_update().filter(pk=job.pk)
+    return rows.values('is_active', 'category_id').first()
+
+
+def adjust_active_jobs(category_id, delta):
+    """Shift ``Category.active_jobs_count`` by ``delta`` in a single UPDATE."""
+    from .models import Category
+    if category_id and delta:
+        # Touch updated_at too: the count is part of the category's representation
+        Category.objects.filter(pk=category_id).update(
+            active_jobs_count=Greatest(F('active_jobs_count') + delta, 0), updated_at=Now()
+        )
+
+
+def count_of(model, related_field, **filters):
+    """
+    Correlated ``COUNT(*)`` of ``model`` rows whose ``related_field``
+    points at the outer row.
+    """
+    rows = model.objects.filter(**{related_field: OuterRef('pk')}, **filters).order_by()
+    return Coalesce(
+        Subquery(rows.values(related_field).annotate(total=Count('pk')).values('total')),
+        Value(0),
+    )
+
+
+def counter_definitions():
+    from apps.applications.models import Application
+    from .models import Category, Job
+    return [
+        (Job, 'applications_count', count_of(Application, 'job')),
+        (Category, 'active_jobs_count', count_of(Job, 'category', is_active=True)),
+    ]
+
+
+def reconcile_counters(dry_run=False):
+    """
+    Fix rows whose stored counter disagrees with the live count.
+    Returns ``{'model.field': rows_fixed}``.
+    """
+    results = {}
+    for model, field, expression in counter_definitions():
+        drifted = model.objects.annotate(actual=expression).exclude(**{field: F('actual')})
+        label = f'{model._meta.label}.{field}'
+        if dry_run:
+            results[label] = drifted.count()
+        else:
+            results[label] = model.objects.filter(pk__in=drifted.values('pk')).update(**{field: expression})
+    return results
@@ -0,0 +1,163 @@
+# apps/jobs/expiry.py
+"""
+Expiry and archival of job postings.
+
+``expire_jobs`` deactivates active jobs whose ``application_deadline`` has
+passed. ``archive_jobs`` moves jobs that have been inactive and unchanged
+for ``JOB_ARCHIVE_AFTER_DAYS`` to ``jobs_archive``, and their applications
+to ``applications_archive``, so the live tables and their indexes only hold
+postings people can still act on.
+
+Both work through partial indexes in batches of ``JOB_EXPIRY_BATCH_SIZE``
+rows, one short transaction per batch, skipping jobs another transaction
+has locked. Run them with ``manage.py expire_jobs`` or, every
+``JOB_EXPIRY_INTERVAL`` seconds, from the task workers.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from apps.core.caching import bump_generation
+from .counters import adjust_active_jobs
+from .search import invalidate_indexes
+
+
+def _batch_size(batch_size):
+    return batch_size or getattr(settings, 'JOB_EXPIRY_BATCH_SIZE', 500)
+
+
+def _field_names(model, exclude=()):
+    return [field.attname for field in model._meta.concrete_fields if field.name not in exclude]
+
+
+def _jobs_changed():
+    from .models import Category, Job
+    bump_generation(Job)
+    bump_generation(Category)
+
+
+def expired_jobs(today=None):
+    from .models import Job
+    return Job.objects.filter(is_active=True, application_deadline__lt=today or timezone.localdate())
+
+
+def stale_jobs(before=None):
+    from .models import Job
+    if before is None:
+        before = timezone.now() - timedelta(days=getattr(settings, 'JOB_ARCHIVE_AFTER_DAYS', 180))
+    return Job.objects.filter(is_active=False, updated_at__lt=before)
+
+
+def expire_jobs(today=None, batch_size=None):
+    """Deactivate active jobs whose application deadline is before ``today``. Returns how many."""
+    from .models import Job
+    expired = expired_jobs(today).order_by('pk')
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                expired.select_for_update(skip_locked=True).values_list('pk', 'category_id')[:_batch_size(batch_size)]
+            )
+            if not rows:
+                break
+            Job.objects.filter(pk__in=[pk for pk, _ in rows]).update(is_active=False, updated_at=Now())
+            for category_id, count in Counter(category_id for _, category_id in rows).items():
+                adjust_active_jobs(category_id, -count)
+        total += len(rows)
+    if total:
+        _jobs_changed()
+        # Suggestions and the search fallback index active jobs only, in every process
+        invalidate_indexes()
+    return total
+
+
+def _archive_applications(jobs, application_fields, chunk_size):
+    """
+    Move up to ``chunk_size`` applications of ``jobs`` to the archive in one
+    transaction. Returns how many, 0 once none are left.
+    """
+    from apps.applications.models import (
+        Application, ApplicationDocument, ApplicationStatusChange, ArchivedApplication,
+    )
+
+    with transaction.atomic():
+        # Holds off a job being reopened while its applications move
+        locked = list(jobs.select_for_update(skip_locked=True).values_list('pk', flat=True))
+        rows = list(
+            Application.objects.filter(job_id__in=locked).order_by('pk').values(*application_fields)[:chunk_size]
+        )
+        if not rows:
+            return 0
+        application_ids = [row['id'] for row in rows]
+        history = defaultdict(list)
+        changes = ApplicationStatusChange.objects.filter(application_id__in=application_ids).order_by('changed_at')
+        for application_id, from_status, to_status, changed_by_id, changed_at in changes.values_list(
+            'application_id', 'from_status', 'to_status', 'changed_by_id', 'changed_at'
+        ).iterator(chunk_size=chunk_size):
+            history[application_id].append({
+                'from': from_status, 'to': to_status, 'changed_by': changed_by_id,
+                'changed_at': changed_at.isoformat(),
+            })
+        ArchivedApplication.objects.bulk_create(
+            [ArchivedApplication(**row, status_history=history[row['id']]) for row in rows], batch_size=chunk_size
+        )
+        changes.delete()
+        ApplicationDocument.objects.filter(application_id__in=application_ids).delete()
+        # No per-row signals: the resume references move to the archive rows, and
+        # the counters and funnels they would adjust belong to the jobs leaving too
+        live_applications = Application.objects.filter(pk__in=application_ids)
+        live_applications._raw_delete(live_applications.db)
+    return len(rows)
+
+
+def archive_jobs(before=None, batch_size=None):
+    """
+    Move jobs inactive and unchanged since ``before`` (default
+    ``JOB_ARCHIVE_AFTER_DAYS`` ago), with their applications, to the
+    archive tables. Returns ``(jobs, applications)`` moved.
+
+    Applications move first, at most ``batch_size`` per transaction however
+    many a job has, then their jobs. A job reopened meanwhile stays live
+    with the applications not yet moved.
+    """
+    from apps.applications.models import Application, ArchivedApplication, JobFunnel
+    from .models import ArchivedJob, Job, SimilarJob
+
+    batch = _batch_size(batch_size)
+    job_fields = _field_names(ArchivedJob, exclude=['archived_at'])
+    application_fields = _field_names(ArchivedApplication, exclude=['status_history', 'archived_at'])
+    stale = stale_jobs(before).order_by('pk')
+    jobs = applications = 0
+    last_pk = 0
+    while True:
+        # Walks forward by primary key, past jobs left behind locked or reopened
+        job_ids = list(stale.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch])
+        if not job_ids:
+            break
+        last_pk = job_ids[-1]
+        while moved := _archive_applications(stale.filter(pk__in=job_ids), application_fields, batch):
+            applications += moved
+        with transaction.atomic():
+            rows = list(
+                stale.filter(pk__in=job_ids)
+                .filter(~Exists(Application.objects.filter(job_id=OuterRef('pk'))))
+                .select_for_update(skip_locked=True).values(*job_fields)
+            )
+            if not rows:
+                continue
+            moved_ids = [row['id'] for row in rows]
+            ArchivedJob.objects.bulk_create([ArchivedJob(**row) for row in rows], batch_size=batch)
+            JobFunnel.objects.filter(job_id__in=moved_ids).delete()
+            SimilarJob.objects.filter(job_id__in=moved_ids).delete()
+            live_jobs = Job.objects.filter(pk__in=moved_ids)
+            live_jobs._raw_delete(live_jobs.db)
+        jobs += len(rows)
+    if jobs:
+        _jobs_changed()
+        invalidate_indexes()
+    return jobs, applications
@@ -0,0 +1,163 @@
+# apps/jobs/facets.py
+"""
+Facet counts for the job search sidebar.
+
+All facets of a filtered job set are counted by one statement: a single
+``GROUP BY GROUPING SETS`` pass on PostgreSQL, and a ``UNION ALL`` of
+``GROUP BY`` queries over one CTE elsewhere. Results are cached under the
+job and category cache generations (see ``apps.core.caching``), so any
+change to either invalidates them. The unfiltered counts, which every first
+page load asks for, are kept for ``ROLLUP_TIMEOUT`` rather than
+``RESPONSE_CACHE_TIMEOUT``, making them a rollup rebuilt once per change.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, CharField, F, Value, When
+
+from apps.core.caching import get_generations
+from apps.core.metrics import metrics
+from .filters import JobFilter
+from .models import Category, Job
+
+FACETS_PREFIX = 'job-facets'
+
+# Query parameters that change the counts
+FACET_PARAMS = (*JobFilter.base_filters, 'search')
+
+# (value, label, lower bound, upper bound) on ``salary_min``; bounds are inclusive, exclusive
+SALARY_BANDS = [
+    ('0-50000', 'Under 50,000', 0, 50_000),
+    ('50000-100000', '50,000 - 100,000', 50_000, 100_000),
+    ('100000-150000', '100,000 - 150,000', 100_000, 150_000),
+    ('150000-200000', '150,000 - 200,000', 150_000, 200_000),
+    ('200000-', '200,000 and over', 200_000, None),
+]
+UNSPECIFIED_SALARY = ('unspecified', 'Not specified', None, None)
+
+# Unfiltered counts are only replaced by a change; superseded generations still age out
+ROLLUP_TIMEOUT = 60 * 60
+
+# Most frequent locations returned; the long tail is left out
+LOCATION_LIMIT = 20
+
+# Output columns of the facet query: facet name, value, category name, category slug, count
+FACET_COLUMNS = {
+    'job_type': 'f_job_type',
+    'category': 'f_category',
+    'location': 'f_location',
+    'salary': 'f_salary',
+}
+
+
+def salary_band():
+    return Case(
+        *[When(salary_min__lt=upper, then=Value(value)) for value, _, _, upper in SALARY_BANDS if upper],
+        When(salary_min__isnull=False, then=Value(SALARY_BANDS[-1][0])),
+        default=Value(UNSPECIFIED_SALARY[0]),
+        output_field=CharField(),
+    )
+
+
+def facet_rows(queryset):
+    """SQL and params of one row per job in ``queryset``, holding its facet values."""
+    rows = queryset.order_by().values(
+        f_job_type=F('job_type'),
+        f_category=F('category_id'),
+        f_category_name=F('category__name'),
+        f_category_slug=F('category__slug'),
+        f_location=F('location'),
+        f_salary=salary_band(),
+    )
+    return rows.query.sql_with_params()
+
+
+def facet_sql(connection, rows_sql):
+    if connection.vendor == 'postgresql':
+        # GROUPING() tells the sets apart: bit 3 is f_job_type ... bit 0 is f_salary, 1 = not grouped
+        return f"""
+            SELECT CASE GROUPING(f_job_type, f_category, f_location, f_salary)
+                       WHEN 7 THEN 'job_type' WHEN 11 THEN 'category'
+                       WHEN 13 THEN 'location' WHEN 14 THEN 'salary' ELSE 'total' END,
+                   COALESCE(f_job_type, f_location, f_salary, f_category::text),
+                   f_category_name, f_category_slug, COUNT(*)
+            FROM ({rows_sql}) facet_rows
+            GROUP BY GROUPING SETS (
+                (f_job_type), (f_category, f_category_name, f_category_slug), (f_location), (f_salary), ()
+            )
+        """
+    selects = [
+        f"SELECT '{facet}', {column}, {'f_category_name, f_category_slug' if facet == 'category' else 'NULL, NULL'}, "
+        f"COUNT(*) FROM facet_rows GROUP BY {column}"
+        + (', f_category_name, f_category_slug' if facet == 'category' else '')
+        for facet, column in FACET_COLUMNS.items()
+    ]
+    selects.append("SELECT 'total', NULL, NULL, NULL, COUNT(*) FROM facet_rows")
+    return f'WITH facet_rows AS ({rows_sql}) ' + ' UNION ALL '.join(selects)
+
+
+def compute_facets(queryset):
+    """Count ``queryset`` by job type, category, location and salary band in one query."""
+    rows_sql, params = facet_rows(queryset)
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        cursor.execute(facet_sql(connection, rows_sql), params)
+        rows = cursor.fetchall()
+
+    job_types = dict(Job.JOB_TYPE_CHOICES)
+    bands = {band[0]: band for band in [*SALARY_BANDS, UNSPECIFIED_SALARY]}
+    facets = {'total': 0, **{facet: [] for facet in FACET_COLUMNS}}
+    for facet, value, category_name, category_slug, count in rows:
+        if facet == 'total':
+            facets['total'] = count
+        elif facet == 'job_type':
+            facets[facet].append({'value': value, 'label': job_types.get(value, value), 'count': count})
+        elif facet == 'category':
+            facets[facet].append({'value': int(value), 'label': category_name, 'slug': category_slug, 'count': count})
+        elif facet == 'location':
+            facets[facet].append({'value': value, 'label': value, 'count': count})
+        else:
+            _, label, lower, upper = bands[value]
+            facets[facet].append({'value': value, 'label': label, 'min': lower, 'max': upper, 'count': count})
+
+    for facet in ('job_type', 'category', 'location'):
+        facets[facet].sort(key=lambda item: (-item['count'], str(item['label'])))
+    del facets['location'][LOCATION_LIMIT:]
+    band_order = list(bands)
+    facets['salary'].sort(key=lambda item: band_order.index(item['value']))
+    return facets
+
+
+def facet_params(query_params):
+    return sorted(
+        (key, value)
+        for key in FACET_PARAMS
+        for value in query_params.getlist(key)
+        if value != ''
+    )
+
+
+def get_facets(queryset, query_params, scope=''):
+    """
+    Facet counts for ``queryset``, the jobs matching ``query_params``, cached
+    until a job or category changes. ``scope`` separates callers that see
+    different jobs for the same parameters (admins see inactive jobs).
+    """
+    if not getattr(settings, 'RESPONSE_CACHE_ENABLED', True):
+        return compute_facets(queryset)
+
+    params = facet_params(query_params)
+    raw = repr((scope, params, get_generations((Job, Category))))
+    key = f'{FACETS_PREFIX}:{hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest()}'
+    facets = cache.get(key)
+    if facets is not None:
+        metrics.incr('facets.hits')
+        return facets
+
+    metrics.incr('facets.misses')
+    facets = compute_facets(queryset)
+    timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60) if params else ROLLUP_TIMEOUT
+    cache.set(key, facets, timeout)
+    return facets
@@ -0,0 +1,59 @@
+# apps/jobs/filters.py
+import django_filters
+from rest_framework.exceptions import ValidationError
+from .geo import gazetteer, places_in_box, places_within
+from .models import Job
+
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 2000
+
+def _coordinates(value, count, param):
+    try:
+        numbers = [float(part) for part in value.split(',')]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count:
+        raise ValidationError({param: [f'Expected {count} comma-separated numbers.']})
+    return numbers
+
+class JobFilter(django_filters.FilterSet):
+    location = django_filters.CharFilter(lookup_expr='icontains')
+    salary_min = django_filters.NumberFilter(field_name='salary_min', lookup_expr='gte')
+    salary_max = django_filters.NumberFilter(field_name='salary_max', lookup_expr='lte')
+    near = django_filters.CharFilter(
+        method='filter_near', label='Place name or "latitude,longitude"; jobs within radius km of it'
+    )
+    radius = django_filters.NumberFilter(
+        method='filter_radius', min_value=0, max_value=MAX_RADIUS_KM,
+        label=f'Kilometres around near (default {DEFAULT_RADIUS_KM})'
+    )
+    bbox = django_filters.CharFilter(
+        method='filter_bbox', label='Jobs inside "south,west,north,east" (degrees)'
+    )
+    
+    class Meta:
+        model = Job
+        fields = ['category', 'location', 'job_type', 'salary_min', 'salary_max']
+    
+    def filter_near(self, queryset, name, value):
+        place = gazetteer.lookup(value)
+        if place is not None:
+            _, latitude, longitude = place
+        else:
+            if not any(char.isdigit() for char in value):
+                raise ValidationError({name: [f'Unknown place "{value}".']})
+            latitude, longitude = _coordinates(value, 2, name)
+        radius = self.form.cleaned_data.get('radius')
+        radius = DEFAULT_RADIUS_KM if radius is None else float(radius)
+        # Places found through the geohash index, jobs through the place foreign key
+        return queryset.filter(place__in=places_within(latitude, longitude, radius))
+    
+    def filter_radius(self, queryset, name, value):
+        # Applied by filter_near
+        return queryset
+    
+    def filter_bbox(self, queryset, name, value):
+        south, west, north, east = _coordinates(value, 4, name)
+        if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+            raise ValidationError({name: ['Expected south <= north within +-90 and west <= east within +-180.']})
+        return queryset.filter(place__in=list(places_in_box(south, west, north, east)))
@@ -0,0 +1,223 @@
+# apps/jobs/geo.py
+"""
+Normalized job locations and radius search.
+
+A bundled offline gazetteer (``data/gazetteer.csv``: place, country,
+coordinates and alternative spellings) is loaded into ``Location``. Jobs are
+resolved to a place when saved: the free-text location is normalized
+(case, accents, punctuation) and matched, whole or by its comma-separated
+parts, against the names and aliases of every place, held in a per-process
+index.
+
+Every place stores the geohash of its coordinates. A radius or bounding box
+search turns the area into the few geohash cells that cover it, reads the
+places in those cells through the indexed ``geohash`` prefix, keeps those
+truly inside, and filters jobs on the indexed ``place`` foreign key. Neither
+table is scanned.
+"""
+import csv
+import math
+import re
+import threading
+import unicodedata
+from pathlib import Path
+
+from django.db import transaction
+from django.db.models import Q
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+# Most geohash cells a search may expand to; larger areas use coarser cells
+MAX_CELLS = 32
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+PARTS_RE = re.compile(r'[,/;()|]|\s-\s')
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode('ascii')
+    return NON_ALNUM_RE.sub(' ', text.lower()).strip()
+
+
+def geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """``(latitude, longitude)`` degrees spanned by a geohash cell of ``precision``."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_cells(south, west, north, east, max_cells=MAX_CELLS):
+    """The finest geohash cells, at most ``max_cells``, that together cover the box."""
+    south, north = max(south, -90.0), min(north, 90.0)
+    west, east = max(west, -180.0), min(east, 180.0)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lon_size = cell_size(precision)
+        rows = range(math.floor((south + 90) / lat_size), math.floor((min(north, 89.999999) + 90) / lat_size) + 1)
+        columns = range(math.floor((west + 180) / lon_size), math.floor((min(east, 179.999999) + 180) / lon_size) + 1)
+        if len(rows) * len(columns) <= max_cells:
+            return sorted({
+                geohash(-90 + (row + 0.5) * lat_size, -180 + (column + 0.5) * lon_size, precision)
+                for row in rows for column in columns
+            })
+    # Larger than the precision-1 grid allows: every cell
+    return list(GEOHASH_ALPHABET)
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_box(latitude, longitude, radius_km):
+    """``(south, west, north, east)`` enclosing the circle."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    lon_delta = 180.0 if cos_lat < 1e-6 else min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return latitude - lat_delta, longitude - lon_delta, latitude + lat_delta, longitude + lon_delta
+
+
+def places_in_box(south, west, north, east):
+    """``{id: (latitude, longitude)}`` of the places inside the box, found by geohash prefix."""
+    from .models import Location
+    cells = Q()
+    for cell in covering_cells(south, west, north, east):
+        cells |= Q(geohash__startswith=cell)
+    rows = Location.objects.filter(cells).values_list('id', 'latitude', 'longitude')
+    return {
+        pk: (latitude, longitude)
+        for pk, latitude, longitude in rows
+        if south <= latitude <= north and west <= longitude <= east
+    }
+
+
+def places_within(latitude, longitude, radius_km):
+    """Ids of the places at most ``radius_km`` from the point."""
+    return [
+        pk for pk, (lat, lon) in places_in_box(*radius_box(latitude, longitude, radius_km)).items()
+        if distance_km(latitude, longitude, lat, lon) <= radius_km
+    ]
+
+
+class Gazetteer:
+    """Per-process map of normalized place names and aliases to ``Location`` rows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._places = None
+
+    def _load(self):
+        from .models import Location
+        places = {}
+        rows = Location.objects.order_by('id').values_list('id', 'name', 'aliases', 'latitude', 'longitude')
+        for pk, name, aliases, latitude, longitude in rows:
+            for key in [name, *aliases.split('|')]:
+                key = normalize(key)
+                if key:
+                    places.setdefault(key, (pk, latitude, longitude))
+        return places
+
+    def places(self):
+        with self._lock:
+            if self._places is None:
+                self._places = self._load()
+            return self._places
+
+    def reset(self):
+        with self._lock:
+            self._places = None
+
+    def lookup(self, text):
+        """``(id, latitude, longitude)`` of the place ``text`` names, else ``None``."""
+        places = self.places()
+        key = normalize(text)
+        if key in places:
+            return places[key]
+        # "Westlands, Nairobi, Kenya": the first part that names a place
+        for part in PARTS_RE.split(str(text or '')):
+            part = normalize(part)
+            if part in places:
+                return places[part]
+        return None
+
+    def resolve(self, text):
+        """Id of the ``Location`` that ``text`` names, else ``None``."""
+        place = self.lookup(text)
+        return place[0] if place else None
+
+
+gazetteer = Gazetteer()
+
+
+def read_gazetteer(path=GAZETTEER_PATH):
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            latitude, longitude = float(row['latitude']), float(row['longitude'])
+            yield {
+                'name': row['name'],
+                'country': row['country'],
+                'latitude': latitude,
+                'longitude': longitude,
+                'geohash': geohash(latitude, longitude),
+                'aliases': row['aliases'] or '',
+            }
+
+
+def load_gazetteer(location_model=None, path=GAZETTEER_PATH):
+    """Create or update a ``Location`` per gazetteer row; returns ``(created, updated)``."""
+    if location_model is None:
+        from .models import Location as location_model
+    existing = {
+        (name, country): pk for pk, name, country in location_model.objects.values_list('id', 'name', 'country')
+    }
+    created, updated = [], []
+    for row in read_gazetteer(path):
+        pk = existing.get((row['name'], row['country']))
+        (created if pk is None else updated).append(location_model(pk=pk, **row))
+    with transaction.atomic():
+        location_model.objects.bulk_create(created)
+        location_model.objects.bulk_update(updated, ['latitude', 'longitude', 'geohash', 'aliases'])
+    gazetteer.reset()
+    return len(created), len(updated)
+
+
+def resolve_job_locations(queryset=None):
+    """
+    Point every job in ``queryset`` (default: all) at the place its location
+    names, one UPDATE per distinct location text. Returns rows changed.
+    ``updated_at`` is left alone: the job itself has not been edited.
+    """
+    from .models import Job
+    queryset = (Job.objects.all() if queryset is None else queryset).order_by()
+    changed = 0
+    for text in list(queryset.values_list('location', flat=True).distinct()):
+        place_id = gazetteer.resolve(text)
+        changed += queryset.filter(location=text).exclude(place_id=place_id).update(place_id=place_id)
+    return changed
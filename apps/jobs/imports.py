@@ -0,0 +1,127 @@
+# apps/jobs/imports.py
+"""
+Bulk job import.
+
+Rows are processed in batches of ``JOB_IMPORT_BATCH_SIZE``. The categories
+referenced by a batch are fetched with one query, every row is validated by
+a single reused serializer, and the valid rows are written with one
+``bulk_create`` in the batch's own transaction. Invalid rows are reported by
+their 1-based position and never block the rest of the import.
+
+``bulk_create`` skips ``Job.save`` and model signals, so the importer applies
+their effects itself: gazetteer places, category counters per batch, the
+suggestion and in-process search indexes, and one response cache
+invalidation at the end.
+"""
+import codecs
+import csv
+import time
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from apps.core.caching import bump_generation
+from apps.core.metrics import metrics
+from .counters import adjust_active_jobs
+from .geo import gazetteer
+from .models import Category, Job
+from .search import search_index, uses_search_vector
+from .serializers import JobImportRowSerializer
+from .suggest import SUGGEST_FIELDS, suggestion_index
+
+
+def read_csv(uploaded_file):
+    """Yield the rows of an uploaded CSV file as dicts, without empty cells."""
+    reader = csv.DictReader(codecs.iterdecode(uploaded_file, 'utf-8-sig'))
+    for row in reader:
+        yield {
+            key.strip(): value for key, value in row.items()
+            if isinstance(key, str) and isinstance(value, str) and value.strip()
+        }
+
+
+def _category_ids(batch):
+    ids = set()
+    for row in batch:
+        try:
+            ids.add(int(row.get('category')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    return ids
+
+
+class JobImporter:
+    def __init__(self, posted_by, dry_run=False, batch_size=None, max_rows=None):
+        self.posted_by = posted_by
+        self.dry_run = dry_run
+        self.batch_size = batch_size or getattr(settings, 'JOB_IMPORT_BATCH_SIZE', 500)
+        self.max_rows = max_rows or getattr(settings, 'JOB_IMPORT_MAX_ROWS', 10000)
+
+    def run(self, rows):
+        """
+        Import ``rows`` (an iterable of dicts) and return a summary with the
+        created and failed counts, per-row errors and throughput.
+        """
+        rows = list(islice(rows, self.max_rows + 1))
+        if not rows:
+            raise serializers.ValidationError('No rows to import.')
+        if len(rows) > self.max_rows:
+            raise serializers.ValidationError(f'Imports are limited to {self.max_rows} rows per request.')
+
+        started = time.perf_counter()
+        created, errors = 0, []
+        for offset in range(0, len(rows), self.batch_size):
+            jobs, batch_errors = self.validate_batch(rows[offset:offset + self.batch_size], offset)
+            errors.extend(batch_errors)
+            if jobs and not self.dry_run:
+                self.insert(jobs)
+            created += len(jobs)
+        if created and not self.dry_run:
+            bump_generation(Job)
+            bump_generation(Category)
+
+        elapsed = time.perf_counter() - started
+        rows_per_second = len(rows) / elapsed if elapsed else 0.0
+        if not self.dry_run:
+            metrics.incr('jobs.import.rows', created)
+            metrics.observe('jobs.import.rows_per_second', rows_per_second)
+        return {
+            'created': created,
+            'failed': len(errors),
+            'dry_run': self.dry_run,
+            'errors': errors,
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'rows_per_second': round(rows_per_second, 1),
+        }
+
+    def validate_batch(self, batch, offset):
+        categories = Category.objects.order_by().in_bulk(_category_ids(batch))
+        serializer = JobImportRowSerializer(context={'categories': categories})
+        jobs, errors = [], []
+        for position, row in enumerate(batch, start=offset + 1):
+            if not isinstance(row, dict):
+                errors.append({'row': position, 'errors': {'non_field_errors': ['Expected an object.']}})
+                continue
+            try:
+                data = serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                errors.append({'row': position, 'errors': exc.detail})
+                continue
+            jobs.append(Job(posted_by=self.posted_by, place_id=gazetteer.resolve(data['location']), **data))
+        return jobs, errors
+
+    def insert(self, jobs):
+        with transaction.atomic():
+            Job.objects.bulk_create(jobs)
+            active = Counter(job.category_id for job in jobs if job.is_active)
+            for category_id, count in active.items():
+                adjust_active_jobs(category_id, count)
+        suggestion_index.jobs_created(
+            [{field: getattr(job, field) for field in SUGGEST_FIELDS} for job in jobs]
+        )
+        if not uses_search_vector():
+            for job in jobs:
+                search_index.update(job)
@@ -0,0 +1,89 @@
+# apps/jobs/management/commands/benchmark_search.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from apps.core.benchmark import percentile
+from apps.core.datasets import DatasetGenerator
+from apps.jobs.models import Job
+from apps.jobs.search import JobSearchFilter, search_index, uses_search_vector
+
+DEFAULT_QUERIES = ['python', 'senior backend engineer', 'django postgresql', 'kubernetes', 'safaricom']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ranked job search against the legacy icontains scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100_000,
+                            help='Number of jobs the table should hold (default: 100000)')
+        parser.add_argument('--generate', action='store_true',
+                            help='Insert synthetic jobs until the table holds --jobs rows')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query (default: 20)')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--query', action='append', dest='queries',
+                            help='Search query to benchmark (repeatable)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['generate']:
+            self.generate(options['jobs'], options['seed'])
+
+        total = Job.objects.count()
+        backend = 'tsvector/GIN' if uses_search_vector() else 'in-process index'
+        self.stdout.write(f'{total} jobs, backend: {backend}, repeat: {options["repeat"]}\n')
+
+        if not uses_search_vector():
+            started = time.perf_counter()
+            search_index.build()
+            self.stdout.write(f'in-process index built in {(time.perf_counter() - started) * 1000:.0f} ms\n')
+
+        header = f'{"query":<28} {"matches":>8} {"icontains p50":>14} {"ranked p50":>11} {"ranked p95":>11}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for text in options['queries'] or DEFAULT_QUERIES:
+            legacy = self.time_runs(lambda: self.legacy_page(text, options['page_size']), options['repeat'])
+            ranked = self.time_runs(lambda: self.ranked_page(text, options['page_size']), options['repeat'])
+            matches = self.ranked_queryset(text).count()
+            self.stdout.write(
+                f'{text:<28} {matches:>8} {statistics.median(legacy):>11.1f} ms '
+                f'{statistics.median(ranked):>8.1f} ms {percentile(ranked, 95):>8.1f} ms'
+            )
+
+    def generate(self, target, seed):
+        self.stdout.write(f'Topping up to {target} jobs...')
+        DatasetGenerator(seed=seed).generate(categories=4, jobs=target)
+
+    def legacy_page(self, text, page_size):
+        # What DRF's SearchFilter generated for search_fields on the four columns
+        condition = Q()
+        for term in text.split():
+            condition &= (Q(title__icontains=term) | Q(description__icontains=term) |
+                          Q(company_name__icontains=term) | Q(requirements__icontains=term))
+        queryset = Job.objects.filter(condition, is_active=True).order_by('-created_at')
+        queryset.count()
+        list(queryset.values_list('id', flat=True)[:page_size])
+
+    def ranked_queryset(self, text):
+        request = Request(RequestFactory().get('/api/jobs/', {'search': text}))
+        queryset = Job.objects.filter(is_active=True).order_by('-created_at')
+        return JobSearchFilter().filter_queryset(request, queryset, view=None)
+
+    def ranked_page(self, text, page_size):
+        queryset = self.ranked_queryset(text)
+        queryset.count()
+        list(queryset.values_list('id', flat=True)[:page_size])
+
+    def time_runs(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        connection.queries_log.clear()
+        return timings
@@ -0,0 +1,25 @@
+# apps/jobs/management/commands/build_similar_jobs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.similarity import refresh_similar_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Compute the most similar active jobs of every job created or edited since the last run '
+        '(TF-IDF over title, requirements and description) for /api/jobs/{id}/similar/'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recompute every job, refreshing the term weights of unchanged ones')
+        parser.add_argument('--chunk-size', type=int, help='Jobs compared against all others at a time')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        jobs = refresh_similar_jobs(full=options['full'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Similar jobs computed for {jobs} jobs in {time.perf_counter() - started:.1f}s'
+        ))
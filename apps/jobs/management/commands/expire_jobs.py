@@ -0,0 +1,37 @@
+# apps/jobs/management/commands/expire_jobs.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.jobs.expiry import archive_jobs, expire_jobs, expired_jobs, stale_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Deactivate jobs whose application deadline has passed, then move jobs inactive for longer than '
+        'the retention window, with their applications, to the archive tables. Schedule it (e.g. hourly)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archive-after-days', type=int, default=settings.JOB_ARCHIVE_AFTER_DAYS,
+                            help=f'Archive jobs inactive and unchanged for this many days '
+                                 f'(default: {settings.JOB_ARCHIVE_AFTER_DAYS})')
+        parser.add_argument('--no-archive', action='store_true', help='Only deactivate expired jobs')
+        parser.add_argument('--batch-size', type=int, default=settings.JOB_EXPIRY_BATCH_SIZE,
+                            help=f'Rows per transaction (default: {settings.JOB_EXPIRY_BATCH_SIZE})')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be done')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['archive_after_days'])
+        if options['dry_run']:
+            self.stdout.write(f'{expired_jobs().count()} jobs would be deactivated')
+            if not options['no_archive']:
+                self.stdout.write(f'{stale_jobs(before).count()} inactive jobs would be archived')
+            return
+        expired = expire_jobs(batch_size=options['batch_size'])
+        self.stdout.write(f'{expired} past-deadline jobs deactivated')
+        if not options['no_archive']:
+            jobs, applications = archive_jobs(before, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{jobs} jobs and {applications} applications archived'))
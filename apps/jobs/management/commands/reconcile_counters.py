@@ -0,0 +1,20 @@
+# apps/jobs/management/commands/reconcile_counters.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.jobs.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute Job.applications_count and Category.active_jobs_count where they have drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows have drifted')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            results = reconcile_counters(dry_run=options['dry_run'])
+        verb = 'drifted' if options['dry_run'] else 'fixed'
+        for label, rows in results.items():
+            self.stdout.write(f'{label}: {rows} rows {verb}')
@@ -0,0 +1,23 @@
+# apps/jobs/management/commands/resolve_locations.py
+from django.core.management.base import BaseCommand
+
+from apps.core.caching import bump_generation
+from apps.jobs.geo import load_gazetteer, resolve_job_locations
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Load the bundled gazetteer and point every job at the place its location names'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--unresolved', action='store_true',
+                            help='Only jobs without a place yet')
+
+    def handle(self, *args, **options):
+        created, updated = load_gazetteer()
+        self.stdout.write(f'Gazetteer: {created} places added, {updated} updated')
+        jobs = Job.objects.filter(place__isnull=True) if options['unresolved'] else None
+        changed = resolve_job_locations(jobs)
+        if changed:
+            bump_generation(Job)
+        self.stdout.write(self.style.SUCCESS(f'{changed} jobs resolved'))
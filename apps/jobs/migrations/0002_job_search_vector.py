@@ -0,0 +1,62 @@
+# Generated by Django 5.0.1 on 2026-10-18 02:37
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION jobs_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.company_name, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.requirements, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER jobs_search_vector
+    BEFORE INSERT OR UPDATE OF title, company_name, requirements, description, search_vector
+    ON jobs FOR EACH ROW EXECUTE FUNCTION jobs_search_vector_update();
+
+UPDATE jobs SET search_vector = NULL;
+
+CREATE INDEX jobs_search_vector_gin ON jobs USING gin (search_vector);
+"""
+
+DROP_SEARCH_TRIGGER_SQL = """
+DROP INDEX IF EXISTS jobs_search_vector_gin;
+DROP TRIGGER IF EXISTS jobs_search_vector ON jobs;
+DROP FUNCTION IF EXISTS jobs_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    # Other backends use the in-process index in apps/jobs/search.py
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(SEARCH_TRIGGER_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='job',
+            options={'ordering': ['created_at']},
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
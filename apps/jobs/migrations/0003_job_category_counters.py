@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-18 02:46
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Application = apps.get_model('applications', 'Application')
+    Category = apps.get_model('jobs', 'Category')
+    Job = apps.get_model('jobs', 'Job')
+
+    def count_of(model, related_field, **filters):
+        rows = model.objects.filter(**{related_field: OuterRef('pk')}, **filters).order_by()
+        return Coalesce(
+            Subquery(rows.values(related_field).annotate(total=Count('pk')).values('total')),
+            Value(0),
+        )
+
+    Job.objects.update(applications_count=count_of(Application, 'job'))
+    Category.objects.update(active_jobs_count=count_of(Job, 'category', is_active=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_search_vector'),
+        ('applications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='active_jobs_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
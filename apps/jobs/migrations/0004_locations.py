@@ -0,0 +1,47 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.jobs.geo import load_gazetteer
+
+
+def load_places(apps, schema_editor):
+    # Jobs are pointed at their places by `manage.py resolve_locations`
+    load_gazetteer(apps.get_model('jobs', 'Location'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_category_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('country', models.CharField(help_text='ISO 3166-1 alpha-2 code', max_length=2)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('geohash', models.CharField(db_index=True, max_length=12)),
+                ('aliases', models.CharField(blank=True, help_text='Alternative spellings, separated by |', max_length=255)),
+            ],
+            options={
+                'db_table': 'locations',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='location',
+            constraint=models.UniqueConstraint(fields=('name', 'country'), name='unique_location_name_country'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='place',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='jobs.location'),
+        ),
+        migrations.RunPython(load_places, migrations.RunPython.noop),
+    ]
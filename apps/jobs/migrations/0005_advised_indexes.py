@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:58
+
+import apps.core.operations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0004_locations'),
+    ]
+
+    operations = [
+        apps.core.operations.AddIndexConcurrently(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['job_type', 'category', '-created_at'], name='jobs_job_typ_067a01_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.1 on 2026-10-18 04:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_advised_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('company_name', models.CharField(max_length=200)),
+                ('location', models.CharField(max_length=200)),
+                ('job_type', models.CharField(choices=[('full-time', 'Full Time'), ('part-time', 'Part Time'), ('contract', 'Contract'), ('internship', 'Internship')], max_length=20)),
+                ('salary_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('salary_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('requirements', models.TextField()),
+                ('responsibilities', models.TextField()),
+                ('benefits', models.TextField(blank=True)),
+                ('application_deadline', models.DateField(blank=True, null=True)),
+                ('applications_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'jobs_archive',
+                'ordering': ['-archived_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['application_deadline'], name='jobs_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['updated_at'], name='jobs_inactive_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedjob',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to='jobs.category'),
+        ),
+        migrations.AddField(
+            model_name='archivedjob',
+            name='place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='jobs.location'),
+        ),
+        migrations.AddField(
+            model_name='archivedjob',
+            name='posted_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedjob',
+            index=models.Index(fields=['-archived_at'], name='jobs_archiv_archive_928702_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 04:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('job', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='similar_jobs', to='jobs.job')),
+                ('similar', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='jobs.job')),
+            ],
+            options={
+                'db_table': 'jobs_similar',
+                'ordering': ['job', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similarjob',
+            constraint=models.UniqueConstraint(fields=('job', 'rank'), name='jobs_similar_rank_uniq'),
+        ),
+    ]
@@ -1,11 +1,14 @@
-from django.db import models
-
+from django.db import models, router, transaction
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
+from .counters import lock_counted_values
+from .geo import gazetteer
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     slug = models.SlugField(unique=True)
+    active_jobs_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -20,6 +23,26 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class Location(models.Model):
+    """A place from the bundled gazetteer (see ``apps.jobs.geo``)."""
+    name = models.CharField(max_length=100)
+    country = models.CharField(max_length=2, help_text="ISO 3166-1 alpha-2 code")
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    # Prefix searches on the geohash find the places inside an area
+    geohash = models.CharField(max_length=12, db_index=True)
+    aliases = models.CharField(max_length=255, blank=True, help_text="Alternative spellings, separated by |")
+    
+    class Meta:
+        db_table = 'locations'
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'country'], name='unique_location_name_country'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name}, {self.country}"
+
 class Job(models.Model):
     JOB_TYPE_CHOICES = [
         ('full-time', 'Full Time'),
@@ -33,6 +56,8 @@ class Job(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='jobs')
     company_name = models.CharField(max_length=200)
     location = models.CharField(max_length=200)
+    # Gazetteer place named by ``location``, resolved on save; null when unknown (e.g. "Remote")
+    place = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='jobs')
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
     salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -41,9 +66,12 @@ class Job(models.Model):
     benefits = models.TextField(blank=True)
     application_deadline = models.DateField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    applications_count = models.PositiveIntegerField(default=0, editable=False)
     posted_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='posted_jobs')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted full-text document, maintained by a database trigger on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         db_table = 'jobs'
@@ -54,7 +82,103 @@ class Job(models.Model):
             models.Index(fields=['category']),
             models.Index(fields=['-created_at']),
             models.Index(fields=['is_active']),
+            models.Index(
+                fields=['job_type', 'category', '-created_at'], condition=models.Q(is_active=True),
+                name='jobs_job_typ_067a01_idx',
+            ),
+            # Expiry and archival (apps.jobs.expiry) find their batches without scanning
+            models.Index(
+                fields=['application_deadline'], condition=models.Q(is_active=True), name='jobs_expiry_idx'
+            ),
+            models.Index(fields=['updated_at'], condition=models.Q(is_active=False), name='jobs_inactive_idx'),
         ]
     
     def __str__(self):
         return f"{self.title} at {self.company_name}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of the stored row, used by signal handlers to diff changes
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'location' in update_fields:
+            if self._state.adding or self.location != getattr(self, '_loaded_values', {}).get('location'):
+                self.place_id = gazetteer.resolve(self.location)
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'place'}
+        counted = update_fields is None or bool({'is_active', 'category', 'category_id'} & set(update_fields))
+        if self._state.adding or not counted:
+            super().save(*args, **kwargs)
+        else:
+            using = kwargs.get('using') or router.db_for_write(Job, instance=self)
+            with transaction.atomic(using=using):
+                # Read by the active_jobs_count signal handler instead of the possibly stale _loaded_values
+                self._counted_values = lock_counted_values(self, using)
+                super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+class SimilarJob(models.Model):
+    """
+    One of the nearest neighbours of ``job`` by TF-IDF cosine similarity,
+    written by ``apps.jobs.similarity.refresh_similar_jobs``.
+    """
+    # Looked up through the unique (job, rank) index
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, db_index=False, related_name='similar_jobs')
+    # No constraint: rows pointing at deleted or archived jobs are replaced on the next refresh
+    similar = models.ForeignKey(Job, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'jobs_similar'
+        ordering = ['job', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'rank'], name='jobs_similar_rank_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id} ~ {self.similar_id} ({self.score:.3f})"
+
+class ArchivedJob(models.Model):
+    """
+    A job moved out of ``jobs`` by ``apps.jobs.expiry.archive_jobs``, keeping
+    its id and columns. Read only.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='archived_jobs')
+    company_name = models.CharField(max_length=200)
+    location = models.CharField(max_length=200)
+    place = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    job_type = models.CharField(max_length=20, choices=Job.JOB_TYPE_CHOICES)
+    salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    requirements = models.TextField()
+    responsibilities = models.TextField()
+    benefits = models.TextField(blank=True)
+    application_deadline = models.DateField(null=True, blank=True)
+    applications_count = models.PositiveIntegerField(default=0)
+    posted_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_jobs')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'jobs_archive'
+        ordering = ['-archived_at']
+        indexes = [
+            models.Index(fields=['-archived_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} at {self.company_name} (archived)"
@@ -0,0 +1,216 @@
+# apps/jobs/search.py
+"""
+Ranked full-text search over job postings.
+
+Every job has a weighted search document built from its title (A), company
+name (B), requirements (C) and description (D). On PostgreSQL the document is
+stored in ``Job.search_vector``, kept current by a trigger and served from a
+GIN index. On other databases (SQLite test runs) the documents of active
+jobs are held in an in-process inverted index maintained from model signals,
+which hands the query the ``SEARCH_INDEX_MAX_RESULTS`` best matches that
+pass its other filters.
+"""
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, FloatField, F, Value, When
+from django.db.models.functions import Cast
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from apps.core.caching import bump_generation, get_generations
+
+SEARCH_CONFIG = 'english'
+
+# (field, weight) pairs making up the search document, most important first.
+SEARCH_DOCUMENT = [
+    ('title', 'A'),
+    ('company_name', 'B'),
+    ('requirements', 'C'),
+    ('description', 'D'),
+]
+
+# Mirrors PostgreSQL's default ts_rank weights {D, C, B, A} = {0.1, 0.2, 0.4, 1.0}.
+WEIGHT_VALUES = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Shared cache generation of the in-process job indexes. Bulk changes the
+# model signals never see (expiry, archival) bump it, and every process
+# rebuilds its search and suggestion indexes on the next lookup after it moved.
+INDEX_GENERATION = 'jobs.index'
+
+
+def uses_search_vector(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def index_generation():
+    return get_generations([INDEX_GENERATION])[0]
+
+
+def invalidate_indexes():
+    bump_generation(INDEX_GENERATION)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class InMemorySearchIndex:
+    """
+    Inverted index of ``term -> {job_id: weighted term frequency}`` over
+    active jobs, for databases without native full-text search. Built lazily
+    from the ``jobs`` table and updated incrementally by the job signals.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        self._built = False
+        self._generation = None
+
+    def _document_terms(self, values):
+        terms = defaultdict(float)
+        for field, weight in SEARCH_DOCUMENT:
+            for token in tokenize(values.get(field)):
+                terms[token] += WEIGHT_VALUES[weight]
+        return terms
+
+    def build(self):
+        from .models import Job
+        fields = [field for field, _ in SEARCH_DOCUMENT]
+        with self._lock:
+            self._generation = index_generation()
+            self._postings = defaultdict(dict)
+            self._documents = {}
+            rows = Job.objects.filter(is_active=True).values('id', *fields).iterator(chunk_size=2000)
+            for row in rows:
+                self._add(row['id'], row)
+            self._built = True
+
+    def _add(self, job_id, values):
+        terms = self._document_terms(values)
+        for term, score in terms.items():
+            self._postings[term][job_id] = score
+        self._documents[job_id] = list(terms)
+
+    def _remove(self, job_id):
+        for term in self._documents.pop(job_id, []):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(job_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def update(self, job):
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(job.pk)
+            if job.is_active:
+                self._add(job.pk, {field: getattr(job, field) for field, _ in SEARCH_DOCUMENT})
+
+    def remove(self, job_id):
+        with self._lock:
+            if self._built:
+                self._remove(job_id)
+
+    def reset(self):
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._documents = {}
+            self._built = False
+
+    def search(self, text, limit=None):
+        """
+        Return ``{job_id: rank}`` for jobs containing every query term, only
+        the ``limit`` best ranked when given.
+        """
+        terms = set(tokenize(text))
+        if not terms:
+            return {}
+        with self._lock:
+            if not self._built or self._generation != index_generation():
+                self.build()
+            postings = sorted((self._postings.get(term, {}) for term in terms), key=len)
+            if not postings[0]:
+                return {}
+            total = max(len(self._documents), 1)
+            matches = {}
+            for job_id in postings[0]:
+                if all(job_id in other for other in postings[1:]):
+                    matches[job_id] = sum(
+                        p[job_id] * math.log(1 + total / len(p)) for p in postings
+                    )
+        if limit is not None and len(matches) > limit:
+            matches = dict(heapq.nlargest(limit, matches.items(), key=lambda item: item[1]))
+        return matches
+
+
+search_index = InMemorySearchIndex()
+
+
+class JobSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for DRF's ``SearchFilter`` on the jobs endpoint.
+
+    Matches the ``search`` parameter against the weighted search document and
+    annotates ``search_rank``. Unless the client asked for an explicit
+    ``ordering``, results come back most relevant first. Must be listed after
+    ``OrderingFilter`` so the relevance ordering is not overridden.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+
+        if uses_search_vector(queryset.db):
+            query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+            # ts_rank returns float4; widen it so keyset cursors round-trip exactly
+            queryset = queryset.filter(search_vector=query).annotate(
+                search_rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+            )
+        else:
+            ranks = search_index.search(text)
+            limit = getattr(settings, 'SEARCH_INDEX_MAX_RESULTS', 500)
+            if len(ranks) > limit:
+                # Bounded so the IN list and the CASE below stay within SQLite's limits
+                ranks = self.best_matching(queryset, ranks, limit)
+            if not ranks:
+                return queryset.none()
+            queryset = queryset.filter(pk__in=list(ranks)).annotate(
+                search_rank=Case(
+                    *[When(pk=pk, then=Value(rank)) for pk, rank in ranks.items()],
+                    output_field=FloatField(),
+                )
+            )
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
+
+    def best_matching(self, queryset, ranks, limit):
+        """
+        The ``limit`` best ranked of ``ranks`` whose jobs are in ``queryset``,
+        checked ``limit`` candidates per query so filters never drop results.
+        """
+        ranked = sorted(ranks, key=ranks.get, reverse=True)
+        kept = {}
+        for start in range(0, len(ranked), limit):
+            candidates = ranked[start:start + limit]
+            allowed = set(queryset.filter(pk__in=candidates).order_by().values_list('pk', flat=True))
+            for pk in candidates:
+                if pk in allowed:
+                    kept[pk] = ranks[pk]
+                    if len(kept) == limit:
+                        return kept
+        return kept
@@ -1,18 +1,21 @@
 # apps/jobs/serializers.py
 from rest_framework import serializers
-from .models import Job, Category
+from .models import ArchivedJob, Job, Category, Location
+from .suggest import SUGGESTION_TYPES
 from apps.authentication.serializers import UserSerializer
 
 class CategorySerializer(serializers.ModelSerializer):
-    jobs_count = serializers.SerializerMethodField()
+    jobs_count = serializers.IntegerField(source='active_jobs_count', read_only=True)
     
     class Meta:
         model = Category
         fields = ['id', 'name', 'description', 'slug', 'jobs_count', 'created_at']
         read_only_fields = ['id', 'created_at']
-    
-    def get_jobs_count(self, obj):
-        return obj.jobs.filter(is_active=True).count()
+
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Location
+        fields = ['id', 'name', 'country', 'latitude', 'longitude']
 
 class JobListSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -25,6 +28,14 @@ class JobListSerializer(serializers.ModelSerializer):
             'salary_min', 'salary_max', 'category_name', 'posted_by_name',
             'is_active', 'created_at', 'application_deadline'
         ]
+        # Columns behind computed fields, for sparse fieldsets (apps.core.fieldsets)
+        field_sources = {'posted_by_name': ['posted_by__first_name', 'posted_by__last_name']}
+
+class SimilarJobSerializer(JobListSerializer):
+    similarity = serializers.FloatField(read_only=True, help_text='Cosine similarity of the TF-IDF vectors, 0 to 1')
+    
+    class Meta(JobListSerializer.Meta):
+        fields = JobListSerializer.Meta.fields + ['similarity']
 
 class JobDetailSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
@@ -34,21 +45,18 @@ class JobDetailSerializer(serializers.ModelSerializer):
         write_only=True
     )
     posted_by = UserSerializer(read_only=True)
-    applications_count = serializers.SerializerMethodField()
+    place = LocationSerializer(read_only=True)
     
     class Meta:
         model = Job
         fields = [
             'id', 'title', 'description', 'category', 'category_id',
-            'company_name', 'location', 'job_type', 'salary_min', 'salary_max',
+            'company_name', 'location', 'place', 'job_type', 'salary_min', 'salary_max',
             'requirements', 'responsibilities', 'benefits',
             'application_deadline', 'is_active', 'posted_by',
             'applications_count', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'posted_by', 'created_at', 'updated_at']
-    
-    def get_applications_count(self, obj):
-        return obj.applications.count()
+        read_only_fields = ['id', 'posted_by', 'applications_count', 'created_at', 'updated_at']
 
 class JobCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -65,4 +73,62 @@ class JobCreateUpdateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(
                     "Minimum salary cannot be greater than maximum salary"
                 )
-        return data
\ No newline at end of file
+        return data
+
+class JobImportRowSerializer(JobCreateUpdateSerializer):
+    """
+    One row of a bulk import. ``category`` is resolved from the
+    ``categories`` map in the context, loaded once per batch.
+    """
+    category = serializers.IntegerField()
+    
+    def validate_category(self, value):
+        category = self.context['categories'].get(value)
+        if category is None:
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return category
+
+class JobImportResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    dry_run = serializers.BooleanField()
+    errors = serializers.ListField(child=serializers.DictField())
+    elapsed_ms = serializers.FloatField()
+    rows_per_second = serializers.FloatField()
+
+class SuggestionSerializer(serializers.Serializer):
+    text = serializers.CharField()
+    type = serializers.ChoiceField(choices=SUGGESTION_TYPES)
+    count = serializers.IntegerField()
+
+class FacetValueSerializer(serializers.Serializer):
+    value = serializers.CharField(help_text='Filter value selecting this bucket')
+    label = serializers.CharField()
+    count = serializers.IntegerField()
+
+class CategoryFacetSerializer(FacetValueSerializer):
+    slug = serializers.SlugField()
+
+class SalaryFacetSerializer(FacetValueSerializer):
+    min = serializers.IntegerField(allow_null=True)
+    max = serializers.IntegerField(allow_null=True)
+
+class JobFacetsSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    job_type = FacetValueSerializer(many=True)
+    category = CategoryFacetSerializer(many=True)
+    location = FacetValueSerializer(many=True)
+    salary = SalaryFacetSerializer(many=True)
+
+class ArchivedJobSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    posted_by_email = serializers.EmailField(source='posted_by.email', read_only=True)
+    
+    class Meta:
+        model = ArchivedJob
+        fields = [
+            'id', 'title', 'description', 'category', 'category_name', 'company_name', 'location',
+            'job_type', 'salary_min', 'salary_max', 'requirements', 'responsibilities', 'benefits',
+            'application_deadline', 'applications_count', 'posted_by', 'posted_by_email',
+            'created_at', 'updated_at', 'archived_at'
+        ]
@@ -0,0 +1,75 @@
+# apps/jobs/signals.py
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from apps.core.caching import invalidate_on_change
+from .counters import adjust_active_jobs, lock_counted_values
+from .geo import gazetteer
+from .models import Job, Category, Location
+from .search import search_index, uses_search_vector
+from .suggest import SUGGEST_FIELDS, suggestion_index
+
+def _suggest_values(values):
+    return {field: values.get(field) for field in SUGGEST_FIELDS}
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reload_gazetteer(sender, **kwargs):
+    gazetteer.reset()
+
+@receiver(post_save, sender=Job)
+def update_job_search_document(sender, instance, using, **kwargs):
+    # PostgreSQL keeps search_vector current through the jobs_search_vector trigger
+    if not uses_search_vector(using):
+        search_index.update(instance)
+
+@receiver(post_delete, sender=Job)
+def remove_job_search_document(sender, instance, using, **kwargs):
+    if not uses_search_vector(using):
+        search_index.remove(instance.pk)
+
+@receiver(post_save, sender=Job)
+def update_job_suggestions(sender, instance, created, **kwargs):
+    old_values = None if created else getattr(instance, '_loaded_values', None)
+    new_values = {field: getattr(instance, field) for field in SUGGEST_FIELDS}
+    suggestion_index.job_changed(old_values and _suggest_values(old_values), new_values)
+
+@receiver(post_delete, sender=Job)
+def remove_job_suggestions(sender, instance, **kwargs):
+    old_values = getattr(instance, '_loaded_values', None) or instance.__dict__
+    suggestion_index.job_changed(_suggest_values(old_values), None)
+
+@receiver(post_save, sender=Category)
+def update_category_suggestions(sender, instance, created, **kwargs):
+    if not created:
+        suggestion_index.category_renamed(instance.pk, instance.name)
+
+@receiver(post_save, sender=Job)
+def update_category_job_counts(sender, instance, created, **kwargs):
+    # The row as stored before this save, locked by Job.save
+    stored = instance.__dict__.pop('_counted_values', None)
+    if created:
+        stored = {'is_active': False, 'category_id': instance.category_id}
+    elif stored is None:
+        # update_fields left is_active and category alone
+        return
+    was_active, old_category_id = stored['is_active'], stored['category_id']
+    if was_active and (not instance.is_active or old_category_id != instance.category_id):
+        adjust_active_jobs(old_category_id, -1)
+    if instance.is_active and (not was_active or old_category_id != instance.category_id):
+        adjust_active_jobs(instance.category_id, 1)
+
+@receiver(pre_delete, sender=Job)
+def lock_deleted_job(sender, instance, using, **kwargs):
+    # Of two concurrent deletes only the first still finds the row to count
+    instance._counted_values = lock_counted_values(instance, using)
+
+@receiver(post_delete, sender=Job)
+def decrement_category_job_count(sender, instance, **kwargs):
+    stored = instance.__dict__.pop('_counted_values', None)
+    if stored and stored['is_active']:
+        adjust_active_jobs(stored['category_id'], -1)
+
+# Cached public responses depend on both jobs and categories
+for model in (Job, Category):
+    post_save.connect(invalidate_on_change, sender=model, dispatch_uid=f'cache-{model._meta.label_lower}-save')
+    post_delete.connect(invalidate_on_change, sender=model, dispatch_uid=f'cache-{model._meta.label_lower}-delete')
@@ -0,0 +1,166 @@
+# apps/jobs/similarity.py
+"""
+Precomputed "similar jobs".
+
+``refresh_similar_jobs`` turns the title, requirements and description of
+every active job into a TF-IDF vector: a float32 matrix with a row per job
+and a column for each of the ``SIMILAR_JOBS_MAX_TERMS`` most common terms
+that are in at least two jobs and at most ``SIMILAR_JOBS_MAX_DF`` of them.
+Rows are L2-normalized, so a chunk of rows times the transposed matrix gives
+cosine similarities, from which ``np.argpartition`` picks the
+``SIMILAR_JOBS_COUNT`` nearest neighbours of each job. They are stored in
+``SimilarJob`` and served by ``/api/jobs/{id}/similar/`` with one indexed
+lookup.
+
+After the first run only jobs created or edited since the previous run are
+recomputed, along with the jobs whose neighbours changed or went away and
+the jobs a changed job is now closer to than their current last neighbour.
+Unchanged rows keep the term weights of the run that wrote them; pass
+``full=True`` (``manage.py build_similar_jobs --full``) to recompute all.
+"""
+from array import array
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from .search import tokenize
+
+# (field, weight) pairs making up the document compared, most important first
+SIMILARITY_DOCUMENT = [
+    ('title', 3.0),
+    ('requirements', 2.0),
+    ('description', 1.0),
+]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def vectorize(rows, max_terms=None, max_df=None):
+    """
+    ``(ids, matrix)`` for ``rows`` of ``{'id', *fields}``: the job ids in row
+    order and their L2-normalized TF-IDF vectors (float32, one row per job).
+    """
+    max_terms = max_terms or _setting('SIMILAR_JOBS_MAX_TERMS', 500)
+    max_df = max_df or _setting('SIMILAR_JOBS_MAX_DF', 0.5)
+    vocabulary = {}
+    ids, entry_rows, entry_terms, entry_weights = array('q'), array('q'), array('q'), array('f')
+    for position, row in enumerate(rows):
+        ids.append(row['id'])
+        for field, weight in SIMILARITY_DOCUMENT:
+            for token in tokenize(row[field]):
+                entry_rows.append(position)
+                entry_terms.append(vocabulary.setdefault(token, len(vocabulary)))
+                entry_weights.append(weight)
+    ids = np.frombuffer(ids, dtype=np.int64)
+    jobs, terms = len(ids), len(vocabulary)
+    if not jobs or not terms:
+        return ids, np.zeros((jobs, 0), dtype=np.float32)
+
+    # Weighted term frequency per (job, term)
+    keys, inverse = np.unique(
+        np.frombuffer(entry_rows, dtype=np.int64) * terms + np.frombuffer(entry_terms, dtype=np.int64),
+        return_inverse=True,
+    )
+    frequencies = np.bincount(inverse, weights=np.frombuffer(entry_weights, dtype=np.float32))
+    key_rows, key_terms = keys // terms, keys % terms
+
+    document_frequency = np.bincount(key_terms, minlength=terms)
+    candidates = np.flatnonzero((document_frequency >= 2) & (document_frequency <= max(max_df * jobs, 2)))
+    kept = candidates[np.argsort(-document_frequency[candidates], kind='stable')[:max_terms]]
+    columns = np.full(terms, -1)
+    columns[kept] = np.arange(len(kept))
+    idf = np.log((1 + jobs) / (1 + document_frequency[kept])) + 1
+
+    selected = columns[key_terms] >= 0
+    key_columns = columns[key_terms[selected]]
+    matrix = np.zeros((jobs, len(kept)), dtype=np.float32)
+    matrix[key_rows[selected], key_columns] = (1 + np.log(frequencies[selected])) * idf[key_columns]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return ids, matrix
+
+
+def nearest(matrix, positions, count):
+    """
+    ``(neighbours, scores)`` for the rows at ``positions``: the ``count`` most
+    cosine-similar other rows, best first, and the full similarity rows.
+    """
+    scores = matrix[positions] @ matrix.T
+    scores[np.arange(len(positions)), positions] = -1
+    count = min(count, matrix.shape[0] - 1)
+    if count <= 0:
+        return np.zeros((len(positions), 0), dtype=np.int64), scores
+    neighbours = np.argpartition(scores, scores.shape[1] - count, axis=1)[:, -count:]
+    best = np.take_along_axis(scores, neighbours, axis=1)
+    order = np.argsort(-best, axis=1, kind='stable')
+    return np.take_along_axis(neighbours, order, axis=1), scores
+
+
+def refresh_similar_jobs(full=False, chunk_size=None):
+    """Recompute the stored neighbours of changed jobs (all with ``full``); returns how many jobs."""
+    from .models import Job, SimilarJob
+    count = _setting('SIMILAR_JOBS_COUNT', 10)
+    chunk_size = chunk_size or _setting('SIMILAR_JOBS_CHUNK_SIZE', 256)
+    started = timezone.now()
+    last_run = None if full else SimilarJob.objects.aggregate(last=Max('computed_at'))['last']
+
+    active = Job.objects.filter(is_active=True).order_by('pk')
+    fields = [field for field, _ in SIMILARITY_DOCUMENT]
+    ids, matrix = vectorize(active.values('id', *fields).iterator(chunk_size=2000))
+    SimilarJob.objects.exclude(job_id__in=active.values('pk')).delete()
+    if last_run is None:
+        _store(ids, matrix, np.arange(len(ids)), count, chunk_size, started)
+        return len(ids)
+
+    changed = set(active.filter(updated_at__gte=last_run).values_list('pk', flat=True))
+    # Neighbours edited, deactivated or deleted since they were chosen
+    stale = SimilarJob.objects.filter(similar_id__in=changed) | SimilarJob.objects.exclude(
+        similar_id__in=active.values('pk')
+    )
+    stored = {
+        job_id: threshold if neighbours >= count else 0.0
+        for job_id, neighbours, threshold in SimilarJob.objects.values('job_id').annotate(
+            neighbours=Count('id'), threshold=Min('score')
+        ).values_list('job_id', 'neighbours', 'threshold')
+    }
+    targets = changed | set(stale.values_list('job_id', flat=True)) | (set(ids.tolist()) - set(stored))
+    targets = np.flatnonzero(np.isin(ids, list(targets)))
+    # Jobs a recomputed one is now closer to than their current last neighbour
+    thresholds = np.array([stored.get(job_id, 0.0) for job_id in ids.tolist()], dtype=np.float32)
+    displaced = _store(ids, matrix, targets, count, chunk_size, started, thresholds)
+    displaced[targets] = False
+    displaced = np.flatnonzero(displaced)
+    _store(ids, matrix, displaced, count, chunk_size, started)
+    return len(targets) + len(displaced)
+
+
+def _store(ids, matrix, targets, count, chunk_size, computed_at, thresholds=None):
+    """
+    Replace the stored neighbours of the rows at ``targets``. With
+    ``thresholds``, returns a mask of the rows some target beats them for.
+    """
+    from .models import SimilarJob
+    displaced = np.zeros(len(ids), dtype=bool)
+    for start in range(0, len(targets), chunk_size):
+        positions = targets[start:start + chunk_size]
+        neighbours, scores = nearest(matrix, positions, count)
+        if thresholds is not None:
+            displaced |= (scores > thresholds).any(axis=0)
+        rows = [
+            SimilarJob(
+                job_id=int(ids[position]), similar_id=int(ids[neighbour]), score=float(scores[index, neighbour]),
+                rank=rank, computed_at=computed_at,
+            )
+            for index, position in enumerate(positions)
+            for rank, neighbour in enumerate(neighbours[index], start=1)
+            if scores[index, neighbour] > 0
+        ]
+        with transaction.atomic():
+            SimilarJob.objects.filter(job_id__in=ids[positions].tolist()).delete()
+            SimilarJob.objects.bulk_create(rows)
+    return displaced
@@ -0,0 +1,319 @@
+# apps/jobs/suggest.py
+"""
+Typeahead suggestions for the job search box.
+
+Keeps an in-process, frequency-weighted prefix index over the titles, company
+names, locations and category names of active jobs. The index is built once
+per process from a handful of GROUP BY queries and updated incrementally by
+the job and category signals, so keystrokes never touch the ``jobs`` table.
+
+Prefixes of up to ``SHORT_PREFIX_LENGTH`` characters, the ones matching most
+entries, are answered from top-``MAX_SUGGESTIONS`` lists kept per prefix and
+type. Longer prefixes bisect a sorted key list and walk at most
+``SUGGEST_SCAN_LIMIT`` keys. Writers change the index in place under a
+lock and lookups read it without one, so a lookup racing a write may see
+part of it. An index older than ``SUGGEST_INDEX_MAX_AGE`` keeps answering
+while a background thread rebuilds it; writes made meanwhile are replayed
+onto the rebuilt index before it is published. A bump of the shared
+``INDEX_GENERATION`` (jobs expired or archived in another process) discards
+the index, and the next lookup rebuilds it.
+"""
+import bisect
+import heapq
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+
+from .search import index_generation
+
+logger = logging.getLogger('job_board.suggest')
+
+SUGGESTION_TYPES = ('title', 'company', 'location', 'category')
+
+# Job field feeding each suggestion type (categories are keyed by id)
+JOB_FIELDS = {
+    'title': 'title',
+    'company': 'company_name',
+    'location': 'location',
+    'category': 'category_id',
+}
+
+# Job values the index needs to apply a change
+SUGGEST_FIELDS = [*JOB_FIELDS.values(), 'is_active']
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Largest ``limit`` the endpoint accepts
+MAX_SUGGESTIONS = 25
+
+SHORT_PREFIX_LENGTH = 3
+
+
+def normalize(text):
+    return WHITESPACE_RE.sub(' ', str(text or '')).strip().lower()
+
+
+def _rank(item):
+    count, display, _, _ = item
+    return count, -len(display)
+
+
+def _word_keys(kind, text):
+    words = text.split(' ')
+    return [(' '.join(words[i:]), kind, text) for i in range(len(words))]
+
+
+def _short_prefixes(kind, text):
+    lengths = range(1, SHORT_PREFIX_LENGTH + 1)
+    return {key[:length] for key, _, _ in _word_keys(kind, text) for length in lengths}
+
+
+class _State:
+    """
+    One published version of the index: ``entries`` maps ``(type, text)`` to
+    ``(display, count)``, ``keys`` is the sorted ``(word start, type, text)``
+    list and ``top`` maps ``(short prefix, type)`` to its best entries.
+    """
+
+    def __init__(self, entries=None, keys=None, top=None, category_names=None, built_at=None, generation=None):
+        self.entries = entries if entries is not None else {}
+        self.keys = keys if keys is not None else []
+        self.top = top if top is not None else {}
+        self.category_names = category_names if category_names is not None else {}
+        self.built_at = built_at
+        self.generation = generation
+
+    def scan(self, prefix, types, limit):
+        """Entries of ``types`` with a word starting with ``prefix``, from at most ``limit`` keys."""
+        found = {}
+        start = bisect.bisect_left(self.keys, (prefix,))
+        for word, kind, text in self.keys[start:start + limit]:
+            if not word.startswith(prefix):
+                break
+            entry = self.entries.get((kind, text))
+            if kind in types and entry is not None:
+                found[(kind, text)] = (entry[1], entry[0], kind, text)
+        return found.values()
+
+    def refresh_top(self, prefix, kind):
+        items = heapq.nlargest(MAX_SUGGESTIONS, self.scan(prefix, (kind,), len(self.keys)), key=_rank)
+        self._set_top(prefix, kind, items)
+
+    def update_top(self, prefix, kind, text):
+        """Re-place entry ``(kind, text)`` in the top list of ``prefix`` after its count changed."""
+        items = self.top.get((prefix, kind), ())
+        entry = self.entries.get((kind, text))
+        count = entry[1] if entry else 0
+        listed = [item[0] for item in items if item[3] == text]
+        if listed and count < listed[0] and len(items) >= MAX_SUGGESTIONS:
+            # It may now rank below entries the list left out
+            self.refresh_top(prefix, kind)
+            return
+        items = [item for item in items if item[3] != text]
+        if entry is not None:
+            items.append((count, entry[0], kind, text))
+        self._set_top(prefix, kind, heapq.nlargest(MAX_SUGGESTIONS, items, key=_rank))
+
+    def _set_top(self, prefix, kind, items):
+        if items:
+            self.top[(prefix, kind)] = tuple(items)
+        else:
+            self.top.pop((prefix, kind), None)
+
+
+class SuggestionIndex:
+    """
+    Maps ``(type, normalized text)`` to a display string and the number of
+    active jobs carrying it. Every word start of an entry is indexed, so
+    "eng" suggests "Senior Backend Engineer" as well as "Engineering".
+    """
+
+    def __init__(self, max_age=None):
+        # Serializes writers and builds; lookups read the published state
+        self._lock = threading.RLock()
+        self._max_age = max_age
+        self._state = None
+        self._refreshing = False
+        # One list per build in progress of the writes it must replay
+        self._replay_logs = []
+
+    @property
+    def max_age(self):
+        if self._max_age is not None:
+            return self._max_age
+        return getattr(settings, 'SUGGEST_INDEX_MAX_AGE', 300)
+
+    @property
+    def scan_limit(self):
+        return getattr(settings, 'SUGGEST_SCAN_LIMIT', 1000)
+
+    def build(self):
+        replay = []
+        with self._lock:
+            self._replay_logs.append(replay)
+        try:
+            state = self._read()
+            with self._lock:
+                for apply in replay:
+                    apply(state)
+                self._state = state
+        finally:
+            with self._lock:
+                self._replay_logs.remove(replay)
+
+    def _read(self):
+        from .models import Category, Job
+        # Read first, so a bump during the build triggers another one
+        generation = index_generation()
+        active = Job.objects.filter(is_active=True).order_by()
+        state = _State(category_names=dict(Category.objects.values_list('id', 'name')), generation=generation)
+        for kind, field in JOB_FIELDS.items():
+            rows = active.values_list(field).annotate(n=Count('id'))
+            for value, count in rows.iterator():
+                self._adjust(state, kind, value, count, incremental=False)
+        state.keys.sort()
+        buckets = defaultdict(list)
+        for (kind, text), (display, count) in state.entries.items():
+            for prefix in _short_prefixes(kind, text):
+                buckets[(prefix, kind)].append((count, display, kind, text))
+        state.top = {key: tuple(heapq.nlargest(MAX_SUGGESTIONS, items, key=_rank)) for key, items in buckets.items()}
+        state.built_at = time.monotonic()
+        return state
+
+    def reset(self):
+        with self._lock:
+            self._state = None
+
+    def _current(self):
+        state = self._state
+        if state is not None and state.generation != index_generation():
+            with self._lock:
+                if self._state is state:
+                    self._state = None
+            state = None
+        if state is None:
+            # First lookup: build once while the others wait
+            with self._lock:
+                if self._state is None:
+                    self.build()
+                return self._state
+        if self.max_age and time.monotonic() - state.built_at > self.max_age and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh, name='suggestion-index-refresh', daemon=True).start()
+        return state
+
+    def _refresh(self):
+        try:
+            self.build()
+        except Exception:
+            logger.exception('Rebuilding the suggestion index failed')
+        finally:
+            self._refreshing = False
+            connection.close()
+
+    def _write(self, apply):
+        """Apply ``apply(state)`` to the built index and to any index being built."""
+        with self._lock:
+            if self._state is not None:
+                apply(self._state)
+            for replay in self._replay_logs:
+                replay.append(apply)
+
+    def _display(self, state, kind, value):
+        if kind == 'category':
+            if value not in state.category_names:
+                from .models import Category
+                state.category_names[value] = (
+                    Category.objects.filter(pk=value).values_list('name', flat=True).first() or ''
+                )
+            return state.category_names[value]
+        return WHITESPACE_RE.sub(' ', str(value or '')).strip()
+
+    def _adjust(self, state, kind, value, delta, incremental=True):
+        display = self._display(state, kind, value)
+        text = normalize(display)
+        if not text:
+            return
+        entry = state.entries.get((kind, text))
+        if entry is None:
+            if delta <= 0:
+                return
+            entry = (display, 0)
+            for key in _word_keys(kind, text):
+                if incremental:
+                    bisect.insort(state.keys, key)
+                else:
+                    state.keys.append(key)
+        count = entry[1] + delta
+        state.entries[(kind, text)] = (entry[0], count)
+        if count <= 0:
+            del state.entries[(kind, text)]
+            for key in _word_keys(kind, text):
+                index = bisect.bisect_left(state.keys, key)
+                if index < len(state.keys) and state.keys[index] == key:
+                    del state.keys[index]
+        if incremental:
+            for prefix in _short_prefixes(kind, text):
+                state.update_top(prefix, kind, text)
+
+    def job_changed(self, old_values, new_values):
+        """
+        Apply a job save or delete. Each argument is a dict of the job's
+        ``JOB_FIELDS`` values plus ``is_active``, or None when absent.
+        """
+        def apply(state):
+            for values, delta in ((old_values, -1), (new_values, 1)):
+                if values and values.get('is_active'):
+                    for kind, field in JOB_FIELDS.items():
+                        self._adjust(state, kind, values.get(field), delta)
+        self._write(apply)
+
+    def jobs_created(self, rows):
+        """
+        Apply a batch of inserted jobs, adjusting each distinct value once.
+        ``rows`` are dicts shaped like ``job_changed`` arguments.
+        """
+        deltas = Counter(
+            (kind, values.get(field))
+            for values in rows if values.get('is_active')
+            for kind, field in JOB_FIELDS.items()
+        )
+
+        def apply(state):
+            for (kind, value), delta in deltas.items():
+                self._adjust(state, kind, value, delta)
+        self._write(apply)
+
+    def category_renamed(self, category_id, name):
+        def apply(state):
+            if category_id not in state.category_names:
+                return
+            entry = state.entries.get(('category', normalize(state.category_names[category_id])))
+            count = entry[1] if entry else 0
+            if count:
+                self._adjust(state, 'category', category_id, -count)
+            state.category_names[category_id] = name
+            if count:
+                self._adjust(state, 'category', category_id, count)
+        self._write(apply)
+
+    def suggest(self, prefix, limit=10, types=SUGGESTION_TYPES):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        state = self._current()
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            candidates = [item for kind in types for item in state.top.get((prefix, kind), ())]
+        else:
+            candidates = state.scan(prefix, types, self.scan_limit)
+        best = heapq.nlargest(min(limit, MAX_SUGGESTIONS), candidates, key=_rank)
+        return [{'text': display, 'type': kind, 'count': count} for count, display, kind, _ in best]
+
+
+suggestion_index = SuggestionIndex()
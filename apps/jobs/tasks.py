@@ -0,0 +1,17 @@
+# apps/jobs/tasks.py
+from apps.core.taskqueue import task
+from .expiry import archive_jobs, expire_jobs
+from .similarity import refresh_similar_jobs as refresh
+
+
+@task()
+def expire_and_archive_jobs():
+    """Deactivate past-deadline jobs and archive long-inactive ones; see ``PERIODIC_TASKS``."""
+    expire_jobs()
+    archive_jobs()
+
+
+@task()
+def refresh_similar_jobs():
+    """Recompute the similar jobs of jobs changed since the last run; see ``PERIODIC_TASKS``."""
+    refresh()
@@ -1,3 +1,800 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from apps.applications.models import Application, ApplicationStatusChange, ArchivedApplication
+from apps.authentication.models import User
+from apps.core.testing import QueryBudgetMixin
+from .counters import reconcile_counters
+from .expiry import archive_jobs, expire_jobs
+from .geo import resolve_job_locations
+from .models import ArchivedJob, Job, Category, SimilarJob
+from .search import InMemorySearchIndex, search_index, uses_search_vector
+from .similarity import refresh_similar_jobs
+from .suggest import MAX_SUGGESTIONS, SuggestionIndex, suggestion_index
+
+
+def create_job(category, posted_by, **overrides):
+    fields = {
+        'title': 'Backend Engineer',
+        'description': 'Build and run our APIs',
+        'company_name': 'Safaricom',
+        'location': 'Nairobi',
+        'job_type': 'full-time',
+        'requirements': 'python, django, postgresql',
+        'responsibilities': 'Ship features',
+    }
+    fields.update(overrides)
+    return Job.objects.create(category=category, posted_by=posted_by, **fields)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class JobQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        cls.categories = [
+            Category.objects.create(name=f'Category {index}', slug=f'category-{index}') for index in range(5)
+        ]
+        for index in range(30):
+            create_job(
+                cls.categories[index % 5], cls.admin,
+                title=f'Python Developer {index}' if index % 2 else f'Data Analyst {index}',
+                salary_min=1000 * index,
+            )
+        cls.job = Job.objects.first()
+
+    def setUp(self):
+        cache.clear()
+        search_index.reset()
+        suggestion_index.reset()
+
+    def test_job_list_budget_is_independent_of_page_size(self):
+        # validator aggregate, COUNT, page
+        self.assertBudgetIndependentOf(3, [5, 30], 'get', '/api/jobs/')
+
+    def test_job_list_with_filters_search_and_ordering(self):
+        # Warm the in-memory index used instead of tsvector off PostgreSQL
+        search_index.build()
+        # the category filter value is validated once for the ETag and once for the page
+        response = self.assertEndpointBudget(5, 'get', '/api/jobs/', {
+            'category': self.categories[1].pk, 'search': 'python', 'ordering': 'salary_min',
+        })
+        self.assertEqual(response.data['count'], 6)
+
+    def test_job_list_cursor_pages_skip_the_count(self):
+        self.assertBudgetIndependentOf(2, [5, 30], 'get', '/api/jobs/', {'cursor': ''})
+
+    def test_job_detail(self):
+        response = self.assertEndpointBudget(2, 'get', f'/api/jobs/{self.job.pk}/')
+        self.assertEqual(response.data['category']['jobs_count'], 6)
+
+    def test_sparse_fieldsets_select_only_their_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/jobs/', {'fields': 'id,title,posted_by_name', 'ordering': 'salary_min'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'posted_by_name'])
+        self.assertEqual(response.data['results'][0]['posted_by_name'], 'Ada Admin')
+        page_sql = queries[-1]['sql']
+        self.assertNotIn('categories', page_sql)
+        self.assertNotIn('description', page_sql)
+        self.assertIn('"salary_min"', page_sql)
+
+        # Without ?fields= a list still skips the columns only the detail view shows
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/jobs/')
+        self.assertNotIn('description', queries[-1]['sql'])
+        response = self.client.get('/api/jobs/', {'fields': 'title,salary'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_radius_and_bounding_box_search_use_resolved_places(self):
+        create_job(self.categories[0], self.admin, location='Westlands, Nairobi, Kenya')
+        coast = create_job(self.categories[0], self.admin, location='mombasa island')
+        create_job(self.categories[0], self.admin, location='Remote')
+        self.assertEqual(coast.place.name, 'Mombasa')
+        self.assertEqual(Job.objects.filter(place__name='Nairobi').count(), 31)
+
+        # place lookups (by geohash cell), COUNT and page, the first two also for the ETag
+        response = self.assertEndpointBudget(5, 'get', '/api/jobs/', {'near': 'Malindi', 'radius': 150})
+        self.assertEqual([job['id'] for job in response.data['results']], [coast.pk])
+        response = self.client.get('/api/jobs/', {'near': '-1.29,36.82', 'radius': 10})
+        self.assertEqual(response.data['count'], 31)
+        response = self.client.get('/api/jobs/', {'bbox': '-5,38,-3,41'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(self.client.get('/api/jobs/', {'near': 'Atlantis'}).status_code, 400)
+
+        # Re-resolving moves the place but does not count as an edit of the job
+        Job.objects.filter(pk=coast.pk).update(place=None)
+        updated_at = Job.objects.values_list('updated_at', flat=True).get(pk=coast.pk)
+        self.assertEqual(resolve_job_locations(Job.objects.filter(pk=coast.pk)), 1)
+        self.assertEqual(Job.objects.values_list('place__name', 'updated_at').get(pk=coast.pk), ('Mombasa', updated_at))
+
+    def test_category_list_reads_stored_counts(self):
+        self.assertBudgetIndependentOf(3, [2, 5], 'get', '/api/categories/')
+
+    def test_suggest_does_not_query_once_built(self):
+        suggestion_index.build()
+        response = self.assertEndpointBudget(0, 'get', '/api/jobs/suggest/', {'q': 'pyth'})
+        self.assertEqual(response.data[0]['text'], 'Python Developer 1')
+
+    def test_facets_count_every_facet_in_one_query(self):
+        search_index.build()
+        # category filter validation, facet counts
+        response = self.assertEndpointBudget(2, 'get', '/api/jobs/facets/', {
+            'category': self.categories[1].pk, 'search': 'developer',
+        })
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['category'], [
+            {'value': str(self.categories[1].pk), 'label': 'Category 1', 'count': 3, 'slug': 'category-1'},
+        ])
+
+        with self.settings(RESPONSE_CACHE_ENABLED=True):
+            response = self.assertEndpointBudget(1, 'get', '/api/jobs/facets/')
+            self.assertEqual(response.data['job_type'], [{'value': 'full-time', 'label': 'Full Time', 'count': 30}])
+            self.assertEqual([item['count'] for item in response.data['category']], [6] * 5)
+            self.assertEqual(response.data['salary'][0]['count'], 30)
+            self.assertEndpointBudget(0, 'get', '/api/jobs/facets/')
+            create_job(self.categories[0], self.admin, location='Mombasa', job_type='contract')
+            response = self.client.get('/api/jobs/facets/')
+        self.assertEqual(response.data['total'], 31)
+        self.assertEqual([item['value'] for item in response.data['location']], ['Nairobi', 'Mombasa'])
+
+    def test_server_timing_header(self):
+        # Anonymous clients only get it when enabled, as it is by default under DEBUG
+        with self.settings(SERVER_TIMING_ENABLED=False):
+            self.assertNotIn('Server-Timing', self.client.get('/api/jobs/'))
+        with self.settings(SERVER_TIMING_ENABLED=True):
+            response = self.client.get('/api/jobs/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+        self.client.force_authenticate(self.admin)
+        with self.settings(SERVER_TIMING_ENABLED=False):
+            self.assertIn('desc="3 queries"', self.client.get('/api/jobs/')['Server-Timing'])
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class JobPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        category = Category.objects.create(name='Engineering', slug='engineering')
+        salaries = [3000, None, 1000, 3000, None, 2000, 1000, 3000, None, 2000, 1000]
+        jobs = [
+            create_job(category, admin, title=f'Engineer {index}', salary_min=salary)
+            for index, salary in enumerate(salaries)
+        ]
+        # Three jobs share each creation time
+        start = timezone.now() - timedelta(days=1)
+        for index, job in enumerate(jobs):
+            Job.objects.filter(pk=job.pk).update(created_at=start + timedelta(minutes=index // 3))
+        cls.jobs = list(Job.objects.all())
+
+    def walk(self, params, page_size=4):
+        """Follow ``next`` links from the first cursor page, then ``previous`` links back."""
+        response = self.client.get('/api/jobs/', {**params, 'cursor': '', 'page_size': page_size})
+        pages = [[job['id'] for job in response.data['results']]]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append([job['id'] for job in response.data['results']])
+        backwards = [pages[-1]]
+        while response.data['previous']:
+            response = self.client.get(response.data['previous'])
+            backwards.append([job['id'] for job in response.data['results']])
+        return pages, backwards[::-1]
+
+    def test_cursor_walks_every_page_with_ties_on_created_at(self):
+        expected = [job.pk for job in sorted(self.jobs, key=lambda job: (job.created_at, job.pk), reverse=True)]
+        pages, backwards = self.walk({})
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(backwards, pages)
+
+    def test_cursor_follows_the_requested_ordering(self):
+        # Nulls sort last; the primary key breaks ties in the direction of the ordering
+        priced = [job for job in self.jobs if job.salary_min is not None]
+        unpriced = [job for job in self.jobs if job.salary_min is None]
+        for ordering, descending in (('salary_min', False), ('-salary_min', True)):
+            with self.subTest(ordering=ordering):
+                expected = sorted(priced, key=lambda job: (job.salary_min, job.pk), reverse=descending)
+                expected += sorted(unpriced, key=lambda job: job.pk, reverse=descending)
+                pages, backwards = self.walk({'ordering': ordering}, page_size=3)
+                self.assertEqual(sum(pages, []), [job.pk for job in expected])
+                self.assertEqual(backwards, pages)
+
+    def test_invalid_cursors_are_rejected(self):
+        response = self.client.get('/api/jobs/', {'cursor': '', 'page_size': 4})
+        cursor = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+
+        def encode(data):
+            return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+
+        tampered = [
+            'not-a-cursor',
+            encode({**payload, 'v': payload['v'][:1]}),
+            encode({**payload, 'v': ['yesterday', payload['v'][1]]}),
+            encode({**payload, 'k': ['salary_min', 'id']}),
+        ]
+        for value in tampered:
+            with self.subTest(cursor=value):
+                response = self.client.get('/api/jobs/', {'cursor': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {'cursor': ['Invalid cursor']})
+        # A cursor only applies to the ordering it was issued for
+        response = self.client.get('/api/jobs/', {'cursor': cursor, 'ordering': 'salary_min'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_numbers_without_a_cursor(self):
+        # Page numbers order on created_at alone, so only the creation times are fixed
+        created = sorted((job.created_at for job in self.jobs), reverse=True)
+        response = self.client.get('/api/jobs/', {'page': 2, 'page_size': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 11)
+        ids = [job['id'] for job in response.data['results']]
+        page = Job.objects.filter(pk__in=ids).order_by('-created_at')
+        self.assertEqual([job.created_at for job in page], created[4:8])
+        self.assertIn('page=3', response.data['next'])
+        self.assertIn('page_size=4', response.data['previous'])
+        self.assertEqual(self.client.get('/api/jobs/', {'page': 4, 'page_size': 4}).status_code, 404)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class JobSearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email='admin@example.com', password='pass12345', role='admin')
+        category = Category.objects.create(name='Engineering', slug='engineering')
+        cls.in_description = create_job(category, cls.admin, title='Mobile Engineer', description='Some Kotlin work')
+        cls.in_title = create_job(category, cls.admin, title='Kotlin Engineer', description='Android apps')
+        cls.unrelated = create_job(category, cls.admin, title='Accountant', description='Books')
+
+    def setUp(self):
+        search_index.reset()
+
+    def test_title_match_outranks_description_match(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/jobs/', {'search': 'kotlin'})
+        self.assertEqual([job['id'] for job in response.data['results']], [self.in_title.pk, self.in_description.pk])
+        # PostgreSQL matches the stored tsvector; other databases ask the in-process index
+        self.assertEqual('"search_vector" @@' in queries[-1]['sql'], uses_search_vector())
+
+        # An explicit ordering wins over relevance
+        response = self.client.get('/api/jobs/', {'search': 'kotlin', 'ordering': 'created_at'})
+        self.assertEqual([job['id'] for job in response.data['results']], [self.in_description.pk, self.in_title.pk])
+        self.assertEqual(self.client.get('/api/jobs/', {'search': 'kotlin android'}).data['count'], 1)
+
+    def test_in_memory_index_ranks_bounds_and_drops_deactivated_jobs(self):
+        index = InMemorySearchIndex()
+        ranks = index.search('engineer')
+        self.assertEqual(set(ranks), {self.in_title.pk, self.in_description.pk})
+        self.assertGreater(index.search('kotlin')[self.in_title.pk], index.search('kotlin')[self.in_description.pk])
+        self.assertEqual(list(index.search('kotlin', limit=1)), [self.in_title.pk])
+
+        self.in_title.is_active = False
+        self.in_title.save()
+        index.update(self.in_title)
+        self.assertEqual(list(index.search('kotlin')), [self.in_description.pk])
+        self.assertEqual(self.client.get('/api/jobs/', {'search': 'kotlin'}).data['count'], 1)
+        index.remove(self.in_description.pk)
+        self.assertEqual(index.search('kotlin'), {})
+
+    @override_settings(SEARCH_INDEX_MAX_RESULTS=1)
+    def test_search_limit_applies_after_the_other_filters(self):
+        self.in_description.job_type = 'contract'
+        self.in_description.save()
+        response = self.client.get('/api/jobs/', {'search': 'kotlin', 'job_type': 'contract'})
+        self.assertEqual([job['id'] for job in response.data['results']], [self.in_description.pk])
+        # Only the in-process index truncates
+        expected = 2 if uses_search_vector() else 1
+        self.assertEqual(self.client.get('/api/jobs/', {'search': 'engineer'}).data['count'], expected)
+
+
+class SuggestionIndexTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email='admin@example.com', password='pass12345', role='admin')
+        cls.engineering = Category.objects.create(name='Engineering', slug='engineering')
+        cls.jobs = [
+            create_job(cls.engineering, cls.admin, title='Senior Backend Engineer', company_name='Safaricom'),
+            create_job(cls.engineering, cls.admin, title='Backend Engineer', company_name='Sendy'),
+            create_job(cls.engineering, cls.admin, title='Backend Engineer', company_name='Sendy'),
+            create_job(cls.engineering, cls.admin, title='Data Analyst', company_name='Safaricom', location='Mombasa'),
+        ]
+
+    def setUp(self):
+        suggestion_index.reset()
+
+    def suggest(self, prefix, **params):
+        response = self.client.get('/api/jobs/suggest/', {'q': prefix, **params})
+        return [(row['type'], row['text'], row['count']) for row in response.data]
+
+    def test_prefixes_match_word_starts_by_frequency(self):
+        self.assertEqual(self.suggest('eng'), [
+            ('category', 'Engineering', 4), ('title', 'Backend Engineer', 2), ('title', 'Senior Backend Engineer', 1),
+        ])
+        # Longer prefixes walk the sorted keys instead of the short-prefix lists
+        self.assertEqual(self.suggest('Backend  E'), [
+            ('title', 'Backend Engineer', 2), ('title', 'Senior Backend Engineer', 1),
+        ])
+        self.assertEqual(self.suggest('saf', type='company'), [('company', 'Safaricom', 2)])
+        # Ties go to the shorter text
+        self.assertEqual(self.suggest('s', type=['company', 'location'], limit=1), [('company', 'Sendy', 2)])
+        self.assertEqual(len(self.suggest('e', limit=100)), 3)
+        self.assertEqual(self.suggest('zzz'), [])
+
+    def test_index_follows_creates_deactivations_and_deletes(self):
+        suggestion_index.build()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('mom'), [('location', 'Mombasa', 1)])
+
+        create_job(self.engineering, self.admin, title='Data Analyst', location='Mombasa')
+        self.assertEqual(self.suggest('data'), [('title', 'Data Analyst', 2)])
+        self.jobs[3].is_active = False
+        self.jobs[3].save()
+        self.assertEqual(self.suggest('data'), [('title', 'Data Analyst', 1)])
+        Job.objects.get(title='Data Analyst', is_active=True).delete()
+        self.assertEqual(self.suggest('data'), [])
+        self.assertEqual(self.suggest('mom'), [])
+
+        self.engineering.name = 'Platform'
+        self.engineering.save()
+        self.assertEqual(self.suggest('plat'), [('category', 'Platform', 3)])
+
+    def test_top_lists_refill_when_a_leader_drops(self):
+        index = SuggestionIndex(max_age=0)
+        for number in range(MAX_SUGGESTIONS + 1):
+            create_job(self.engineering, self.admin, title=f'Engineer {number:02}', company_name='Twiga')
+        index.build()
+        extra = {'title': 'Engineer 25', 'company_name': 'Twiga', 'location': 'Nairobi', 'is_active': True}
+        index.job_changed(None, extra)
+        index.job_changed(None, extra)
+        self.assertEqual(index.suggest('e', types=['title'], limit=1)[0], {
+            'text': 'Engineer 25', 'type': 'title', 'count': 3,
+        })
+        for _ in range(3):
+            index.job_changed(extra, None)
+        titles = [row['text'] for row in index.suggest('e', types=['title'], limit=MAX_SUGGESTIONS)]
+        # The list the removal emptied a slot in is refilled from the keys it had left out
+        self.assertEqual(len(titles), MAX_SUGGESTIONS)
+        self.assertNotIn('Engineer 25', titles)
+
+    def test_writes_during_a_rebuild_are_replayed_onto_it(self):
+        index = SuggestionIndex(max_age=0)
+        index.build()
+        built = index._state
+        job = {'title': 'Data Engineer', 'company_name': 'Twiga', 'location': 'Kisumu', 'is_active': True}
+        read = index._read
+
+        def read_then_write():
+            state = read()
+            index.job_changed(None, job)
+            return state
+        with mock.patch.object(index, '_read', read_then_write):
+            index.build()
+        self.assertIsNot(index._state, built)
+        self.assertEqual(index.suggest('twiga'), [{'text': 'Twiga', 'type': 'company', 'count': 1}])
+
+        # Later writes change the published index in place
+        rebuilt = index._state
+        index.job_changed(None, job)
+        self.assertIs(index._state, rebuilt)
+        self.assertEqual(index.suggest('twiga')[0]['count'], 2)
+
+    def test_stale_index_answers_while_it_rebuilds_in_the_background(self):
+        index = SuggestionIndex(max_age=60)
+        index.build()
+        with mock.patch('apps.jobs.suggest.time.monotonic', return_value=index._state.built_at + 61), \
+                mock.patch.object(SuggestionIndex, '_refresh') as refresh, self.assertNumQueries(0):
+            self.assertEqual(index.suggest('data')[0]['text'], 'Data Analyst')
+            index._refreshing = False
+        refresh.assert_called_once()
+
+
+@override_settings(ROOT_URLCONF='job_board.asgi_urls', RESPONSE_CACHE_ENABLED=False)
+class JobAsyncViewTests(APITestCase):
+    """The ASGI URLconf serves reads from async views with the sync responses."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        cls.categories = [
+            Category.objects.create(name=f'Category {index}', slug=f'category-{index}') for index in range(3)
+        ]
+        for index in range(12):
+            create_job(
+                cls.categories[index % 3], cls.admin,
+                title=f'Python Developer {index}' if index % 2 else f'Data Analyst {index}',
+                salary_min=1000 * index,
+            )
+        cls.job = Job.objects.first()
+
+    def setUp(self):
+        cache.clear()
+        search_index.build()
+
+    async def assertSameAsSync(self, url, data=None):
+        response = await self.async_client.get(url, data)
+        with self.settings(ROOT_URLCONF='job_board.urls'):
+            expected = await sync_to_async(self.client.get)(url, data)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response['ETag'], expected['ETag'])
+        return response
+
+    async def test_list_filters_search_and_pages_match_sync(self):
+        await self.assertSameAsSync('/api/jobs/')
+        await self.assertSameAsSync('/api/jobs/', {'page': 2, 'page_size': 5})
+        await self.assertSameAsSync('/api/jobs/', {'cursor': '', 'page_size': 5})
+        with self.settings(SERVER_TIMING_ENABLED=True):
+            response = await self.assertSameAsSync('/api/jobs/', {
+                'category': self.categories[1].pk, 'search': 'python', 'ordering': 'salary_min',
+            })
+        self.assertEqual(response.json()['count'], 4)
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+    async def test_detail_and_categories_match_sync(self):
+        await self.assertSameAsSync(f'/api/jobs/{self.job.pk}/')
+        await self.assertSameAsSync('/api/categories/')
+        await self.assertSameAsSync(f'/api/categories/{self.categories[0].slug}/')
+        response = await self.async_client.get('/api/jobs/999999/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_conditional_get(self):
+        response = await self.async_client.get('/api/jobs/')
+        response = await self.async_client.get('/api/jobs/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_fall_back_to_the_sync_view(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post('/api/jobs/', {
+            'title': 'Site Reliability Engineer', 'description': 'Keep it up', 'category': self.categories[0].pk,
+            'company_name': 'Sendy', 'location': 'Remote', 'job_type': 'contract',
+            'requirements': 'linux', 'responsibilities': 'On call',
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class JobExportTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        cls.applicant = User.objects.create_user(email='jane@example.com', password='pass12345')
+        category = Category.objects.create(name='Engineering', slug='engineering')
+        for index in range(12):
+            create_job(
+                category, cls.admin, title=f'Engineer {index}',
+                job_type='contract' if index % 3 == 0 else 'full-time', salary_min=1000 * index,
+            )
+
+    def export(self, params):
+        # One chunked query, with the category and poster joined in
+        with self.assertMaxQueries(1):
+            response = self.client.get('/api/jobs/', params)
+            content = b''.join(response.streaming_content).decode()
+        self.assertEqual(response.status_code, 200)
+        return response, content
+
+    def test_admin_streams_csv_of_the_filtered_list(self):
+        self.client.force_authenticate(self.admin)
+        response, content = self.export({'format': 'csv', 'job_type': 'contract', 'ordering': 'salary_min'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="jobs.csv"')
+        reader = csv.DictReader(io.StringIO(content))
+        rows = list(reader)
+        self.assertIn('title', reader.fieldnames)
+        self.assertEqual([row['title'] for row in rows], ['Engineer 0', 'Engineer 3', 'Engineer 6', 'Engineer 9'])
+        self.assertEqual({row['job_type'] for row in rows}, {'contract'})
+
+    def test_admin_streams_ndjson(self):
+        self.client.force_authenticate(self.admin)
+        response, content = self.export({'format': 'ndjson', 'salary_min': 9000})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(sorted(row['title'] for row in rows), ['Engineer 10', 'Engineer 11', 'Engineer 9'])
+
+    def test_exports_are_refused_to_non_admins(self):
+        self.assertEqual(self.client.get('/api/jobs/', {'format': 'csv'}).status_code, 401)
+        self.client.force_authenticate(self.applicant)
+        for export_format in ('csv', 'ndjson'):
+            with self.subTest(format=export_format):
+                response = self.client.get('/api/jobs/', {'format': export_format})
+                self.assertEqual(response.status_code, 403)
+                self.assertFalse(response.streaming)
+
+    def test_export_formats_are_list_only(self):
+        self.client.force_authenticate(self.admin)
+        job = Job.objects.first()
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/', {'format': 'csv'}).status_code, 404)
+        response = self.client.get(f'/api/jobs/{job.pk}/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, 406)
+        self.assertEqual(self.client.get('/api/jobs/facets/', {'format': 'csv'}).status_code, 404)
+
+
+class JobCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        cls.engineering = Category.objects.create(name='Engineering', slug='engineering')
+        cls.design = Category.objects.create(name='Design', slug='design')
+
+    def assertActiveCounts(self, engineering, design):
+        counts = dict(Category.objects.values_list('slug', 'active_jobs_count'))
+        self.assertEqual((counts['engineering'], counts['design']), (engineering, design))
+
+    def test_create_counts_active_jobs_only(self):
+        create_job(self.engineering, self.admin)
+        create_job(self.engineering, self.admin)
+        create_job(self.design, self.admin, is_active=False)
+        self.assertActiveCounts(2, 0)
+
+    def test_deactivating_from_stale_copies_counts_once(self):
+        # A second job keeps a double decrement from being clamped at zero
+        create_job(self.engineering, self.admin)
+        job = create_job(self.engineering, self.admin)
+        # Two requests holding the job as it was before either saved
+        first, second = Job.objects.get(pk=job.pk), Job.objects.get(pk=job.pk)
+        first.is_active = False
+        first.save()
+        second.is_active = False
+        second.save()
+        self.assertActiveCounts(1, 0)
+
+        first.is_active = True
+        first.save(update_fields=['is_active'])
+        self.assertActiveCounts(2, 0)
+        # Saves that cannot change the count leave it alone
+        second.title = 'Staff Engineer'
+        second.save(update_fields=['title'])
+        self.assertActiveCounts(2, 0)
+
+    def test_moving_category(self):
+        create_job(self.engineering, self.admin)
+        job = create_job(self.engineering, self.admin)
+        stale = Job.objects.get(pk=job.pk)
+        job.category = self.design
+        job.save()
+        self.assertActiveCounts(1, 1)
+        # Moved again from a copy that still thinks the job is in Engineering
+        stale.category = self.design
+        stale.save()
+        self.assertActiveCounts(1, 1)
+        stale.category = self.engineering
+        stale.save()
+        self.assertActiveCounts(2, 0)
+
+        job.refresh_from_db()
+        job.is_active = False
+        job.category = self.design
+        job.save()
+        self.assertActiveCounts(1, 0)
+
+    def test_delete(self):
+        create_job(self.engineering, self.admin)
+        job = create_job(self.engineering, self.admin)
+        create_job(self.engineering, self.admin, is_active=False).delete()
+        self.assertActiveCounts(2, 0)
+        stale = Job.objects.get(pk=job.pk)
+        job.delete()
+        stale.delete()
+        self.assertActiveCounts(1, 0)
+
+    def test_reconcile_corrects_drift(self):
+        job = create_job(self.engineering, self.admin)
+        create_job(self.design, self.admin)
+        Application.objects.create(
+            job=job, applicant=self.admin, cover_letter='Hire me', resume='application_resumes/cv.pdf'
+        )
+        # Writes that bypass the signals
+        Job.objects.filter(pk=job.pk).update(is_active=False, applications_count=5)
+        Category.objects.filter(pk=self.design.pk).update(active_jobs_count=7)
+
+        self.assertEqual(reconcile_counters(dry_run=True), {'jobs.Job.applications_count': 1,
+                                                            'jobs.Category.active_jobs_count': 2})
+        self.assertActiveCounts(1, 7)
+        self.assertEqual(reconcile_counters(), {'jobs.Job.applications_count': 1,
+                                                'jobs.Category.active_jobs_count': 2})
+        self.assertActiveCounts(0, 1)
+        job.refresh_from_db()
+        self.assertEqual(job.applications_count, 1)
+        self.assertEqual(reconcile_counters(), {'jobs.Job.applications_count': 0,
+                                                'jobs.Category.active_jobs_count': 0})
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, JOB_IMPORT_BATCH_SIZE=50)
+class JobImportTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        cls.categories = [
+            Category.objects.create(name=f'Category {index}', slug=f'category-{index}') for index in range(3)
+        ]
+
+    def setUp(self):
+        search_index.reset()
+        suggestion_index.reset()
+        self.client.force_authenticate(self.admin)
+
+    def row(self, index, **overrides):
+        row = {
+            'title': f'Imported Engineer {index}', 'description': 'Build things',
+            'category': self.categories[index % 3].pk, 'company_name': 'Andela', 'location': 'Nairobi',
+            'job_type': 'contract', 'requirements': 'python', 'responsibilities': 'Ship features',
+        }
+        row.update(overrides)
+        return row
+
+    def test_json_import_reports_row_errors_and_keeps_counters(self):
+        rows = [self.row(index) for index in range(120)]
+        rows[7]['category'] = 999
+        rows[60].update(salary_min='900', salary_max='100')
+        # 3 batches of category lookup, savepoint, INSERT, an UPDATE per category, release
+        response = self.assertEndpointBudget(21, 'post', '/api/jobs/import/', rows, status_code=201, format='json')
+        self.assertEqual(response.data['created'], 118)
+        self.assertEqual([error['row'] for error in response.data['errors']], [8, 61])
+        self.assertIn('category', response.data['errors'][0]['errors'])
+        self.assertEqual(Job.objects.count(), 118)
+        self.assertEqual(
+            sum(Category.objects.values_list('active_jobs_count', flat=True)), 118
+        )
+
+    def test_csv_import_and_dry_run(self):
+        header = 'title,description,category,company_name,location,job_type,requirements,responsibilities,salary_min\n'
+        lines = [
+            f'"Data Analyst, {index}",Crunch numbers,{self.categories[0].pk},Twiga,Remote,full-time,sql,Report,\n'
+            for index in range(10)
+        ]
+        upload = SimpleUploadedFile('jobs.csv', (header + ''.join(lines)).encode('utf-8'), content_type='text/csv')
+        response = self.client.post('/api/jobs/import/?dry_run=true', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data['created'], Job.objects.count()), (10, 0))
+
+        upload.seek(0)
+        response = self.client.post('/api/jobs/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(Job.objects.filter(title='Data Analyst, 3', salary_min__isnull=True).count(), 1)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, JOB_EXPIRY_BATCH_SIZE=2)
+class JobExpiryTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='pass12345', first_name='Ada', last_name='Admin', role='admin'
+        )
+        cls.applicant = User.objects.create_user(email='applicant@example.com', password='pass12345')
+        cls.category = Category.objects.create(name='Engineering', slug='engineering')
+        today = timezone.localdate()
+        cls.expired = [
+            create_job(cls.category, cls.admin, application_deadline=today - timedelta(days=1)) for _ in range(3)
+        ]
+        cls.open = create_job(cls.category, cls.admin, application_deadline=today)
+
+    def test_expired_jobs_are_deactivated_then_archived_with_their_applications(self):
+        self.assertEqual(expire_jobs(), 3)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.active_jobs_count, 1)
+        self.assertEqual(list(Job.objects.filter(is_active=True)), [self.open])
+
+        application = Application.objects.create(job=self.expired[0], applicant=self.applicant, cover_letter='Hi')
+        ApplicationStatusChange.objects.create(
+            application=application, from_status='pending', to_status='rejected', changed_by=self.admin
+        )
+        # Not inactive for long enough yet
+        self.assertEqual(archive_jobs(), (0, 0))
+        self.assertEqual(archive_jobs(timezone.now() + timedelta(seconds=1)), (3, 1))
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertFalse(Application.objects.exists())
+        archived = ArchivedApplication.objects.get(pk=application.pk)
+        self.assertEqual((archived.job_id, archived.cover_letter), (self.expired[0].pk, 'Hi'))
+        self.assertEqual([change['to'] for change in archived.status_history], ['rejected'])
+
+        url = f'/api/jobs/archive/{self.expired[0].pk}/'
+        self.client.force_authenticate(self.applicant)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['category_name'], 'Engineering')
+        response = self.client.get('/api/applications/archive/', {'job': self.expired[0].pk})
+        self.assertEqual([row['id'] for row in response.data['results']], [application.pk])
+
+    def test_applications_move_in_batches_of_their_own(self):
+        expire_jobs()
+        applicants = [
+            User.objects.create_user(email=f'applicant{index}@example.com', password='pass12345') for index in range(5)
+        ]
+        for applicant in applicants:
+            Application.objects.create(job=self.expired[0], applicant=applicant, cover_letter='Hi')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(archive_jobs(timezone.now() + timedelta(seconds=1)), (3, 5))
+        self.assertEqual(ArchivedApplication.objects.filter(job_id=self.expired[0].pk).count(), 5)
+        # Five applications in batches of two take three transactions of their own
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "applications_archive"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_expiry_resets_the_indexes_of_every_process(self):
+        # Indexes another worker built: the job signals never reach them
+        suggestions, search = SuggestionIndex(max_age=0), InMemorySearchIndex()
+        suggestions.build()
+        search.build()
+        self.assertEqual(suggestions.suggest('backend')[0]['count'], 4)
+        self.assertEqual(len(search.search('backend')), 4)
+        expire_jobs()
+        self.assertEqual(suggestions.suggest('backend')[0]['count'], 1)
+        self.assertEqual(list(search.search('backend')), [self.open.pk])
+
+    def test_applications_past_the_deadline_are_rejected(self):
+        self.client.force_authenticate(self.applicant)
+        response = self.client.post('/api/applications/', {'job': self.expired[0].pk, 'cover_letter': 'Hi'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('deadline', str(response.data['job']))
+
+
+# Few enough jobs that the shared skills are in most of them
+@override_settings(
+    RESPONSE_CACHE_ENABLED=False, SIMILAR_JOBS_COUNT=2, SIMILAR_JOBS_CHUNK_SIZE=2, SIMILAR_JOBS_MAX_DF=0.9
+)
+class SimilarJobTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user(email='admin@example.com', password='pass12345', role='admin')
+        category = Category.objects.create(name='Engineering', slug='engineering')
+        postings = [
+            ('Python Developer', 'python, django, postgresql', 'Build Django APIs'),
+            ('Senior Python Developer', 'python, django, celery', 'Lead our Django APIs team'),
+            ('Django Engineer', 'python, django, redis', 'Scale Django services'),
+            ('Data Analyst', 'sql, excel, tableau', 'Report on sales data'),
+            ('Senior Data Analyst', 'sql, tableau, python', 'Own the sales data reports'),
+            ('Accountant', 'ifrs, excel, payroll', 'Close the monthly books'),
+        ]
+        cls.jobs = [
+            create_job(category, admin, title=title, requirements=requirements, description=description)
+            for title, requirements, description in postings
+        ]
+
+    def similar(self, job):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/jobs/{job.pk}/similar/')
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.data]
+
+    def test_similar_jobs_are_precomputed_and_refreshed_incrementally(self):
+        self.assertEqual(refresh_similar_jobs(), 6)
+        self.assertEqual(self.similar(self.jobs[0]), ['Senior Python Developer', 'Django Engineer'])
+        self.assertEqual(self.similar(self.jobs[3])[0], 'Senior Data Analyst')
+        self.assertEqual(refresh_similar_jobs(), 0)
+
+        Job.objects.filter(pk=self.jobs[2].pk).update(is_active=False)
+        self.jobs[5].title, self.jobs[5].requirements = 'Django Accountant', 'python, django, ifrs'
+        self.jobs[5].save()
+        # The edited job, the jobs whose neighbours changed and those it is now closer to
+        self.assertTrue(refresh_similar_jobs())
+        self.assertEqual(self.similar(self.jobs[0]), ['Senior Python Developer', 'Django Accountant'])
+        self.assertFalse(SimilarJob.objects.filter(job=self.jobs[2]).exists())
+        self.assertEqual(self.client.get(f'/api/jobs/{self.jobs[2].pk}/similar/').status_code, 404)
@@ -1,9 +1,11 @@
 # apps/jobs/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import JobViewSet, CategoryViewSet
+from .views import ArchivedJobViewSet, JobViewSet, CategoryViewSet
 
 router = DefaultRouter()
+# Before jobs/, whose detail route would otherwise match archive/
+router.register(r'jobs/archive', ArchivedJobViewSet, basename='archived-job')
 router.register(r'jobs', JobViewSet, basename='job')
 router.register(r'categories', CategoryViewSet, basename='category')
 
@@ -1,34 +1,60 @@
 # apps/jobs/views.py
-from rest_framework import viewsets, filters, permissions
+from rest_framework import viewsets, filters, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Job, Category
+from .models import ArchivedJob, Job, Category, SimilarJob
 from .serializers import (
     JobListSerializer, JobDetailSerializer, JobCreateUpdateSerializer,
-    CategorySerializer
+    CategorySerializer, SuggestionSerializer, JobImportRowSerializer, JobImportResultSerializer,
+    JobFacetsSerializer, ArchivedJobSerializer, SimilarJobSerializer
 )
+from .facets import get_facets
 from .filters import JobFilter
+from .imports import JobImporter, read_csv
+from .search import JobSearchFilter
+from .suggest import MAX_SUGGESTIONS, SUGGESTION_TYPES, suggestion_index
 from .permissions import IsAdminOrReadOnly
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from apps.authentication.permissions import IsAdminUser
+from apps.core.asyncviews import AsyncReadMixin
+from apps.core.caching import CachedResponseMixin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.exports import StreamingExportMixin
+from apps.core.fieldsets import FIELDS_PARAMETER, SparseFieldsetMixin
+from apps.core.instrumentation import SerializerTimingMixin
+from apps.core.pagination import OptionalKeysetPagination
+from apps.core.uploads import MultiPartParser
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
 @extend_schema_view(
-    list=extend_schema(tags=['Jobs'], description='List all jobs with filtering'),
-    retrieve=extend_schema(tags=['Jobs'], description='Get job details'),
+    list=extend_schema(tags=['Jobs'], description='List all jobs with filtering. Admins can stream the full result with ?format=csv|ndjson',
+                       parameters=[FIELDS_PARAMETER]),
+    retrieve=extend_schema(tags=['Jobs'], description='Get job details', parameters=[FIELDS_PARAMETER]),
     create=extend_schema(tags=['Jobs'], description='Create a new job (Admin only)'),
     update=extend_schema(tags=['Jobs'], description='Update a job (Admin only)'),
     partial_update=extend_schema(tags=['Jobs'], description='Partially update a job (Admin only)'),
     destroy=extend_schema(tags=['Jobs'], description='Delete a job (Admin only)'),
 )
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(ConditionalGetMixin, CachedResponseMixin, SerializerTimingMixin, SparseFieldsetMixin,
+                 StreamingExportMixin, AsyncReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing job postings
     """
-    queryset = Job.objects.select_related('category', 'posted_by').prefetch_related('applications')
+    queryset = Job.objects.select_related('category', 'posted_by', 'place').defer('search_vector')
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = OptionalKeysetPagination
+    # JobSearchFilter ranks by relevance, so it must run after OrderingFilter
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, JobSearchFilter]
     filterset_class = JobFilter
-    search_fields = ['title', 'description', 'company_name', 'requirements']
+    export_filename = 'jobs'
+    cache_dependencies = (Job, Category)
+    list_validator_fields = ('updated_at', 'category__updated_at', 'posted_by__updated_at')
+    # place is re-resolved without touching updated_at
+    detail_validator_fields = (
+        'updated_at', 'applications_count', 'place', 'category__updated_at', 'posted_by__updated_at',
+    )
     ordering_fields = ['created_at', 'salary_min', 'salary_max', 'application_deadline']
     ordering = ['-created_at']
     
@@ -70,6 +96,103 @@ class JobViewSet(viewsets.ModelViewSet):
         jobs = self.get_queryset().filter(posted_by=request.user)
         serializer = JobListSerializer(jobs, many=True)
         return Response(serializer.data)
+    
+    @extend_schema(
+        tags=['Jobs'],
+        description=(
+            'Active jobs most similar to this one by title, requirements and description, most similar '
+            'first. Precomputed by manage.py build_similar_jobs'
+        ),
+        responses={200: SimilarJobSerializer(many=True)}
+    )
+    @action(detail=True, methods=['get'], pagination_class=None, filter_backends=[])
+    def similar(self, request, pk=None):
+        # One lookup through the unique (job, rank) index, joined to the neighbours' rows
+        try:
+            rows = SimilarJob.objects.filter(job_id=int(pk), similar__is_active=True)
+        except ValueError:
+            raise NotFound()
+        if not request.user.is_authenticated or not request.user.is_admin():
+            rows = rows.filter(job__is_active=True)
+        rows = rows.select_related('similar__category', 'similar__posted_by').defer('similar__search_vector')
+        jobs = []
+        for row in rows.order_by('rank'):
+            row.similar.similarity = row.score
+            jobs.append(row.similar)
+        if not jobs and not self.get_queryset().filter(pk=pk).exists():
+            raise NotFound()
+        return Response(SimilarJobSerializer(jobs, many=True).data)
+    
+    @extend_schema(
+        tags=['Jobs'],
+        description=(
+            'Bulk import jobs (Admin only) from a JSON array or a CSV upload in the "file" field. '
+            'Valid rows are created, invalid rows are reported by position. '
+            'Pass ?dry_run=true to validate without saving'
+        ),
+        parameters=[OpenApiParameter('dry_run', bool, description='Validate only')],
+        request=JobImportRowSerializer(many=True),
+        responses={201: JobImportResultSerializer, 400: JobImportResultSerializer}
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[JSONParser, MultiPartParser])
+    def bulk_import(self, request):
+        if 'file' in request.FILES:
+            rows = read_csv(request.FILES['file'])
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            raise ParseError('Send a JSON array of jobs or a CSV file in the "file" field.')
+        
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        result = JobImporter(request.user, dry_run=dry_run).run(rows)
+        if not result['created']:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif dry_run:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(JobImportResultSerializer(result).data, status=response_status)
+    
+    @extend_schema(
+        tags=['Jobs'],
+        description=(
+            'Counts of matching jobs per job type, category, location and salary band for the search '
+            'sidebar. Takes the same filter and search parameters as the list'
+        ),
+        responses={200: JobFacetsSerializer}
+    )
+    @action(detail=False, methods=['get'], pagination_class=None,
+            filter_backends=[DjangoFilterBackend, JobSearchFilter])
+    def facets(self, request):
+        # All facets come from one aggregate query, cached until a job or category changes
+        user = request.user
+        scope = 'admin' if user.is_authenticated and user.is_admin() else 'public'
+        facets = get_facets(self.filter_queryset(self.get_queryset()), request.query_params, scope)
+        return Response(JobFacetsSerializer(facets).data)
+    
+    @extend_schema(
+        tags=['Jobs'],
+        description='Typeahead suggestions for job titles, companies, locations and categories',
+        parameters=[
+            OpenApiParameter('q', str, description='Prefix typed so far'),
+            OpenApiParameter('type', str, many=True, enum=SUGGESTION_TYPES,
+                             description='Restrict suggestions to these types'),
+            OpenApiParameter('limit', int, description='Maximum suggestions (default 10, max 25)'),
+        ],
+        responses={200: SuggestionSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def suggest(self, request):
+        # Served from the in-process prefix index; never queries the jobs table
+        types = [t for t in request.query_params.getlist('type') if t in SUGGESTION_TYPES]
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), MAX_SUGGESTIONS)
+        except ValueError:
+            limit = 10
+        suggestions = suggestion_index.suggest(
+            request.query_params.get('q', ''), limit=limit, types=types or SUGGESTION_TYPES
+        )
+        return Response(SuggestionSerializer(suggestions, many=True).data)
 
 @extend_schema_view(
     list=extend_schema(tags=['Categories'], description='List all categories'),
@@ -79,11 +202,31 @@ class JobViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(tags=['Categories'], description='Partially update category (Admin only)'),
     destroy=extend_schema(tags=['Categories'], description='Delete category (Admin only)'),
 )
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin, SerializerTimingMixin, AsyncReadMixin,
+                      viewsets.ModelViewSet):
     """
     ViewSet for managing job categories
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
-    lookup_field = 'slug'
\ No newline at end of file
+    lookup_field = 'slug'
+    cache_dependencies = (Job, Category)
+
+@extend_schema_view(
+    list=extend_schema(tags=['Jobs'], description='List archived jobs (Admin only)'),
+    retrieve=extend_schema(tags=['Jobs'], description='Get archived job details (Admin only)'),
+)
+class ArchivedJobViewSet(SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only access to jobs moved to the archive by ``manage.py expire_jobs``
+    """
+    queryset = ArchivedJob.objects.select_related('category', 'posted_by')
+    serializer_class = ArchivedJobSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = OptionalKeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = ['category', 'job_type', 'posted_by']
+    search_fields = ['title', 'company_name']
+    ordering_fields = ['archived_at', 'created_at', 'application_deadline']
+    ordering = ['-archived_at']
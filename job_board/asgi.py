@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_board.settings')
+# Serve the read endpoints with async views; everything else is unchanged
+os.environ.setdefault('ROOT_URLCONF', 'job_board.asgi_urls')
 
 application = get_asgi_application()
@@ -0,0 +1,12 @@
+"""
+URL configuration used under ASGI (see asgi.py).
+
+Same routes as job_board.urls, with the viewset actions that have async
+handlers (job, category and application reads) dispatched on the event loop.
+"""
+
+from apps.core.asyncviews import async_urlpatterns
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = async_urlpatterns(sync_urlpatterns)
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     'django_filters',
     
     # Local apps
+    'apps.core',
     'apps.authentication',
     'apps.jobs',
     'apps.applications',
@@ -54,8 +55,10 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'apps.core.middleware.ServerTimingMiddleware',
+    'apps.core.middleware.ReadReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'apps.core.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,7 +68,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'job_board.urls'
+# asgi.py switches to job_board.asgi_urls, which serves the read endpoints async
+ROOT_URLCONF = config('ROOT_URLCONF', default='job_board.urls')
 
 TEMPLATES = [
     {
@@ -98,26 +102,102 @@ WSGI_APPLICATION = 'job_board.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': config('DB_ENGINE', default='django.db.backends.postgresql'),
         'NAME': config('DB_NAME'),
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT', default='5432'),
+        # Seconds a connection outlives its request when not pooled (0 closes it)
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Connection pooling (PostgreSQL): each worker process keeps up to DB_POOL_SIZE connections
+# and hands them from request to request; DB_POOL_SIZE=0 opens one per request (or per
+# DB_CONN_MAX_AGE). Requests wait DB_POOL_TIMEOUT seconds for a free connection, and one
+# idle for DB_POOL_CHECK_AFTER seconds is tested with SELECT 1 before reuse.
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=10, cast=int)
+if DB_POOL_SIZE and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default'].update(ENGINE='apps.core.pooling', CONN_MAX_AGE=0, POOL={
+        'MAX_SIZE': DB_POOL_SIZE,
+        'TIMEOUT': config('DB_POOL_TIMEOUT', default=5, cast=float),
+        'CHECK_AFTER': config('DB_POOL_CHECK_AFTER', default=10, cast=float),
+        'MAX_IDLE': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+    })
+
+# Behind a transaction-pooling PgBouncer (DB_POOLER=transaction) a session's server connection
+# can change between transactions, so cursors that live across transactions cannot be used
+if config('DB_POOLER', default='') == 'transaction':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Read replicas: comma-separated host[:port] list, all serving DB_REPLICA_NAME (default DB_NAME).
+# Safe-method API reads go to a healthy replica unless the client wrote in the last
+# REPLICA_PIN_SECONDS; replicas more than REPLICA_MAX_LAG seconds behind are skipped.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    host, _, port = replica.partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        # Tests read the test database through the replica aliases
+        'TEST': {'MIRROR': 'default'},
+    }
+    if 'postgresql' in DATABASES[alias]['ENGINE']:
+        DATABASES[alias]['OPTIONS'] = {'connect_timeout': 2}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['apps.core.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=5, cast=float)
+REPLICA_CHECK_INTERVAL = config('REPLICA_CHECK_INTERVAL', default=5, cast=float)
+
+# Cache
+# Defaults to a per-process memory cache; point CACHE_BACKEND/CACHE_LOCATION at Redis
+# (django.core.cache.backends.redis.RedisCache) to share it between workers
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='job-board'),
+    }
+}
+
+# Request instrumentation: Server-Timing header for every client (admins always get it)
+# and slow request log (0 disables the log)
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=DEBUG, cast=bool)
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=500, cast=int)
+# Share of requests whose SELECTs are appended to QUERY_SAMPLE_LOG for "manage.py advise_indexes"
+QUERY_SAMPLE_RATE = config('QUERY_SAMPLE_RATE', default=0.0, cast=float)
+QUERY_SAMPLE_LOG = config('QUERY_SAMPLE_LOG', default='')
+
+# Anonymous GET responses on public job/category endpoints
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=60, cast=int)
+
 AUTH_USER_MODEL = 'authentication.User'
 
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.instrumentation.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'apps.core.uploads.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.AsyncPageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -136,6 +216,10 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Authenticated users are resolved from a per-process cache instead of the users table
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+
 # Swagger settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'ProDev Job Board API',
@@ -196,3 +280,62 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Add to job_board/settings.py
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    # Resumes: one file per distinct content under MEDIA_ROOT/blobs/ (apps.core.storage)
+    'blobs': {'BACKEND': 'apps.core.storage.ContentAddressedStorage'},
+}
+
+# Uploads are hashed while they stream in; larger files are refused before the body is read
+FILE_UPLOAD_HANDLERS = [
+    'apps.core.uploads.HashingMemoryFileUploadHandler',
+    'apps.core.uploads.HashingTemporaryFileUploadHandler',
+]
+FILE_UPLOAD_MAX_SIZE = config('FILE_UPLOAD_MAX_SIZE', default=10 * 1024 * 1024, cast=int)
+
+# Background tasks (apps.core.taskqueue, run by "manage.py run_tasks")
+TASK_MAX_ATTEMPTS = config('TASK_MAX_ATTEMPTS', default=3, cast=int)
+# Retry n waits TASK_RETRY_BACKOFF * 2^(n-1) seconds (jittered), at most TASK_MAX_BACKOFF
+TASK_RETRY_BACKOFF = config('TASK_RETRY_BACKOFF', default=10, cast=int)
+TASK_MAX_BACKOFF = config('TASK_MAX_BACKOFF', default=3600, cast=int)
+# A running task is handed to another worker if not finished within its lease
+TASK_LEASE_SECONDS = config('TASK_LEASE_SECONDS', default=300, cast=int)
+TASK_RETENTION_DAYS = config('TASK_RETENTION_DAYS', default=7, cast=int)
+TASK_WORKER_CONCURRENCY = config('TASK_WORKER_CONCURRENCY', default=4, cast=int)
+# Run tasks in-process when the enqueuing transaction commits instead of queueing them
+TASKS_EAGER = config('TASKS_EAGER', default=False, cast=bool)
+
+# Job expiry (apps.jobs.expiry, "manage.py expire_jobs"): past-deadline jobs are deactivated, and
+# jobs inactive and unchanged for JOB_ARCHIVE_AFTER_DAYS move to the archive tables
+JOB_EXPIRY_BATCH_SIZE = config('JOB_EXPIRY_BATCH_SIZE', default=500, cast=int)
+JOB_ARCHIVE_AFTER_DAYS = config('JOB_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+# Tasks the run_tasks workers queue every so many seconds (0 disables); JOB_EXPIRY_INTERVAL
+# runs the expiry from the workers instead of an external scheduler
+PERIODIC_TASKS = {
+    'apps.jobs.tasks.expire_and_archive_jobs': config('JOB_EXPIRY_INTERVAL', default=0, cast=int),
+    'apps.jobs.tasks.refresh_similar_jobs': config('SIMILAR_JOBS_INTERVAL', default=0, cast=int),
+}
+
+# Similar jobs (apps.jobs.similarity, "manage.py build_similar_jobs"): neighbours kept per job,
+# vocabulary size and the share of jobs above which a term is too common to count. The batch
+# holds a float32 matrix of active jobs x SIMILAR_JOBS_MAX_TERMS, plus CHUNK_SIZE x active jobs scores
+SIMILAR_JOBS_COUNT = config('SIMILAR_JOBS_COUNT', default=10, cast=int)
+SIMILAR_JOBS_MAX_TERMS = config('SIMILAR_JOBS_MAX_TERMS', default=500, cast=int)
+SIMILAR_JOBS_MAX_DF = config('SIMILAR_JOBS_MAX_DF', default=0.5, cast=float)
+SIMILAR_JOBS_CHUNK_SIZE = config('SIMILAR_JOBS_CHUNK_SIZE', default=256, cast=int)
+
+# Job search
+# Matches the in-process search index (databases without full-text search) passes to a query, best first,
+# after the query's other filters
+SEARCH_INDEX_MAX_RESULTS = config('SEARCH_INDEX_MAX_RESULTS', default=500, cast=int)
+# Seconds before a worker rebuilds its typeahead index from the database in the background,
+# picking up changes made by other processes (0 disables periodic rebuilds)
+SUGGEST_INDEX_MAX_AGE = config('SUGGEST_INDEX_MAX_AGE', default=300, cast=int)
+# Index keys a typeahead lookup longer than three characters walks at most
+SUGGEST_SCAN_LIMIT = config('SUGGEST_SCAN_LIMIT', default=1000, cast=int)
+
+# Bulk job import (POST /api/jobs/import/): rows validated and inserted per batch, rows per request
+JOB_IMPORT_BATCH_SIZE = config('JOB_IMPORT_BATCH_SIZE', default=500, cast=int)
+JOB_IMPORT_MAX_ROWS = config('JOB_IMPORT_MAX_ROWS', default=10000, cast=int)
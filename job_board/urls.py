@@ -32,6 +32,7 @@ urlpatterns = [
     path('api/auth/', include('apps.authentication.urls')),
     path('api/', include('apps.jobs.urls')),
     path('api/', include('apps.applications.urls')),
+    path('api/', include('apps.core.urls')),
     
     # API documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),